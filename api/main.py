@@ -1,10 +1,27 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
+import asyncio
+import json
+import math
+import os
+import time
+import sys
 import uuid
 from datetime import datetime, timedelta
 from typing import List, Optional
 
+# Allow `python api/main.py` to import the shared service modules.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from shared import metrics, tracing
+from shared.customer_store import CachedCustomerStore, create_customer_store
+from shared.device_jobs import RateLimited, create_device_job_manager
+from shared.guide_index import GuideIndex
+from shared.ticket_store import InvalidCursor, create_ticket_store
+from app import config, warmup
+from app.jobs import QueueFull, get_job_manager
+
 # --- Pydantic Models ---
 class AccountStatusResponse(BaseModel):
     account_id: str
@@ -16,6 +33,13 @@ class AccountStatusResponse(BaseModel):
 class TroubleshootingGuideResponse(BaseModel):
     issue: str
     steps: List[str]
+    issue_type: Optional[str] = None
+    match_score: Optional[float] = None
+
+class GuideCandidate(BaseModel):
+    issue_type: str
+    issue: str
+    score: float
 
 class CreateTicketRequest(BaseModel):
     customer_id: str
@@ -31,38 +55,69 @@ class TicketResponse(BaseModel):
     created_at: str
     estimated_resolution: str
 
-# --- Mock Data ---
-MOCK_CUSTOMERS = {
-    "CUST123": {
-        "account_id": "CUST123",
-        "name": "Alice Smith",
-        "service_status": "Active",
-        "plan": "Premium Internet",
-        "current_issues": []
-    },
-    "CUST456": {
-        "account_id": "CUST456",
-        "name": "Bob Johnson",
-        "service_status": "Inactive",
-        "plan": "Basic Internet",
-        "current_issues": ["internet_down", "billing_issue"]
-    },
-    "CUST789": {
-        "account_id": "CUST789",
-        "name": "Charlie Brown",
-        "service_status": "Active",
-        "plan": "Standard TV",
-        "current_issues": ["login_failure"]
-    },
-    "CUST000": {
-        "account_id": "CUST000",
-        "name": "Demo Customer",
-        "service_status": "Active",
-        "plan": "Fiber Max",
-        "current_issues": []
-    }
-}
+class TicketListResponse(BaseModel):
+    tickets: List[TicketResponse]
+    next_cursor: Optional[str] = None
+
+class SubmitJobRequest(BaseModel):
+    inquiry: str
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+    result: Optional[str] = None
+    error: Optional[str] = None
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+class RebootJobResponse(BaseModel):
+    job_id: str
+    device_id: str
+    idempotency_key: Optional[str] = None
+    status: str
+    message: Optional[str] = None
+    error: Optional[str] = None
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # True when the request collapsed onto an earlier reboot of the device
+    duplicate: bool = False
+
+# Batch models: every item gets either a result or an error, never both
+class BatchAccountStatusRequest(BaseModel):
+    account_ids: List[str]
+
+class AccountStatusBatchItem(BaseModel):
+    account_id: str
+    result: Optional[AccountStatusResponse] = None
+    error: Optional[str] = None
+
+class BatchTroubleshootingRequest(BaseModel):
+    issue_types: List[str]
+
+class TroubleshootingBatchItem(BaseModel):
+    issue_type: str
+    result: Optional[TroubleshootingGuideResponse] = None
+    error: Optional[str] = None
+
+class BatchCreateTicketRequest(BaseModel):
+    tickets: List[CreateTicketRequest]
 
+class TicketBatchItem(BaseModel):
+    index: int
+    result: Optional[TicketResponse] = None
+    error: Optional[str] = None
+
+class BatchRebootRequest(BaseModel):
+    device_ids: List[str]
+
+class RebootBatchItem(BaseModel):
+    device_id: str
+    result: Optional[RebootJobResponse] = None
+    error: Optional[str] = None
+
+# --- Mock Data ---
 MOCK_TROUBLESHOOTING_GUIDES = {
     "internet_slow": {
         "issue": "Internet Slow",
@@ -96,7 +151,28 @@ MOCK_TROUBLESHOOTING_GUIDES = {
     }
 }
 
-MOCK_TICKETS = {}
+# Resolves issue keys and free-text descriptions to troubleshooting guides
+GUIDE_INDEX = GuideIndex(MOCK_TROUBLESHOOTING_GUIDES)
+
+# Durable ticket storage (SQLite/WAL by default, see TICKET_STORE / TICKET_DB_PATH)
+ticket_store = create_ticket_store()
+metrics.gauge("ticket_store_size", "Tickets held by the ticket store.", function=ticket_store.count)
+
+# Customer accounts (SQLite behind an LRU read-through cache, see CUSTOMER_STORE / CUSTOMER_DB_PATH)
+customer_store = create_customer_store()
+if isinstance(customer_store, CachedCustomerStore):
+    metrics.gauge("customer_cache_hit_ratio", "Customer lookups answered by the in-process cache.",
+                  function=customer_store.hit_rate)
+
+# Background device reboots: collapsed duplicates, per-device rate limit (see DEVICE_REBOOT_*)
+reboot_jobs = create_device_job_manager()
+metrics.gauge("device_reboot_jobs_active", "Reboot jobs queued or running.", function=reboot_jobs.active_count)
+
+MAX_BATCH_SIZE = 1000
+
+def check_batch_size(items: list):
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(items)} items (max {MAX_BATCH_SIZE})")
 
 # --- FastAPI Application ---
 app = FastAPI(
@@ -104,27 +180,68 @@ app = FastAPI(
     description="Consolidated API for customer data, troubleshooting, ticketing, and device management",
     version="1.0.0"
 )
+tracing.instrument_app(app, "unified-api")
+metrics.instrument_app(app, "unified-api")
 
 # Customer Service Endpoints (Port 8000 equivalent)
+# Plain `def`: cache misses hit SQLite, so FastAPI runs these in its threadpool
 @app.get("/account_status/{account_id}", response_model=AccountStatusResponse)
-async def get_account_status(account_id: str):
-    customer = MOCK_CUSTOMERS.get(account_id)
+def get_account_status(account_id: str):
+    customer = customer_store.get(account_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Account not found")
     return customer
 
+@app.post("/account_status/batch", response_model=List[AccountStatusBatchItem])
+def get_account_status_batch(request: BatchAccountStatusRequest):
+    check_batch_size(request.account_ids)
+    customers = customer_store.get_many(request.account_ids)
+    results = []
+    for account_id in request.account_ids:
+        customer = customers.get(account_id)
+        if customer:
+            results.append({"account_id": account_id, "result": customer})
+        else:
+            results.append({"account_id": account_id, "error": "Account not found"})
+    return results
+
 # Troubleshooting Service Endpoints (Port 8001 equivalent)
+def find_guide(issue_type: str) -> Optional[dict]:
+    # Accepts keys and free-text descriptions ("slow internet", "internet_down")
+    match = GUIDE_INDEX.resolve(issue_type)
+    if match is None:
+        return None
+    return {**MOCK_TROUBLESHOOTING_GUIDES[match.issue_type], "issue_type": match.issue_type, "match_score": match.score}
+
 @app.get("/troubleshooting_steps/{issue_type}", response_model=TroubleshootingGuideResponse)
 async def get_troubleshooting_steps(issue_type: str):
-    guide = MOCK_TROUBLESHOOTING_GUIDES.get(issue_type.lower())
+    guide = find_guide(issue_type)
     if not guide:
-        raise HTTPException(status_code=404, detail=f"Guide for '{issue_type}' not found")
+        raise HTTPException(status_code=404, detail=GUIDE_INDEX.not_found(issue_type))
     return guide
 
+@app.get("/troubleshooting_guides/search", response_model=List[GuideCandidate])
+async def search_troubleshooting_guides(q: str, limit: int = Query(5, ge=1, le=50)):
+    return [match._asdict() for match in GUIDE_INDEX.search(q, limit=limit)]
+
+@app.post("/troubleshooting_steps/batch", response_model=List[TroubleshootingBatchItem])
+async def get_troubleshooting_steps_batch(request: BatchTroubleshootingRequest):
+    check_batch_size(request.issue_types)
+    results = []
+    for issue_type in request.issue_types:
+        guide = find_guide(issue_type)
+        if guide:
+            results.append({"issue_type": issue_type, "result": guide})
+        else:
+            results.append({"issue_type": issue_type, "error": GUIDE_INDEX.not_found(issue_type)})
+    return results
+
 # Ticketing Service Endpoints (Port 8002 equivalent)
-@app.post("/create_ticket", response_model=TicketResponse)
-async def create_ticket(request: CreateTicketRequest):
-    ticket_id = str(uuid.uuid4())[:8]
+# Plain `def` endpoints: FastAPI runs them in its threadpool, keeping the
+# blocking ticket store calls off the event loop.
+def build_ticket(request: CreateTicketRequest) -> dict:
+    # Full UUID: the id is the primary key of a store that keeps growing
+    ticket_id = str(uuid.uuid4())
     created_at = datetime.now()
     
     if request.priority.lower() == "high":
@@ -143,20 +260,156 @@ async def create_ticket(request: CreateTicketRequest):
         "created_at": created_at.isoformat(),
         "estimated_resolution": estimated_resolution.isoformat()
     }
-    MOCK_TICKETS[ticket_id] = ticket_data
-    return ticket_data
+    return ticket_store.create(ticket_data)
+
+@app.post("/create_ticket", response_model=TicketResponse)
+def create_ticket(request: CreateTicketRequest):
+    return build_ticket(request)
+
+@app.post("/create_ticket/batch", response_model=List[TicketBatchItem])
+def create_ticket_batch(request: BatchCreateTicketRequest):
+    check_batch_size(request.tickets)
+    results = []
+    for index, ticket_request in enumerate(request.tickets):
+        try:
+            results.append({"index": index, "result": build_ticket(ticket_request)})
+        except Exception as e:
+            results.append({"index": index, "error": str(e)})
+    return results
+
+@app.get("/ticket_status/{ticket_id}", response_model=TicketResponse)
+def get_ticket_status(ticket_id: str):
+    ticket = ticket_store.get(ticket_id)
+    if not ticket:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return ticket
+
+@app.get("/tickets", response_model=TicketListResponse)
+def list_tickets(
+    customer_id: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    try:
+        tickets, next_cursor = ticket_store.list(
+            customer_id=customer_id, status=status, priority=priority, limit=limit, cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"tickets": tickets, "next_cursor": next_cursor}
 
 # Device Management Endpoints (Port 8003 equivalent)
-@app.post("/reboot_device/{device_id}")
-async def reboot_device(device_id: str):
-    return {
-        "status": "success", 
-        "message": f"Remote reboot command sent to device {device_id}."
-    }
+# Reboots are queued as jobs: poll /reboot_jobs/{job_id} (or long-poll with ?wait=) for the outcome
+@app.post("/reboot_device/batch", response_model=List[RebootBatchItem], status_code=202)
+async def reboot_devices_batch(request: BatchRebootRequest, idempotency_key: Optional[str] = Header(None)):
+    check_batch_size(request.device_ids)
+    return [
+        {
+            "device_id": item["device_id"],
+            "result": {**item["job"].to_dict(), "duplicate": not item["created"]} if item["job"] else None,
+            "error": item["error"],
+        }
+        for item in reboot_jobs.submit_many(request.device_ids, idempotency_key)
+    ]
+
+@app.post("/reboot_device/{device_id}", response_model=RebootJobResponse, status_code=202)
+async def reboot_device(device_id: str, idempotency_key: Optional[str] = Header(None)):
+    try:
+        job, created = reboot_jobs.submit(device_id, idempotency_key)
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    return {**job.to_dict(), "duplicate": not created}
+
+@app.get("/reboot_jobs/{job_id}", response_model=RebootJobResponse)
+async def get_reboot_job(job_id: str, wait: float = 0):
+    job = reboot_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Reboot job not found")
+    if wait > 0 and not job.done:
+        await job.wait(min(wait, MAX_JOB_WAIT_SECONDS))
+    return job.to_dict()
+
+# Crew Job Endpoints: submit an inquiry, then poll (or long-poll with ?wait=) for the result
+MAX_JOB_WAIT_SECONDS = 60
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: SubmitJobRequest):
+    if not request.inquiry.strip():
+        raise HTTPException(status_code=400, detail="Inquiry must not be empty")
+    try:
+        job = get_job_manager().submit(request.inquiry)
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, wait: float = 0):
+    job = get_job_manager().get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if wait > 0 and not job.done:
+        await asyncio.to_thread(job.wait, min(wait, MAX_JOB_WAIT_SECONDS))
+    return job.to_dict()
+
+# Server-sent events: agent steps, tool calls and LLM tokens as they happen,
+# ending with a `done` event. Reconnecting clients resume via Last-Event-ID.
+SSE_POLL_INTERVAL = 0.05
+SSE_HEARTBEAT_SECONDS = 15
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, last_event_id: Optional[str] = Header(None)):
+    job = get_job_manager().get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    seq = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+    async def event_stream():
+        nonlocal seq
+        last_sent = time.monotonic()
+        while True:
+            # Checked first: once finished, the `done` event is already in the log
+            finished = job.wait(0)
+            events = job.events_since(seq, timeout=0)
+            for event in events:
+                yield format_sse(event)
+            seq += len(events)
+            if events:
+                last_sent = time.monotonic()
+            elif finished:
+                return
+            elif time.monotonic() - last_sent > SSE_HEARTBEAT_SECONDS:
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(SSE_POLL_INTERVAL)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "unified-api"}
 
+@app.on_event("startup")
+async def start_warmup():
+    if config.WARMUP == "startup":
+        warmup.get_warmup().start()
+
+@app.get("/ready")
+async def readiness_check():
+    # Readiness probe: 503 until the crew and knowledge base are loaded (WARMUP=probe|startup)
+    ready, status = warmup.readiness()
+    if not ready:
+        raise HTTPException(status_code=503, detail={"status": "warming_up", **status})
+    return {"status": "ready", "service": "unified-api", **status}
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,12 +1,25 @@
+import asyncio
 import os
-from crewai import Crew, Agent, Task
+import queue
+import threading
+from contextlib import contextmanager
+import yaml
+from crewai import Crew, Agent, Task, LLM
+from crewai.tasks.conditional_task import ConditionalTask
+from app import config, streaming
+from app.llm_cache import install_llm_cache
+from app.parallel import NOTHING_PREFETCHED, format_results, get_executor, inquiry_values, prefetch_calls
+from app.routing import TIER_1, TIER_2, TIERS, install_model_fallbacks, needs_escalation
+from app.telemetry import CREW_RUNS, install_llm_instrumentation
+from shared import tracing
 from app.tools import (
     KnowledgeBaseTool,
     CustomerDetailsTool,
     TroubleshootingTool,
     TicketingTool,
     DeviceRebootTool,
-    TavilySearchTool
+    TavilySearchTool,
+    ParallelLookupTool
 )
 
 # CRITICAL: Set the config path for LiteLLM before you initialize any agent.
@@ -14,39 +27,229 @@ from app.tools import (
 # We assume this script is run from the root of the project where litellm.config.json is located.
 os.environ["LITELLM_CONFIG_PATH"] = "litellm.config.json"
 
-# Define agents
-customer_support_agent = Agent(
-    role="Customer Support Agent",
-    goal="Understand and resolve customer issues efficiently",
-    backstory="You are an expert at diagnosing customer service problems and finding helpful answers from internal tools.",
-    tools=[
-        KnowledgeBaseTool(),
-        CustomerDetailsTool(),
-        TroubleshootingTool(),
-        TicketingTool(),
-        DeviceRebootTool(),
-        TavilySearchTool()
-    ],
-    allow_delegation=False,
-    verbose=True,
-    # 👇 Use model alias configured in litellm.config.json
-    llm={"model": "demo-llm"}
-)
+# Instrument every LLM call, retry failed calls on the tier's fallback models,
+# then serve repeated temperature-0 completions from the cache (LLM_CACHE=off
+# disables). Order matters: cache hits and each fallback attempt are recorded too.
+install_llm_instrumentation()
+install_model_fallbacks()
+install_llm_cache()
 
-# Define task
-support_task = Task(
-    description="Use all available tools to answer the customer inquiry: '{input}'",
-    expected_output="A helpful and accurate resolution to the customer's issue.",
-    agent=customer_support_agent
-)
+# Forward streamed LLM tokens to whichever job is running on the current thread
+streaming.install_llm_stream_listener()
+
+
+# ---------------------------
+# Crew factory
+# ---------------------------
+
+def _load_yaml(name: str) -> dict:
+    with open(os.path.join(config.CREW_CONFIG_DIR, name), "r") as f:
+        return yaml.safe_load(f)
+
+
+class CrewFactory:
+    """
+    Builds two-tier support crews around components shared by the whole process.
+
+    The Tier 1 analyst triages every inquiry on the small tier-1 model with
+    the knowledge base and account tools; the Tier 2 specialist runs on the
+    larger model only when Tier 1 escalates (see app/routing.py). Roles and
+    tasks come from config/agents.yaml and config/tasks.yaml.
+
+    The tools and the LLM clients are stateless (the tools' connections live
+    in the process-wide retrieval engine and transports), so they are built
+    once. Agent, Task and Crew carry per-run state and are built per crew.
+    """
+
+    def __init__(self):
+        self.agents_config = _load_yaml("agents.yaml")
+        self.tasks_config = _load_yaml("tasks.yaml")
+        # 👇 One model alias per tier, configured in litellm.config.json
+        self.llms = {
+            name: LLM(
+                model=tier.model,
+                stream=config.LLM_STREAM,
+                temperature=config.LLM_TEMPERATURE,
+                max_tokens=tier.max_tokens,
+            )
+            for name, tier in TIERS.items()
+        }
+        self.tools = {
+            TIER_1: [KnowledgeBaseTool(), CustomerDetailsTool()],
+            TIER_2: [TroubleshootingTool(), DeviceRebootTool(), TavilySearchTool(), TicketingTool()],
+        }
+        # Read-only tools by name, for prefetch and each tier's parallel lookup tool
+        self.lookups = {t.name: t for tools in self.tools.values() for t in tools if t.parallel_safe}
+        for tools in self.tools.values():
+            tools.append(ParallelLookupTool(tools))
+
+    def _agent(self, key: str, tier: str) -> Agent:
+        return Agent(
+            **self.agents_config[key],
+            tools=list(self.tools[tier]),
+            allow_delegation=False,
+            verbose=True,
+            llm=self.llms[tier],
+        )
+
+    def _task_config(self, key: str) -> dict:
+        # `prefetch` is ours (see inputs()); the rest are Task fields
+        return {k: v for k, v in self.tasks_config[key].items() if k != "prefetch"}
+
+    def _prefetch(self, inquiry: str):
+        # Only the first task always runs, so only its lookups are worth doing up front
+        if not config.TOOL_PREFETCH:
+            return []
+        return prefetch_calls(self.tasks_config["initial_analysis"].get("prefetch"), inquiry_values(inquiry))
+
+    def inputs(self, inquiry: str) -> dict:
+        """Kickoff inputs: the inquiry and the results of the lookups the first task declares."""
+        calls = self._prefetch(inquiry)
+        prefetched = format_results(get_executor().run(self.lookups, calls)) if calls else NOTHING_PREFETCHED
+        return {"inquiry": inquiry, "prefetched": prefetched}
+
+    async def ainputs(self, inquiry: str) -> dict:
+        calls = self._prefetch(inquiry)
+        prefetched = format_results(await get_executor().arun(self.lookups, calls)) if calls else NOTHING_PREFETCHED
+        return {"inquiry": inquiry, "prefetched": prefetched}
+
+    def build(self) -> Crew:
+        # Define agents
+        tier_1_agent = self._agent("tier_1_agent", TIER_1)
+        tier_2_agent = self._agent("tier_2_agent", TIER_2)
+
+        # Define tasks: Tier 2 only runs when the Tier 1 answer asks for escalation
+        initial_analysis = Task(**self._task_config("initial_analysis"), agent=tier_1_agent)
+        advanced_troubleshooting = ConditionalTask(
+            **self._task_config("advanced_troubleshooting"),
+            agent=tier_2_agent,
+            context=[initial_analysis],
+            condition=needs_escalation,
+        )
+
+        # Define crew
+        return Crew(
+            agents=[tier_1_agent, tier_2_agent],
+            tasks=[initial_analysis, advanced_troubleshooting],
+            verbose=True,  # Optional: show more internal logs
+            # Agent thoughts and finished tasks go to the progress stream (see app/streaming.py)
+            step_callback=streaming.step_callback,
+            task_callback=streaming.task_callback,
+        )
+
+
+class CrewPool:
+    """
+    Hands out crews for exclusive use, one run at a time.
+
+    Crews are built on demand up to `size` and reused afterwards, so
+    concurrent inquiries never share an Agent/Task/Crew while the process
+    still builds each one only once. acquire() waits up to `timeout` when
+    every crew is busy.
+    """
+
+    def __init__(self, factory: CrewFactory, size: int = config.CREW_POOL_SIZE, timeout: float = config.CREW_POOL_TIMEOUT):
+        self.factory = factory
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Crew:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                build = True
+            else:
+                build = False
+        if build:
+            try:
+                return self.factory.build()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No crew became available within {self.timeout}s")
+
+    def release(self, crew: Crew):
+        self._idle.put(crew)
+
+    @contextmanager
+    def checkout(self):
+        crew = self.acquire()
+        try:
+            yield crew
+        finally:
+            self.release(crew)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "created": self._created, "idle": self._idle.qsize()}
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_crew_pool() -> CrewPool:
+    """The crew pool behind run() and run_async(); the factory, with its tools and LLM clients, is built on the first call."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = CrewPool(CrewFactory())
+    return _pool
+
+
+def _record_crew_usage(span, result):
+    # A skipped ConditionalTask leaves an empty output, so Tier 2 ran iff it has text
+    outputs = getattr(result, "tasks_output", None) or []
+    tier = TIER_2 if any(output.raw for output in outputs[1:]) else TIER_1
+    CREW_RUNS.inc(tier=tier)
+    span.set_attribute("tier", tier)
+    usage = getattr(result, "token_usage", None)
+    if usage is not None:
+        span.set_attributes(
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            total_tokens=getattr(usage, "total_tokens", None),
+            llm_requests=getattr(usage, "successful_requests", None),
+        )
 
-# Define crew
-support_crew = Crew(
-    agents=[customer_support_agent],
-    tasks=[support_task],
-    verbose=True  # Optional: show more internal logs
-)
 
 # Optional helper for main.py
 def run(inquiry: str) -> str:
-    return support_crew.kickoff(inputs={"input": inquiry})
\ No newline at end of file
+    pool = get_crew_pool()
+    with tracing.span("crew.run", inquiry_chars=len(inquiry)) as span:
+        # Prefetch before taking a crew so lookups don't hold one idle
+        inputs = pool.factory.inputs(inquiry)
+        with pool.checkout() as crew:
+            result = crew.kickoff(inputs=inputs)
+        _record_crew_usage(span, result)
+        return result
+
+# Async entry point for callers that already run an event loop. CrewAI has no
+# async agent loop: kickoff_async runs kickoff on a worker thread, where agents
+# call tools through their sync _run. What runs natively on the loop is the
+# prefetch (the lookup tools' _arun, gathered concurrently) and waiting for a
+# free crew, so an event loop can multiplex inquiries without a thread each
+# until the crew itself starts.
+async def run_async(inquiry: str) -> str:
+    pool = get_crew_pool()
+    with tracing.span("crew.run", inquiry_chars=len(inquiry), mode="async") as span:
+        inputs = await pool.factory.ainputs(inquiry)
+        # acquire() may block waiting for a free crew; keep that off the event loop
+        crew = await asyncio.to_thread(pool.acquire)
+        try:
+            result = await crew.kickoff_async(inputs=inputs)
+        finally:
+            pool.release(crew)
+        _record_crew_usage(span, result)
+        return result
@@ -0,0 +1,250 @@
+# app/answer_cache.py
+
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from app import config
+
+
+# ---------------------------
+# Ingest stamp
+# ---------------------------
+# ingest_data.py rewrites a small stamp file every time it (re)ingests a
+# collection, and for Weaviate also records the stamp on the collection itself
+# so replicas that do not share KB_DATA_DIR see it. Caches holding answers
+# derived from that collection compare the stamp (see IngestStamp) and drop
+# everything when it changes.
+
+COLLECTION_STAMP_PREFIX = "ingest-stamp:"
+
+def ingest_stamp_path(index_name: str = config.KB_INDEX_NAME) -> str:
+    return os.path.join(config.KB_DATA_DIR, f"{index_name}.stamp")
+
+
+def read_ingest_stamp(index_name: str = config.KB_INDEX_NAME) -> str:
+    try:
+        with open(ingest_stamp_path(index_name), "r") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def new_ingest_stamp() -> str:
+    return f"{time.time():.6f}-{uuid.uuid4().hex[:8]}"
+
+
+def touch_ingest_stamp(index_name: str = config.KB_INDEX_NAME, stamp: Optional[str] = None) -> str:
+    stamp = stamp or new_ingest_stamp()
+    path = ingest_stamp_path(index_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(stamp)
+    os.replace(tmp, path)
+    return stamp
+
+
+def write_collection_stamp(client, index_name: str, stamp: str):
+    """Stores `stamp` as the description of a Weaviate collection (v4 client)."""
+    client.collections.get(index_name).config.update(description=f"{COLLECTION_STAMP_PREFIX}{stamp}")
+
+
+def read_collection_stamp(client, index_name: str) -> str:
+    description = client.collections.get(index_name).config.get(simple=True).description or ""
+    return description[len(COLLECTION_STAMP_PREFIX):] if description.startswith(COLLECTION_STAMP_PREFIX) else ""
+
+
+class IngestStamp:
+    """
+    This process's view of a collection's ingest stamp, re-read at most every
+    `interval` seconds instead of on every lookup. The stamp file is read
+    inline. An attached remote source (the Weaviate collection marker) is read
+    inline once, so the first stamp already includes it, and afterwards
+    refreshed on a background thread, so lookups never wait on the network.
+    A failed remote read keeps the last known marker.
+    """
+
+    def __init__(self, index_name: str = config.KB_INDEX_NAME, interval: float = config.KB_STAMP_CHECK_INTERVAL):
+        self.index_name = index_name
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._checked = float("-inf")
+        self._local = ""
+        self._remote: Optional[Callable[[], str]] = None
+        self._remote_value = ""
+        self._remote_loaded = False
+        self._refreshing = False
+
+    def attach_remote(self, read: Callable[[], str]):
+        with self._lock:
+            self._remote = read
+            self._remote_loaded = False
+            self._checked = float("-inf")
+
+    def current(self) -> str:
+        now = time.monotonic()
+        if now - self._checked >= self.interval:
+            with self._lock:
+                if now - self._checked >= self.interval:
+                    self._checked = now
+                    self._local = read_ingest_stamp(self.index_name)
+                    if self._remote is not None and not self._remote_loaded:
+                        self._remote_loaded = True
+                        self._refresh_remote()
+                    elif self._remote is not None and not self._refreshing:
+                        self._refreshing = True
+                        threading.Thread(target=self._refresh_remote, name="ingest-stamp", daemon=True).start()
+        return f"{self._local}|{self._remote_value}"
+
+    def _refresh_remote(self):
+        try:
+            self._remote_value = self._remote()
+        except Exception:
+            pass
+        finally:
+            self._refreshing = False
+
+
+_stamps: Dict[str, IngestStamp] = {}
+_stamps_lock = threading.Lock()
+
+
+def get_ingest_stamp(index_name: str = config.KB_INDEX_NAME) -> IngestStamp:
+    """The IngestStamp for `index_name`, shared so the answer cache, BM25 reloads and the local index react to the same re-ingest."""
+    with _stamps_lock:
+        stamp = _stamps.get(index_name)
+        if stamp is None:
+            stamp = _stamps[index_name] = IngestStamp(index_name)
+        return stamp
+
+
+# ---------------------------
+# Semantic answer cache
+# ---------------------------
+
+class SemanticAnswerCache:
+    """
+    Similarity-threshold cache of synthesized knowledge base answers.
+
+    Question embeddings are stored L2-normalized in a fixed-size ring buffer,
+    so a lookup is a single matrix-vector product. A question whose cosine
+    distance to a cached one with the same scope (e.g. category filter) is at
+    most `max_distance` gets the cached answer.
+
+    `lookup` returns the ingest stamp it checked alongside the answer; passing
+    that stamp back to `put` drops answers synthesized from a collection that
+    was re-ingested in the meantime.
+    """
+
+    def __init__(
+        self,
+        index_name: str = config.KB_INDEX_NAME,
+        max_distance: float = config.ANSWER_CACHE_MAX_DISTANCE,
+        capacity: int = config.ANSWER_CACHE_SIZE,
+        ttl: float = config.ANSWER_CACHE_TTL,
+    ):
+        self.index_name = index_name
+        self.max_distance = max_distance
+        self.capacity = capacity
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._answers = [None] * capacity
+        self._scope_ids = {}
+        self._scopes = np.full(capacity, -1, dtype=np.int32)
+        self._created = np.zeros(capacity, dtype=np.float64)
+        self._size = 0
+        self._next = 0
+        self._stamps = get_ingest_stamp(index_name)
+        self._stamp = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    def _check_stamp(self, stamp: str):
+        if self._stamp is None:
+            self._stamp = stamp
+        elif stamp != self._stamp:
+            self._stamp = stamp
+            self._clear()
+            self.invalidations += 1
+
+    def _clear(self):
+        self._answers = [None] * self.capacity
+        self._scopes[:] = -1
+        self._created[:] = 0
+        self._size = 0
+        self._next = 0
+
+    def get(self, vector, scope: str = "") -> Optional[str]:
+        return self.lookup(vector, scope)[0]
+
+    def lookup(self, vector, scope: str = "") -> Tuple[Optional[str], str]:
+        """Returns (cached answer or None, the ingest stamp the lookup was made against)."""
+        query = _unit(vector)
+        stamp = self._stamps.current()
+        with self._lock:
+            self._check_stamp(stamp)
+            if self._size == 0:
+                self.misses += 1
+                return None, stamp
+            similarities = self._vectors[: self._size] @ query
+            if self.ttl:
+                expired = self._created[: self._size] < time.time() - self.ttl
+                similarities[expired] = -1.0
+            similarities[self._scopes[: self._size] != self._scope_ids.get(scope, -2)] = -1.0
+            best = int(np.argmax(similarities))
+            if 1.0 - similarities[best] <= self.max_distance:
+                self.hits += 1
+                return self._answers[best], stamp
+            self.misses += 1
+            return None, stamp
+
+    def put(self, vector, answer: str, scope: str = "", stamp: Optional[str] = None):
+        """Caches `answer`; with `stamp` (from `lookup`), only if the collection was not re-ingested since."""
+        query = _unit(vector)
+        current = self._stamps.current()
+        with self._lock:
+            self._check_stamp(current)
+            if stamp is not None and stamp != self._stamp:
+                self.stale_puts += 1
+                return
+            if self._vectors is None:
+                self._vectors = np.zeros((self.capacity, query.shape[0]), dtype=np.float32)
+            slot = self._next
+            self._vectors[slot] = query
+            self._answers[slot] = answer
+            self._scopes[slot] = self._scope_ids.setdefault(scope, len(self._scope_ids))
+            self._created[slot] = time.time()
+            self._next = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def invalidate(self):
+        with self._lock:
+            self._clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
@@ -0,0 +1,112 @@
+# app/bm25.py
+
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it my of on or "
+    "the to what when why with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def bm25_path(directory: str, index_name: str) -> str:
+    return os.path.join(directory, f"{index_name}.bm25.json")
+
+
+class BM25Index:
+    """
+    Okapi BM25 over FAQ titles and contents, built at ingest time.
+
+    Postings are partitioned by category, so a category filter only touches
+    that category's posting lists instead of scoring the whole corpus.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs: List[dict] = []
+        self.lengths: List[int] = []
+        self.total_length = 0
+        # category -> term -> [(doc index, term frequency)]
+        self.postings: Dict[str, Dict[str, List[Tuple[int, int]]]] = defaultdict(lambda: defaultdict(list))
+        self.doc_freq: Counter = Counter()
+
+    # --- Building ---
+
+    def add(self, doc_id: str, title: str, content: str, category: str = ""):
+        idx = len(self.docs)
+        tokens = tokenize(f"{title} {content}")
+        self.docs.append({"doc_id": doc_id, "title": title, "category": category, "text": content})
+        self.lengths.append(len(tokens))
+        self.total_length += len(tokens)
+        for term, tf in Counter(tokens).items():
+            self.postings[category][term].append((idx, tf))
+            self.doc_freq[term] += 1
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "k1": self.k1,
+                "b": self.b,
+                "docs": self.docs,
+                "lengths": self.lengths,
+                "postings": self.postings,
+                "doc_freq": self.doc_freq,
+            }, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            data = json.load(f)
+        index = cls(k1=data["k1"], b=data["b"])
+        index.docs = data["docs"]
+        index.lengths = data["lengths"]
+        index.total_length = sum(index.lengths)
+        index.doc_freq = Counter(data["doc_freq"])
+        for category, terms in data["postings"].items():
+            for term, postings in terms.items():
+                index.postings[category][term] = [tuple(p) for p in postings]
+        return index
+
+    # --- Scoring ---
+
+    def search(self, query: str, top_k: int = 10, category: Optional[str] = None) -> List[Tuple[int, float]]:
+        """Returns (doc index, score) pairs, best first."""
+        n = len(self.docs)
+        if not n:
+            return []
+        avgdl = self.total_length / n or 1.0
+        if category is not None:
+            partitions = [self.postings.get(category, {})]
+        else:
+            partitions = list(self.postings.values())
+
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            df = self.doc_freq.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for partition in partitions:
+                for idx, tf in partition.get(term, ()):
+                    norm = self.k1 * (1 - self.b + self.b * self.lengths[idx] / avgdl)
+                    scores[idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def categories(self) -> List[str]:
+        return sorted(self.postings)
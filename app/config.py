@@ -0,0 +1,172 @@
+# app/config.py
+
+import os
+from urllib.parse import urlsplit
+
+from shared.paths import data_path
+
+# ---------------------------
+# Knowledge Base / Weaviate
+# ---------------------------
+
+# WEAVIATE_URL (e.g. http://weaviate-service:8080) supplies the host and port;
+# WEAVIATE_HOST / WEAVIATE_PORT override it.
+_weaviate_url = urlsplit(os.getenv("WEAVIATE_URL", ""))
+WEAVIATE_HOST = os.getenv("WEAVIATE_HOST") or _weaviate_url.hostname or "localhost"
+WEAVIATE_PORT = int(os.getenv("WEAVIATE_PORT") or _weaviate_url.port or 8080)
+WEAVIATE_GRPC_PORT = int(os.getenv("WEAVIATE_GRPC_PORT", 50051))
+
+# Retrieval backend: "weaviate" or "local" (memory-mapped NumPy index under KB_DATA_DIR)
+KB_BACKEND = os.getenv("KB_BACKEND", "weaviate").lower()
+KB_INDEX_NAME = os.getenv("KB_INDEX_NAME", "SupportFAQs")
+# Local state written by rag-setup/ingest_data.py (ingest stamps, indexes)
+KB_DATA_DIR = os.getenv(
+    "KB_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rag-setup", "index"),
+)
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2")
+# Storage for the local backend's matrix: "none" (float32) or "int8"
+KB_LOCAL_QUANTIZE = os.getenv("KB_LOCAL_QUANTIZE", "none").lower()
+
+# Hybrid retrieval: vector candidates fused with BM25 through reciprocal-rank fusion
+KB_HYBRID = os.getenv("KB_HYBRID", "true").lower() == "true"
+KB_TOP_K = int(os.getenv("KB_TOP_K", 2))
+KB_CANDIDATES = int(os.getenv("KB_CANDIDATES", 10))
+KB_RRF_K = int(os.getenv("KB_RRF_K", 60))
+
+# Retrieval engine connection pool
+KB_POOL_SIZE = int(os.getenv("KB_POOL_SIZE", 4))
+KB_POOL_TIMEOUT = float(os.getenv("KB_POOL_TIMEOUT", 10))
+KB_HEALTH_CHECK_INTERVAL = float(os.getenv("KB_HEALTH_CHECK_INTERVAL", 30))
+KB_RECONNECT_ATTEMPTS = int(os.getenv("KB_RECONNECT_ATTEMPTS", 5))
+KB_RECONNECT_BACKOFF = float(os.getenv("KB_RECONNECT_BACKOFF", 0.5))
+KB_RECONNECT_BACKOFF_MAX = float(os.getenv("KB_RECONNECT_BACKOFF_MAX", 8))
+
+# Query embedding cache (EMBED_CACHE_DIR enables the on-disk store)
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", 2048))
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", "")
+
+# Semantic answer cache (cosine distance threshold, entries, seconds)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_MAX_DISTANCE = float(os.getenv("ANSWER_CACHE_MAX_DISTANCE", 0.08))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", 512))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", 3600))
+# Seconds between checks of the ingest stamp (KB_DATA_DIR file and, for Weaviate,
+# the marker on the collection) that invalidates cached answers and reloads indexes
+KB_STAMP_CHECK_INTERVAL = float(os.getenv("KB_STAMP_CHECK_INTERVAL", 10))
+
+# ---------------------------
+# Support services (HTTP)
+# ---------------------------
+# Each service URL falls back to API_BASE_URL (the unified API) and then to
+# the per-service localhost port used in local development.
+
+def _service_url(env_var: str, port: int) -> str:
+    return (os.getenv(env_var) or os.getenv("API_BASE_URL") or f"http://localhost:{port}").rstrip("/")
+
+CUSTOMER_SERVICE_URL = _service_url("CUSTOMER_SERVICE_URL", 8000)
+TROUBLESHOOTING_SERVICE_URL = _service_url("TROUBLESHOOTING_SERVICE_URL", 8001)
+TICKETING_SERVICE_URL = _service_url("TICKETING_SERVICE_URL", 8002)
+DEVICE_SERVICE_URL = _service_url("DEVICE_SERVICE_URL", 8003)
+
+# Items per request for the /batch endpoints (the services accept at most 1000)
+SERVICE_BATCH_SIZE = int(os.getenv("SERVICE_BATCH_SIZE", 500))
+
+# Seconds the Reboot Device tool waits for the queued reboot to finish
+# (0 = return the queued job); keep below HTTP_READ_TIMEOUT
+DEVICE_REBOOT_WAIT = float(os.getenv("DEVICE_REBOOT_WAIT", 3))
+
+# Shared keep-alive transport
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 20))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 2))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 5))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", 0.2))
+HTTP_BACKOFF_JITTER = float(os.getenv("HTTP_BACKOFF_JITTER", 0.1))
+
+# ---------------------------
+# Background crew jobs
+# ---------------------------
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", 32))
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", 3600))
+# Reusable crews per process; defaults to one per job worker
+CREW_POOL_SIZE = int(os.getenv("CREW_POOL_SIZE", JOB_WORKERS))
+CREW_POOL_TIMEOUT = float(os.getenv("CREW_POOL_TIMEOUT", 300))
+# Progress events kept per job for streaming; token events beyond this are dropped
+JOB_MAX_EVENTS = int(os.getenv("JOB_MAX_EVENTS", 5000))
+
+# Independent tool calls (task prefetch, "Run Lookups In Parallel") share one
+# bounded pool per process; a batch waits at most TOOL_PARALLEL_TIMEOUT seconds.
+TOOL_PARALLELISM = int(os.getenv("TOOL_PARALLELISM", 8))
+TOOL_PARALLEL_TIMEOUT = float(os.getenv("TOOL_PARALLEL_TIMEOUT", 60))
+# Run the lookups a task declares under `prefetch:` (config/tasks.yaml) before the agent starts
+TOOL_PREFETCH = os.getenv("TOOL_PREFETCH", "true").lower() == "true"
+# Customer account IDs in inquiries, for prefetch arguments like {account_id}
+ACCOUNT_ID_PATTERN = os.getenv("ACCOUNT_ID_PATTERN", r"\bCUST\d+\b")
+
+# ---------------------------
+# LLM
+# ---------------------------
+
+# Stream LLM tokens to job progress (requires a streaming-capable model)
+LLM_STREAM = os.getenv("LLM_STREAM", "true").lower() == "true"
+
+# Sampling temperature for the agents' LLM; unset leaves the model default.
+# Completions are only cached at temperature 0, so set LLM_TEMPERATURE=0 to use the cache.
+_temperature = os.getenv("LLM_TEMPERATURE", "")
+LLM_TEMPERATURE = float(_temperature) if _temperature else None
+
+# Completion cache backend: "memory", "sqlite" or "off" (entries, seconds; 0 = no expiry)
+LLM_CACHE = os.getenv("LLM_CACHE", "memory").lower()
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", data_path("llm_cache.db"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 2048))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", 86400))
+
+# Tiered routing: aliases from litellm.config.json for the Tier 1 analyst
+# (every inquiry) and the Tier 2 specialist (escalations only). MAX_TOKENS caps
+# completion tokens per call (0 = model default); FALLBACKS are comma-separated
+# aliases tried in order when a call fails.
+def _aliases(value: str) -> list:
+    return [alias.strip() for alias in value.split(",") if alias.strip()]
+
+LLM_TIER1_MODEL = os.getenv("LLM_TIER1_MODEL", "tier1-llm")
+LLM_TIER1_MAX_TOKENS = int(os.getenv("LLM_TIER1_MAX_TOKENS", 1024)) or None
+LLM_TIER1_FALLBACKS = _aliases(os.getenv("LLM_TIER1_FALLBACKS", "tier2-llm"))
+LLM_TIER2_MODEL = os.getenv("LLM_TIER2_MODEL", "tier2-llm")
+LLM_TIER2_MAX_TOKENS = int(os.getenv("LLM_TIER2_MAX_TOKENS", 2048)) or None
+LLM_TIER2_FALLBACKS = _aliases(os.getenv("LLM_TIER2_FALLBACKS", ""))
+
+# Agent and task definitions (agents.yaml, tasks.yaml)
+CREW_CONFIG_DIR = os.getenv(
+    "CREW_CONFIG_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config")
+)
+
+# ---------------------------
+# Web search
+# ---------------------------
+
+# "tavily" (needs TAVILY_API_KEY, read on each search) or "stub" (offline,
+# deterministic results)
+WEB_SEARCH_BACKEND = os.getenv("WEB_SEARCH_BACKEND", "tavily").lower()
+WEB_SEARCH_DEPTH = os.getenv("WEB_SEARCH_DEPTH", "basic")
+# Results cached per normalized query and depth
+WEB_SEARCH_CACHE_SIZE = int(os.getenv("WEB_SEARCH_CACHE_SIZE", 1024))
+WEB_SEARCH_CACHE_TTL = float(os.getenv("WEB_SEARCH_CACHE_TTL", 3600))
+# Token bucket for backend calls: RATE per second (0 = unlimited), bursts of
+# BURST; a search waits at most MAX_WAIT seconds for a token
+WEB_SEARCH_RATE = float(os.getenv("WEB_SEARCH_RATE", 1))
+WEB_SEARCH_BURST = int(os.getenv("WEB_SEARCH_BURST", 5))
+WEB_SEARCH_MAX_WAIT = float(os.getenv("WEB_SEARCH_MAX_WAIT", 10))
+# Simulated round trip of the stub backend, in seconds
+WEB_SEARCH_STUB_LATENCY = float(os.getenv("WEB_SEARCH_STUB_LATENCY", 0))
+
+# ---------------------------
+# Start-up
+# ---------------------------
+
+# Pre-load the crew, embedding model and knowledge base before serving inquiries:
+# "off" loads everything on first use, "probe" starts on the first /ready call,
+# "startup" starts as soon as the process does. /ready answers 503 until done.
+WARMUP = os.getenv("WARMUP", "off").lower()
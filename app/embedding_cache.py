@@ -0,0 +1,313 @@
+# app/embedding_cache.py
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+from pydantic import PrivateAttr
+
+from app import config
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalizes a query so trivially different spellings share a cache entry."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text.strip(" .,!?;:'\"")
+
+
+def cache_key(model_name: str, text: str) -> str:
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+# ---------------------------
+# On-disk store
+# ---------------------------
+
+class DiskEmbeddingStore:
+    """
+    Append-only, memory-mapped float32 vector store that survives restarts.
+
+    Layout inside `directory`:
+      - meta.json   : model name and vector dimension
+      - vectors.f32 : row-major float32 matrix, one row per cached key
+      - keys.idx    : fixed-width hex keys, one per line, line N describes row N
+
+    Several processes may share a directory. Appends take an exclusive
+    flock on keys.idx and derive the row from the file size under that lock,
+    so writers never hand out the same row twice. The vector is written
+    before its key line, so a key is only ever visible with its vector.
+    """
+
+    GROWTH_ROWS = 1024
+    KEY_LINE = 65   # sha256 hex digest + newline
+
+    def __init__(self, directory: str, model_name: str):
+        self.directory = directory
+        self.model_name = model_name
+        self._lock = threading.Lock()
+        self._rows = {}
+        self._dim = None
+        self._vectors = None
+        self._capacity = 0
+        self._synced = 0   # rows of keys.idx already read into _rows
+
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._vec_path = os.path.join(directory, "vectors.f32")
+        self._key_path = os.path.join(directory, "keys.idx")
+        with self._locked_keys():
+            self._load()
+
+    @contextmanager
+    def _locked_keys(self):
+        with open(self._key_path, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield f
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r") as f:
+            meta = json.load(f)
+        if meta.get("model_name") != self.model_name:
+            # A different model wrote this store; its vectors are useless to us.
+            self._reset()
+            return
+        self._dim = meta["dim"]
+        self._sync()
+
+    def _reset(self):
+        for path in (self._meta_path, self._vec_path):
+            if os.path.exists(path):
+                os.remove(path)
+        # keys.idx is the lock file, so empty it instead of unlinking it
+        os.truncate(self._key_path, 0)
+
+    def _sync(self):
+        """Picks up rows other processes appended since the last call."""
+        with open(self._key_path, "rb") as f:
+            f.seek(self._synced * self.KEY_LINE)
+            data = f.read()
+        complete = len(data) // self.KEY_LINE
+        for n in range(complete):
+            key = data[n * self.KEY_LINE:(n + 1) * self.KEY_LINE - 1].decode("ascii")
+            self._rows.setdefault(key, self._synced + n)
+        self._synced += complete
+        if self._synced > self._capacity or self._vectors is None:
+            self._map(max(self._synced, 1))
+
+    def _refresh(self):
+        if self._dim is not None:
+            self._sync()
+        elif os.path.exists(self._meta_path):
+            # Another process created the store after we opened it
+            with self._locked_keys():
+                self._load()
+
+    def _map(self, min_rows: int):
+        capacity = max(self._capacity, self.GROWTH_ROWS)
+        while capacity < min_rows:
+            capacity *= 2
+        size = capacity * self._dim * 4
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        with open(self._vec_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self._vec_path, dtype=np.float32, mode="r+", shape=(capacity, self._dim))
+        self._capacity = capacity
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                self._refresh()
+                row = self._rows.get(key)
+            if row is None:
+                return None
+            return np.array(self._vectors[row])
+
+    def put(self, key: str, vector: np.ndarray):
+        if len(key) != self.KEY_LINE - 1:
+            raise ValueError(f"keys must be {self.KEY_LINE - 1} characters, got {len(key)}")
+        with self._lock, self._locked_keys() as keys:
+            if self._dim is None:
+                self._load()
+            if self._dim is None:
+                self._dim = int(vector.shape[0])
+                with open(self._meta_path, "w") as f:
+                    json.dump({"model_name": self.model_name, "dim": self._dim}, f)
+                self._map(1)
+            size = os.fstat(keys.fileno()).st_size
+            if size % self.KEY_LINE:
+                # A writer died mid-line; drop the torn tail before appending
+                size -= size % self.KEY_LINE
+                keys.truncate(size)
+            if self._synced * self.KEY_LINE < size:
+                self._sync()
+            if key in self._rows:
+                return
+            row = size // self.KEY_LINE
+            if row >= self._capacity:
+                self._map(row + 1)
+            self._vectors[row] = vector
+            self._vectors.flush()
+            keys.write(key.encode("ascii") + b"\n")
+            keys.flush()
+            self._rows[key] = row
+            self._synced = row + 1
+
+    def __len__(self):
+        return len(self._rows)
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+
+
+# ---------------------------
+# Two-level cache
+# ---------------------------
+
+class EmbeddingCache:
+    """
+    Content-hashed query embedding cache: bounded in-memory LRU in front of an
+    optional memory-mapped disk store. Keys combine the model name and the
+    normalized text, so different models never share vectors.
+    """
+
+    def __init__(self, model_name: str, capacity: int = 2048, disk_dir: Optional[str] = None):
+        self.model_name = model_name
+        self.capacity = capacity
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = DiskEmbeddingStore(os.path.join(disk_dir, _safe_name(model_name)), model_name) if disk_dir else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = cache_key(self.model_name, text)
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return vector
+        if self._disk is not None:
+            vector = self._disk.get(key)
+            if vector is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._remember(key, vector)
+                return vector
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, text: str, vector):
+        key = cache_key(self.model_name, text)
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self._remember(key, vector)
+        if self._disk is not None:
+            self._disk.put(key, vector)
+
+    def get_or_compute(self, text: str, compute: Callable[[str], Any]) -> np.ndarray:
+        vector = self.get(text)
+        if vector is None:
+            vector = np.asarray(compute(text), dtype=np.float32)
+            self.put(text, vector)
+        return vector
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "model_name": self.model_name,
+                "memory_entries": len(self._lru),
+                "disk_entries": len(self._disk) if self._disk is not None else 0,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            }
+
+    def flush(self):
+        if self._disk is not None:
+            self._disk.flush()
+
+
+def _safe_name(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+
+
+# ---------------------------
+# LlamaIndex adapter
+# ---------------------------
+
+class CachedEmbedding(BaseEmbedding):
+    """Wraps a LlamaIndex embedding model and serves query embeddings from an EmbeddingCache."""
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+
+    def __init__(self, inner: BaseEmbedding, cache: EmbeddingCache, **kwargs):
+        super().__init__(model_name=inner.model_name, embed_batch_size=inner.embed_batch_size, **kwargs)
+        self._inner = inner
+        self._cache = cache
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        return self._cache
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._cache.get_or_compute(query, self._inner.get_query_embedding).tolist()
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        vector = self._cache.get(query)
+        if vector is None:
+            vector = await self._inner.aget_query_embedding(query)
+            self._cache.put(query, vector)
+        return np.asarray(vector, dtype=np.float32).tolist()
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._inner.get_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._inner.get_text_embedding_batch(texts)
+
+
+def build_embed_model() -> CachedEmbedding:
+    """Builds the query embedding model used by the knowledge base, wrapped in the embedding cache."""
+    inner = HuggingFaceEmbedding(model_name=config.EMBEDDING_MODEL_NAME)
+    cache = EmbeddingCache(
+        config.EMBEDDING_MODEL_NAME,
+        capacity=config.EMBED_CACHE_SIZE,
+        disk_dir=config.EMBED_CACHE_DIR or None,
+    )
+    return CachedEmbedding(inner, cache)
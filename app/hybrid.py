@@ -0,0 +1,106 @@
+# app/hybrid.py
+
+import threading
+from typing import Dict, List, Optional
+
+from llama_index.core import VectorStoreIndex
+from llama_index.core.schema import NodeRelationship, NodeWithScore, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores import ExactMatchFilter, MetadataFilters
+
+from app import config
+from app.answer_cache import get_ingest_stamp
+from app.bm25 import BM25Index, bm25_path
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """Fuses several ranked lists of ids; ties keep first-seen order."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda item: scores[item], reverse=True)
+
+
+class HybridRetriever:
+    """
+    Combines vector search with the ingest-time BM25 index through
+    reciprocal-rank fusion. An optional category narrows both candidate
+    sets before any scoring happens: a metadata filter on the vector side,
+    and the category's own posting lists on the BM25 side.
+    """
+
+    def __init__(
+        self,
+        index_name: str = config.KB_INDEX_NAME,
+        top_k: int = config.KB_TOP_K,
+        candidates: int = config.KB_CANDIDATES,
+        rrf_k: int = config.KB_RRF_K,
+        use_bm25: bool = config.KB_HYBRID,
+    ):
+        self.index_name = index_name
+        self.top_k = top_k
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.use_bm25 = use_bm25
+        self._bm25 = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _keyword_index(self) -> Optional[BM25Index]:
+        if not self.use_bm25:
+            return None
+        stamp = get_ingest_stamp(self.index_name).current()
+        with self._lock:
+            if self._stamp != stamp:
+                self._bm25 = BM25Index.load(bm25_path(config.KB_DATA_DIR, self.index_name))
+                self._stamp = stamp
+            return self._bm25
+
+    def _prepare(self, index: VectorStoreIndex, category: Optional[str]):
+        filters = None
+        if category:
+            filters = MetadataFilters(filters=[ExactMatchFilter(key="category", value=category)])
+        bm25 = self._keyword_index()
+        vector_k = self.candidates if bm25 is not None else self.top_k
+        return index.as_retriever(similarity_top_k=vector_k, filters=filters), bm25
+
+    def retrieve(self, index: VectorStoreIndex, question: str, category: Optional[str] = None) -> List[NodeWithScore]:
+        retriever, bm25 = self._prepare(index, category)
+        return self._fuse(retriever.retrieve(question), bm25, question, category)
+
+    async def aretrieve(self, index: VectorStoreIndex, question: str, category: Optional[str] = None) -> List[NodeWithScore]:
+        retriever, bm25 = self._prepare(index, category)
+        return self._fuse(await retriever.aretrieve(question), bm25, question, category)
+
+    def _fuse(self, vector_hits, bm25: Optional[BM25Index], question: str, category: Optional[str]) -> List[NodeWithScore]:
+        if bm25 is None:
+            return vector_hits
+
+        # Fuse at document level; vector hits keep their own node, keyword-only
+        # hits are materialized from the text stored in the BM25 index.
+        by_doc = {}
+        vector_rank = []
+        for hit in vector_hits:
+            doc_id = hit.node.ref_doc_id or hit.node.node_id
+            if doc_id not in by_doc:
+                by_doc[doc_id] = hit
+                vector_rank.append(doc_id)
+
+        keyword_rank = []
+        for idx, score in bm25.search(question, self.candidates, category=category):
+            doc = bm25.docs[idx]
+            keyword_rank.append(doc["doc_id"])
+            if doc["doc_id"] not in by_doc:
+                by_doc[doc["doc_id"]] = NodeWithScore(node=_keyword_node(doc), score=score)
+
+        fused = reciprocal_rank_fusion([vector_rank, keyword_rank], k=self.rrf_k)
+        return [by_doc[doc_id] for doc_id in fused[: self.top_k]]
+
+
+def _keyword_node(doc: dict) -> TextNode:
+    return TextNode(
+        id_=f"{doc['doc_id']}-bm25",
+        text=doc["text"],
+        metadata={"id": doc["doc_id"], "title": doc["title"], "category": doc["category"]},
+        relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=doc["doc_id"])},
+    )
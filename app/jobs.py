@@ -0,0 +1,192 @@
+# app/jobs.py
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from app import config, streaming
+from app.telemetry import JOB_DURATION, JOB_WAIT
+from shared import tracing
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Event types added by the job itself; the rest come from app.streaming
+STATUS = "status"
+DONE = "done"
+
+
+class QueueFull(Exception):
+    """Raised by JobManager.submit when the queue-depth limit is reached."""
+
+
+@dataclass
+class Job:
+    job_id: str
+    inquiry: str
+    status: str = QUEUED
+    result: Optional[str] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    events: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+    max_events: int = field(default=config.JOB_MAX_EVENTS, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+    _changed: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until the job finishes or `timeout` elapses; returns whether it finished."""
+        return self._done.wait(timeout)
+
+    # --- Progress events ---
+
+    def emit(self, kind: str, data: Dict[str, Any]):
+        """Appends a progress event and wakes up readers waiting in events_since."""
+        with self._changed:
+            if kind == streaming.TOKEN and len(self.events) >= self.max_events:
+                return
+            self.events.append({"seq": len(self.events), "type": kind, "data": data, "ts": time.time()})
+            self._changed.notify_all()
+
+    def events_since(self, seq: int, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Returns events with sequence number >= `seq`, waiting up to `timeout`
+        for new ones. An empty list means the timeout elapsed or the job is
+        finished and fully read.
+        """
+        with self._changed:
+            if len(self.events) <= seq and not self._done.is_set():
+                self._changed.wait(timeout)
+            return self.events[seq:]
+
+    def streamed_text(self) -> str:
+        """LLM tokens received so far, concatenated."""
+        return "".join(e["data"]["text"] for e in list(self.events) if e["type"] == streaming.TOKEN)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs crew inquiries on a bounded worker pool.
+
+    At most `max_workers` inquiries run at once; at most `max_queue` more may
+    wait. Submissions beyond that raise QueueFull so callers can apply
+    backpressure (HTTP 429, "try again" in the UI) instead of piling up work.
+    Finished jobs are kept for `retention` seconds for polling.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[str], Any],
+        max_workers: int = config.JOB_WORKERS,
+        max_queue: int = config.JOB_MAX_QUEUE,
+        retention: float = config.JOB_RETENTION,
+    ):
+        self.runner = runner
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retention = retention
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crew-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+
+    def submit(self, inquiry: str) -> Job:
+        with self._lock:
+            self._prune()
+            if self._queued >= self.max_queue:
+                raise QueueFull(f"Job queue is full ({self.max_queue} waiting); try again shortly")
+            job = Job(job_id=uuid.uuid4().hex[:12], inquiry=inquiry)
+            self._jobs[job.job_id] = job
+            self._queued += 1
+        self._pool.submit(self._execute, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def _execute(self, job: Job):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        job.status = RUNNING
+        job.started_at = time.time()
+        JOB_WAIT.observe(job.started_at - job.submitted_at)
+        job.emit(STATUS, {"status": RUNNING})
+        try:
+            # Everything the crew emits on this thread lands in the job's event log
+            # Spans from this run carry the job id as their correlation id
+            with streaming.streaming_to(job.emit), tracing.correlation(job.job_id):
+                job.result = str(self.runner(job.inquiry))
+            job.status = SUCCEEDED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            JOB_DURATION.observe(job.finished_at - job.started_at, status=job.status)
+            with self._lock:
+                self._running -= 1
+            job.emit(DONE, {"status": job.status, "result": job.result, "error": job.error})
+            job._done.set()
+            with job._changed:
+                job._changed.notify_all()
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "queued": self._queued,
+                "running": self._running,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+
+def _run_inquiry(inquiry: str):
+    # Imported on first job so processes that only poll never build the crew
+    from app.agents import run
+    return run(inquiry)
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """The job manager behind the UI and the /jobs endpoints; inquiries run through app.agents.run on its workers."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = JobManager(_run_inquiry)
+    return _manager
@@ -0,0 +1,275 @@
+# app/llm_cache.py
+
+import functools
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app import config
+from shared.cache import LRUCache
+from shared.sqlite import ThreadConnections
+
+# Request parameters that change what the model returns; everything else
+# (api_base, timeouts, callbacks, stream) is left out of the key.
+KEYED_PARAMS = (
+    "temperature", "top_p", "n", "max_tokens", "max_completion_tokens", "stop", "seed",
+    "presence_penalty", "frequency_penalty", "logit_bias", "response_format", "tools", "tool_choice",
+)
+
+
+# ---------------------------
+# Keying
+# ---------------------------
+
+def normalize_content(content: Any) -> Any:
+    """Unifies line endings and strips trailing whitespace, which do not change the prompt's meaning."""
+    if isinstance(content, str):
+        lines = content.replace("\r\n", "\n").strip().split("\n")
+        return "\n".join(line.rstrip() for line in lines)
+    if isinstance(content, list):
+        return [normalize_content(part) for part in content]
+    if isinstance(content, dict):
+        return {key: normalize_content(value) for key, value in content.items()}
+    return content
+
+
+def normalize_messages(messages) -> list:
+    return [
+        {key: normalize_content(value) for key, value in message.items() if value is not None}
+        for message in messages
+    ]
+
+
+def completion_key(model: str, messages, params: Dict[str, Any]) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": normalize_messages(messages),
+            "params": {name: params[name] for name in KEYED_PARAMS if params.get(name) is not None},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cacheable(params: Dict[str, Any]) -> bool:
+    """Only deterministic, single-choice calls are cached."""
+    return (
+        params.get("temperature") == 0
+        and params.get("n") in (None, 1)
+        and not params.get("mock_response")
+    )
+
+
+# ---------------------------
+# Backends
+# ---------------------------
+
+class MemoryCompletionStore:
+    """Process-local LRU with TTL."""
+
+    def __init__(self, max_size: int = config.LLM_CACHE_SIZE, ttl: float = config.LLM_CACHE_TTL):
+        self._cache = LRUCache(max_size=max_size, ttl=ttl)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def put(self, key: str, model: str, text: str):
+        self._cache.put(key, text)
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+
+class SQLiteCompletionStore:
+    """
+    SQLite file shared by every process on the host and kept across restarts,
+    so replayed scenarios and regression runs hit the cache from the start.
+    Entries past `ttl` are ignored and purged; beyond `max_size` the least
+    recently used ones are deleted.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS completions (
+            key TEXT PRIMARY KEY,
+            model TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions (last_used);
+    """
+    EVICT_EVERY = 64
+
+    def __init__(self, path: str = config.LLM_CACHE_PATH, max_size: int = config.LLM_CACHE_SIZE, ttl: float = config.LLM_CACHE_TTL):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._puts = 0
+        self._conn = ThreadConnections(path)
+        self._conn().executescript(self.SCHEMA)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT response, created_at FROM completions WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.ttl and row[1] < now - self.ttl):
+            return None
+        conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, model: str, text: str):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO completions (key, model, response, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, model, text, now, now),
+        )
+        self._puts += 1
+        if self._puts % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self):
+        conn = self._conn()
+        if self.ttl:
+            conn.execute("DELETE FROM completions WHERE created_at < ?", (time.time() - self.ttl,))
+        conn.execute(
+            "DELETE FROM completions WHERE key IN "
+            "(SELECT key FROM completions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,),
+        )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM completions")
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+
+# ---------------------------
+# Cache in front of litellm.completion
+# ---------------------------
+
+class CompletionCache:
+    """
+    Serves repeated temperature-0 completions from a store.
+
+    A hit is replayed through LiteLLM's mock_response, so callers get a normal
+    response object (or stream of chunks when stream=True) without a model
+    call. Only plain-text answers are stored; tool-call responses always go
+    to the model.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def _count(self, attr: str):
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def complete(self, completion_fn, *args, **kwargs):
+        model = kwargs.get("model", args[0] if args else None)
+        messages = kwargs.get("messages", args[1] if len(args) > 1 else None)
+        if model is None or messages is None or not cacheable(kwargs):
+            self._count("bypassed")
+            return completion_fn(*args, **kwargs)
+
+        key = completion_key(model, messages, kwargs)
+        text = self.store.get(key)
+        if text is not None:
+            self._count("hits")
+            return completion_fn(*args, **{**kwargs, "mock_response": text})
+
+        self._count("misses")
+        response = completion_fn(*args, **kwargs)
+        if kwargs.get("stream"):
+            return _RecordingStream(response, lambda text: self.store.put(key, model, text))
+        message = response.choices[0].message
+        if message.content and not getattr(message, "tool_calls", None):
+            self.store.put(key, model, message.content)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.store),
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+class _RecordingStream:
+    """Passes stream chunks through and stores the assembled text once the stream completes."""
+
+    def __init__(self, stream, on_complete):
+        self._stream = stream
+        self._on_complete = on_complete
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __iter__(self):
+        parts = []
+        tool_calls = False
+        for chunk in self._stream:
+            choices = getattr(chunk, "choices", None) or []
+            delta = getattr(choices[0], "delta", None) if choices else None
+            if delta is not None:
+                tool_calls = tool_calls or bool(getattr(delta, "tool_calls", None))
+                if getattr(delta, "content", None):
+                    parts.append(delta.content)
+            yield chunk
+        if parts and not tool_calls:
+            self._on_complete("".join(parts))
+
+
+def create_completion_store(backend: str = config.LLM_CACHE):
+    if backend == "memory":
+        return MemoryCompletionStore()
+    if backend == "sqlite":
+        return SQLiteCompletionStore()
+    raise ValueError(f"Unknown LLM_CACHE '{backend}'")
+
+
+_cache: Optional[CompletionCache] = None
+_install_lock = threading.Lock()
+
+
+def install_llm_cache(backend: str = config.LLM_CACHE) -> Optional[CompletionCache]:
+    """
+    Wraps litellm.completion (which CrewAI calls for every agent step) with
+    the completion cache. Idempotent; returns None when LLM_CACHE is "off".
+    """
+    global _cache
+    with _install_lock:
+        if _cache is not None or backend == "off":
+            return _cache
+        import litellm
+
+        cache = CompletionCache(create_completion_store(backend))
+        original = litellm.completion
+
+        @functools.wraps(original)
+        def completion(*args, **kwargs):
+            return cache.complete(original, *args, **kwargs)
+
+        litellm.completion = completion
+        _cache = cache
+        return cache
+
+
+def get_llm_cache() -> Optional[CompletionCache]:
+    return _cache
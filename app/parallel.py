@@ -0,0 +1,181 @@
+# app/parallel.py
+
+import asyncio
+import contextvars
+import re
+import string
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from app import config
+
+# ---------------------------
+# Parallel tool execution
+# ---------------------------
+# A ReAct agent calls one tool per LLM step, so independent lookups (account
+# details and a knowledge base search, a troubleshooting guide and a web
+# search) run back to back. The executor runs such a batch at the same time
+# on a bounded pool and returns results in the order the calls were given,
+# whichever finishes first, so prompts and caches stay deterministic.
+
+
+@dataclass
+class ToolCall:
+    tool: str
+    args: Dict[str, Any] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        args = ", ".join(f"{name}={value!r}" for name, value in self.args.items())
+        return f"{self.tool}({args})"
+
+
+@dataclass
+class ToolResult:
+    call: ToolCall
+    output: str
+    seconds: float
+    error: Optional[str] = None
+
+
+def format_results(results: Sequence[ToolResult]) -> str:
+    """Merges results into one observation, numbered in call order."""
+    return "\n\n".join(
+        f"[{i}] {result.call.describe()}\n{result.output}" for i, result in enumerate(results, start=1)
+    )
+
+
+class ParallelToolExecutor:
+    """
+    Runs independent tool calls concurrently. Sync calls go to a thread pool
+    of `max_workers` shared by every crew in the process; async calls are
+    gathered on the running loop under a semaphore of the same size. Each
+    call runs in a copy of the caller's context, so progress events and
+    trace spans still reach the inquiry that made it.
+    """
+
+    def __init__(self, max_workers: int = config.TOOL_PARALLELISM, timeout: float = config.TOOL_PARALLEL_TIMEOUT):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    @staticmethod
+    def _resolve(tools: Dict[str, Any], call: ToolCall):
+        tool = tools.get(call.tool)
+        if tool is None:
+            return None, f"Unknown tool '{call.tool}'. Available: {', '.join(sorted(tools))}"
+        try:
+            args = tool.args_schema(**call.args).model_dump()
+        except Exception as e:
+            return None, f"Invalid arguments for {call.tool}: {e}"
+        return (tool, args), None
+
+    def _invoke(self, tools: Dict[str, Any], call: ToolCall) -> ToolResult:
+        started = time.perf_counter()
+        resolved, error = self._resolve(tools, call)
+        if error:
+            return ToolResult(call, error, 0.0, error=error)
+        tool, args = resolved
+        try:
+            output = tool._run(**args)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            output = f"{call.tool} failed: {e}"
+        return ToolResult(call, str(output), time.perf_counter() - started, error=error)
+
+    def run(self, tools: Dict[str, Any], calls: Sequence[ToolCall]) -> List[ToolResult]:
+        if len(calls) == 1:
+            return [self._invoke(tools, calls[0])]
+        futures = [
+            self._pool.submit(contextvars.copy_context().run, self._invoke, tools, call) for call in calls
+        ]
+        deadline = time.monotonic() + self.timeout
+        results = []
+        for call, future in zip(calls, futures):
+            try:
+                results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeout:
+                message = f"{call.tool} did not finish within {self.timeout:g}s"
+                results.append(ToolResult(call, message, self.timeout, error="timeout"))
+        return results
+
+    async def _ainvoke(self, tools: Dict[str, Any], call: ToolCall, limit: asyncio.Semaphore) -> ToolResult:
+        started = time.perf_counter()
+        resolved, error = self._resolve(tools, call)
+        if error:
+            return ToolResult(call, error, 0.0, error=error)
+        tool, args = resolved
+        async with limit:
+            try:
+                output = await asyncio.wait_for(tool._arun(**args), self.timeout)
+            except asyncio.TimeoutError:
+                error = "timeout"
+                output = f"{call.tool} did not finish within {self.timeout:g}s"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                output = f"{call.tool} failed: {e}"
+        return ToolResult(call, str(output), time.perf_counter() - started, error=error)
+
+    async def arun(self, tools: Dict[str, Any], calls: Sequence[ToolCall]) -> List[ToolResult]:
+        limit = asyncio.Semaphore(self.max_workers)
+        # gather() returns results in argument order
+        return list(await asyncio.gather(*(self._ainvoke(tools, call, limit) for call in calls)))
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ParallelToolExecutor:
+    """The executor shared by every crew, so TOOL_PARALLELISM bounds tool threads per process rather than per crew."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ParallelToolExecutor()
+    return _executor
+
+
+# ---------------------------
+# Task-declared prefetch
+# ---------------------------
+# A task in config/tasks.yaml may list lookups that do not depend on the
+# agent's reasoning under `prefetch:`, with arguments templated on values
+# taken from the inquiry ({inquiry}, {account_id}). They run in parallel
+# before the crew starts and reach the task through its {prefetched} input.
+# Calls whose placeholders have no value (no account ID in the inquiry) are
+# left for the agent.
+
+NOTHING_PREFETCHED = "No lookups were run in advance."
+_account_id = re.compile(config.ACCOUNT_ID_PATTERN)
+
+
+def inquiry_values(inquiry: str) -> Dict[str, Optional[str]]:
+    match = _account_id.search(inquiry)
+    return {"inquiry": inquiry, "account_id": match.group(0) if match else None}
+
+
+def _fill(template: Any, values: Dict[str, Optional[str]]) -> Any:
+    if not isinstance(template, str):
+        return template
+    names = [name for _, name, _, _ in string.Formatter().parse(template) if name]
+    if any(values.get(name) is None for name in names):
+        raise KeyError(template)
+    return template.format_map(values)
+
+
+def prefetch_calls(declared: Sequence[dict], values: Dict[str, Optional[str]]) -> List[ToolCall]:
+    calls = []
+    for entry in declared or ():
+        try:
+            args = {name: _fill(value, values) for name, value in (entry.get("args") or {}).items()}
+        except KeyError:
+            continue
+        calls.append(ToolCall(entry["tool"], args))
+    return calls
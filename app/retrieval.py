@@ -0,0 +1,478 @@
+# app/retrieval.py
+
+import asyncio
+import queue
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Optional
+
+import weaviate
+from llama_index.core import VectorStoreIndex, get_response_synthesizer
+from llama_index.vector_stores.weaviate import WeaviateVectorStore
+
+from app import config
+from app.answer_cache import SemanticAnswerCache, get_ingest_stamp, read_collection_stamp
+from app.embedding_cache import build_embed_model
+from app.hybrid import HybridRetriever
+from app.telemetry import KB_LATENCY
+from app.transport import close_with_loop
+from app.vector_index import LocalVectorIndex, LocalVectorStore
+from shared import tracing
+
+
+class RetrievalUnavailable(Exception):
+    """Raised when the knowledge base backend cannot serve a query."""
+
+
+class RetrievalEngine:
+    """
+    Long-lived, thread-safe retrieval engine shared by every KnowledgeBaseTool call.
+
+    Owns the query embedding model, the hybrid retriever, the response
+    synthesizer and the semantic answer cache; subclasses provide the vector
+    store backend through `_run_query`.
+    """
+
+    backend = None
+
+    def __init__(self, index_name: str = config.KB_INDEX_NAME):
+        self.index_name = index_name
+        self._lock = threading.Lock()
+        self._embed_model = None
+        self._synthesizer = None
+        self._retriever = HybridRetriever(index_name)
+        self._answer_cache = SemanticAnswerCache(index_name) if config.ANSWER_CACHE_ENABLED else None
+        self._closed = False
+
+    def _get_embed_model(self):
+        # The embedding model is loaded once and shared by every query engine.
+        with self._lock:
+            if self._embed_model is None:
+                self._embed_model = build_embed_model()
+            return self._embed_model
+
+    def _build_index(self, vector_store) -> VectorStoreIndex:
+        return VectorStoreIndex.from_vector_store(vector_store=vector_store, embed_model=self._get_embed_model())
+
+    def _get_synthesizer(self):
+        with self._lock:
+            if self._synthesizer is None:
+                self._synthesizer = get_response_synthesizer()
+            return self._synthesizer
+
+    def warm_up(self):
+        """Loads the embedding model and synthesizer and opens the vector store ahead of the first query."""
+        self._get_embed_model().get_query_embedding("warm-up")
+        self._get_synthesizer()
+        self._open_store()
+
+    def _open_store(self):
+        pass
+
+    def _answer(self, index: VectorStoreIndex, question: str, category: Optional[str]) -> str:
+        with tracing.span("kb.retrieve", backend=self.backend) as span:
+            nodes = self._retriever.retrieve(index, question, category=category)
+            span.set_attribute("nodes", len(nodes))
+        if not nodes:
+            return "Empty Response"
+        with tracing.span("kb.synthesize"):
+            return str(self._get_synthesizer().synthesize(question, nodes=nodes))
+
+    async def _aanswer(self, index: VectorStoreIndex, question: str, category: Optional[str]) -> str:
+        with tracing.span("kb.retrieve", backend=self.backend) as span:
+            nodes = await self._retriever.aretrieve(index, question, category=category)
+            span.set_attribute("nodes", len(nodes))
+        if not nodes:
+            return "Empty Response"
+        with tracing.span("kb.synthesize"):
+            return str(await self._get_synthesizer().asynthesize(question, nodes=nodes))
+
+    def _run_query(self, question: str, category: Optional[str]) -> str:
+        raise NotImplementedError
+
+    async def _arun_query(self, question: str, category: Optional[str]) -> str:
+        raise NotImplementedError
+
+    # --- Public API ---
+
+    def query(self, question: str, category: Optional[str] = None) -> str:
+        started = time.perf_counter()
+        with tracing.span("kb.query", backend=self.backend, category=category) as span:
+            answer, cache = self._query(question, category)
+            span.set_attribute("answer_cache", cache)
+        KB_LATENCY.observe(time.perf_counter() - started, backend=self.backend, answer_cache=cache)
+        return answer
+
+    def _query(self, question: str, category: Optional[str]):
+        """Returns (answer, answer cache outcome: "hit", "miss" or "off")."""
+        if self._closed:
+            raise RetrievalUnavailable("Retrieval engine is closed")
+
+        vector = stamp = None
+        if self._answer_cache is not None:
+            # A near-duplicate question skips both retrieval and LLM synthesis.
+            vector = self._get_embed_model().get_query_embedding(question)
+            answer, stamp = self._answer_cache.lookup(vector, scope=category or "")
+            if answer is not None:
+                return answer, "hit"
+
+        answer = self._run_query(question, category)
+
+        if vector is not None and answer.strip() and answer != "Empty Response":
+            self._answer_cache.put(vector, answer, scope=category or "", stamp=stamp)
+        return answer, "miss" if vector is not None else "off"
+
+    async def aquery(self, question: str, category: Optional[str] = None) -> str:
+        """Async variant of `query`; retrieval and synthesis run on the event loop."""
+        started = time.perf_counter()
+        with tracing.span("kb.query", backend=self.backend, category=category) as span:
+            answer, cache = await self._aquery(question, category)
+            span.set_attribute("answer_cache", cache)
+        KB_LATENCY.observe(time.perf_counter() - started, backend=self.backend, answer_cache=cache)
+        return answer
+
+    async def _aquery(self, question: str, category: Optional[str]):
+        if self._closed:
+            raise RetrievalUnavailable("Retrieval engine is closed")
+
+        vector = stamp = None
+        if self._answer_cache is not None:
+            vector = await self._get_embed_model().aget_query_embedding(question)
+            answer, stamp = self._answer_cache.lookup(vector, scope=category or "")
+            if answer is not None:
+                return answer, "hit"
+
+        answer = await self._arun_query(question, category)
+
+        if vector is not None and answer.strip() and answer != "Empty Response":
+            self._answer_cache.put(vector, answer, scope=category or "", stamp=stamp)
+        return answer, "miss" if vector is not None else "off"
+
+    def stats(self) -> dict:
+        embed_model = self._embed_model
+        return {
+            "backend": self.backend,
+            "embedding_cache": embed_model.cache.stats() if embed_model is not None else None,
+            "answer_cache": self._answer_cache.stats() if self._answer_cache is not None else None,
+        }
+
+    def close(self):
+        self._closed = True
+        if self._embed_model is not None:
+            self._embed_model.cache.flush()
+
+
+# ---------------------------
+# Weaviate backend
+# ---------------------------
+
+class _Connection:
+    """A pooled Weaviate client together with the index built on top of it."""
+
+    def __init__(self, client, index):
+        self.client = client
+        self.index = index
+        self.last_checked = time.monotonic()
+
+    def close(self):
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+
+class WeaviateRetrievalEngine(RetrievalEngine):
+    """
+    Keeps a bounded pool of Weaviate connections. Each connection gets its
+    vector store and index built once, when the connection is
+    opened. Connections are health-checked on checkout and reopened with
+    exponential backoff when the check fails.
+    """
+
+    backend = "weaviate"
+
+    def __init__(
+        self,
+        index_name: str = config.KB_INDEX_NAME,
+        pool_size: int = config.KB_POOL_SIZE,
+        pool_timeout: float = config.KB_POOL_TIMEOUT,
+        health_check_interval: float = config.KB_HEALTH_CHECK_INTERVAL,
+    ):
+        super().__init__(index_name)
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.health_check_interval = health_check_interval
+
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._open = 0
+        # event loop -> [asyncio.Lock, _Connection | None, closer]; async clients multiplex, one per loop is enough
+        self._async_slots = weakref.WeakKeyDictionary()
+        # Re-ingests are also signalled on the collection, for replicas that do not share KB_DATA_DIR
+        get_ingest_stamp(index_name).attach_remote(self._read_collection_stamp)
+
+    # --- Connection lifecycle ---
+
+    def _connect(self) -> _Connection:
+        client = weaviate.connect_to_local(
+            host=config.WEAVIATE_HOST,
+            port=config.WEAVIATE_PORT,
+            grpc_port=config.WEAVIATE_GRPC_PORT,
+        )
+        try:
+            store = WeaviateVectorStore(weaviate_client=client, index_name=self.index_name)
+            index = self._build_index(store)
+        except Exception:
+            client.close()
+            raise
+        return _Connection(client, index)
+
+    def _connect_with_backoff(self) -> _Connection:
+        delay = config.KB_RECONNECT_BACKOFF
+        last_error = None
+        for attempt in range(config.KB_RECONNECT_ATTEMPTS):
+            try:
+                return self._connect()
+            except Exception as e:
+                last_error = e
+                if attempt + 1 < config.KB_RECONNECT_ATTEMPTS:
+                    time.sleep(delay)
+                    delay = min(delay * 2, config.KB_RECONNECT_BACKOFF_MAX)
+        raise RetrievalUnavailable(
+            f"Could not connect to Weaviate after {config.KB_RECONNECT_ATTEMPTS} attempts: {last_error}"
+        )
+
+    def _is_healthy(self, conn: _Connection) -> bool:
+        if time.monotonic() - conn.last_checked < self.health_check_interval:
+            return True
+        try:
+            healthy = conn.client.is_ready()
+        except Exception:
+            healthy = False
+        conn.last_checked = time.monotonic()
+        return healthy
+
+    def _acquire(self) -> _Connection:
+        if self._closed:
+            raise RetrievalUnavailable("Retrieval engine is closed")
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                can_open = self._open < self.pool_size
+                if can_open:
+                    self._open += 1
+            if can_open:
+                try:
+                    return self._connect_with_backoff()
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+            try:
+                conn = self._idle.get(timeout=self.pool_timeout)
+            except queue.Empty:
+                raise RetrievalUnavailable("Timed out waiting for a Weaviate connection")
+
+        if not self._is_healthy(conn):
+            conn.close()
+            try:
+                conn = self._connect_with_backoff()
+            except Exception:
+                with self._lock:
+                    self._open -= 1
+                raise
+        return conn
+
+    def _release(self, conn: _Connection, broken: bool = False):
+        if broken or self._closed:
+            conn.close()
+            with self._lock:
+                self._open -= 1
+            return
+        self._idle.put_nowait(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        broken = False
+        try:
+            yield conn
+        except weaviate.exceptions.WeaviateBaseError:
+            broken = True
+            raise
+        finally:
+            self._release(conn, broken=broken)
+
+    def _open_store(self):
+        with self.connection():
+            pass
+
+    def _read_collection_stamp(self) -> str:
+        with self.connection() as conn:
+            return read_collection_stamp(conn.client, self.index_name)
+
+    def _run_query(self, question: str, category: Optional[str]) -> str:
+        with self.connection() as conn:
+            return self._answer(conn.index, question, category)
+
+    # --- Async connection (one WeaviateAsyncClient per event loop) ---
+
+    async def _aconnect(self) -> _Connection:
+        client = weaviate.use_async_with_local(
+            host=config.WEAVIATE_HOST,
+            port=config.WEAVIATE_PORT,
+            grpc_port=config.WEAVIATE_GRPC_PORT,
+        )
+        await client.connect()
+        try:
+            store = WeaviateVectorStore(weaviate_client=client, index_name=self.index_name)
+            index = self._build_index(store)
+        except Exception:
+            await client.close()
+            raise
+        return _Connection(client, index)
+
+    async def _aconnect_with_backoff(self) -> _Connection:
+        delay = config.KB_RECONNECT_BACKOFF
+        last_error = None
+        for attempt in range(config.KB_RECONNECT_ATTEMPTS):
+            try:
+                return await self._aconnect()
+            except Exception as e:
+                last_error = e
+                if attempt + 1 < config.KB_RECONNECT_ATTEMPTS:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, config.KB_RECONNECT_BACKOFF_MAX)
+        raise RetrievalUnavailable(
+            f"Could not connect to Weaviate after {config.KB_RECONNECT_ATTEMPTS} attempts: {last_error}"
+        )
+
+    async def _aacquire(self) -> _Connection:
+        loop = asyncio.get_running_loop()
+        slot = self._async_slots.get(loop)
+        if slot is None:
+            slot = self._async_slots[loop] = [asyncio.Lock(), None, None]
+            slot[2] = close_with_loop(lambda: self._aclose_slot(slot))
+        async with slot[0]:
+            conn = slot[1]
+            if conn is not None and time.monotonic() - conn.last_checked >= self.health_check_interval:
+                try:
+                    healthy = await conn.client.is_ready()
+                except Exception:
+                    healthy = False
+                conn.last_checked = time.monotonic()
+                if not healthy:
+                    try:
+                        await conn.client.close()
+                    except Exception:
+                        pass
+                    conn = slot[1] = None
+            if conn is None:
+                conn = slot[1] = await self._aconnect_with_backoff()
+            return conn
+
+    @staticmethod
+    async def _aclose_slot(slot):
+        conn, slot[1] = slot[1], None
+        if conn is not None:
+            try:
+                await conn.client.close()
+            except Exception:
+                pass
+
+    async def _arun_query(self, question: str, category: Optional[str]) -> str:
+        if self._closed:
+            raise RetrievalUnavailable("Retrieval engine is closed")
+        conn = await self._aacquire()
+        return await self._aanswer(conn.index, question, category)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(open_connections=self._open, idle_connections=self._idle.qsize())
+        return stats
+
+    def close(self):
+        super().close()
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._open -= 1
+
+
+# ---------------------------
+# Local (NumPy) backend
+# ---------------------------
+
+class LocalRetrievalEngine(RetrievalEngine):
+    """
+    Serves the knowledge base from the memory-mapped LocalVectorIndex written
+    by `ingest_data.py --backend local`. No network connections are involved;
+    the index is remapped when the ingest stamp changes.
+    """
+
+    backend = "local"
+
+    def __init__(self, index_name: str = config.KB_INDEX_NAME, directory: str = config.KB_DATA_DIR):
+        super().__init__(index_name)
+        self.directory = directory
+        self._index = None
+        self._vector_index = None
+        self._stamp = None
+        self._reload_lock = threading.Lock()
+
+    def _current(self):
+        stamp = get_ingest_stamp(self.index_name).current()
+        with self._reload_lock:
+            if self._vector_index is None or stamp != self._stamp:
+                index = LocalVectorIndex(self.directory, self.index_name)
+                if not index.exists():
+                    raise RetrievalUnavailable(
+                        f"No local index '{self.index_name}' in {self.directory}; run ingest_data.py --backend local"
+                    )
+                self._vector_index = self._build_index(LocalVectorStore(index))
+                self._index = index
+                self._stamp = stamp
+            return self._vector_index
+
+    def _open_store(self):
+        self._current()
+
+    def _run_query(self, question: str, category: Optional[str]) -> str:
+        return self._answer(self._current(), question, category)
+
+    async def _arun_query(self, question: str, category: Optional[str]) -> str:
+        return await self._aanswer(self._current(), question, category)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats.update(documents=len(self._index) if self._index is not None else 0)
+        return stats
+
+
+_BACKENDS = {
+    "weaviate": WeaviateRetrievalEngine,
+    "local": LocalRetrievalEngine,
+}
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> RetrievalEngine:
+    """The KB_BACKEND retrieval engine shared by every KnowledgeBaseTool; raises RetrievalUnavailable for an unknown backend."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if config.KB_BACKEND not in _BACKENDS:
+                    raise RetrievalUnavailable(f"Unknown KB_BACKEND '{config.KB_BACKEND}'")
+                _engine = _BACKENDS[config.KB_BACKEND]()
+    return _engine
@@ -0,0 +1,113 @@
+# app/routing.py
+
+import functools
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app import config
+from app.telemetry import LLM_FALLBACKS
+
+# ---------------------------
+# Model tiers
+# ---------------------------
+# Every inquiry starts with the Tier 1 analyst on a small, fast model; the
+# Tier 2 specialist (larger model) only runs when Tier 1 escalates. Models
+# are aliases from litellm.config.json.
+
+TIER_1 = "tier_1"
+TIER_2 = "tier_2"
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    name: str
+    model: str
+    # Completion token budget per LLM call (None = model default)
+    max_tokens: Optional[int] = None
+    # Aliases tried in order when a call to `model` fails
+    fallbacks: List[str] = field(default_factory=list)
+
+
+TIERS: Dict[str, ModelTier] = {
+    TIER_1: ModelTier(TIER_1, config.LLM_TIER1_MODEL, config.LLM_TIER1_MAX_TOKENS, config.LLM_TIER1_FALLBACKS),
+    TIER_2: ModelTier(TIER_2, config.LLM_TIER2_MODEL, config.LLM_TIER2_MAX_TOKENS, config.LLM_TIER2_FALLBACKS),
+}
+
+
+# ---------------------------
+# Escalation
+# ---------------------------
+# The Tier 1 task ends its answer with "Escalate: yes" or "Escalate: no"
+# (see config/tasks.yaml); the Tier 2 task is a ConditionalTask on it.
+
+_ESCALATE = re.compile(r"escalate\W{0,3}\s*:\s*\W{0,3}(yes|no)\b", re.I)
+
+
+def needs_escalation(output) -> bool:
+    """
+    True when the Tier 1 output asks for Tier 2. A missing or unreadable
+    marker escalates, so a model that ignores the format never drops an issue.
+    """
+    text = getattr(output, "raw", output) or ""
+    matches = _ESCALATE.findall(str(text))
+    if not matches:
+        return True
+    return matches[-1].lower() == "yes"
+
+
+# ---------------------------
+# Fallbacks
+# ---------------------------
+# Wraps litellm.completion so a failing call to a tier's model is retried on
+# that tier's fallback aliases. Installed between the instrumentation and the
+# completion cache: every attempt is measured under the model actually used,
+# and the cache stores the answer under the alias that was requested.
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def fallback_chains() -> Dict[str, List[str]]:
+    return {tier.model: list(tier.fallbacks) for tier in TIERS.values() if tier.fallbacks}
+
+
+def with_fallbacks(completion, chains: Dict[str, List[str]]):
+    """Wraps a litellm-style completion function so failed calls to a model in `chains` retry on its fallbacks."""
+
+    @functools.wraps(completion)
+    def wrapper(*args, **kwargs):
+        model = kwargs.get("model", args[0] if args else None)
+        chain = chains.get(model)
+        if not chain or kwargs.get("mock_response"):
+            return completion(*args, **kwargs)
+        try:
+            return completion(*args, **kwargs)
+        except Exception as error:
+            last_error = error
+        for fallback in chain:
+            LLM_FALLBACKS.inc(model=str(model), fallback=fallback)
+            if args:
+                attempt_args, attempt_kwargs = (fallback,) + args[1:], kwargs
+            else:
+                attempt_args, attempt_kwargs = args, {**kwargs, "model": fallback}
+            try:
+                return completion(*attempt_args, **attempt_kwargs)
+            except Exception as error:
+                last_error = error
+        raise last_error
+
+    return wrapper
+
+
+def install_model_fallbacks():
+    """Wraps litellm.completion with per-tier model fallbacks. Idempotent."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        import litellm
+
+        litellm.completion = with_fallbacks(litellm.completion, fallback_chains())
+        _installed = True
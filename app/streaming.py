@@ -0,0 +1,99 @@
+# app/streaming.py
+
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+# ---------------------------
+# Progress events
+# ---------------------------
+# Crew code emits progress events (agent steps, tool calls, LLM tokens) with
+# `emit`. Whoever runs the crew decides where they go by wrapping the run in
+# `streaming_to(sink)`; outside of that, emitting is a cheap no-op.
+
+STEP = "step"
+TASK = "task"
+TOOL_START = "tool_start"
+TOOL_END = "tool_end"
+TOKEN = "token"
+
+_MAX_TEXT = 2000
+
+_sink: contextvars.ContextVar[Optional[Callable[[str, dict], None]]] = contextvars.ContextVar(
+    "stream_sink", default=None
+)
+
+
+def emit(kind: str, **data: Any):
+    sink = _sink.get()
+    if sink is not None:
+        sink(kind, data)
+
+
+def streaming() -> bool:
+    return _sink.get() is not None
+
+
+@contextmanager
+def streaming_to(sink: Callable[[str, dict], None]):
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+def clip(value: Any) -> str:
+    text = str(value)
+    return text if len(text) <= _MAX_TEXT else text[:_MAX_TEXT] + "…"
+
+
+# ---------------------------
+# CrewAI hooks
+# ---------------------------
+
+def step_callback(step: Any):
+    """Crew step_callback: forwards each agent thought/action as a step event."""
+    if not streaming():
+        return
+    emit(
+        STEP,
+        thought=clip(getattr(step, "thought", "") or ""),
+        tool=getattr(step, "tool", None),
+        output=clip(getattr(step, "output", None) or getattr(step, "result", None) or getattr(step, "text", "")),
+    )
+
+
+def task_callback(output: Any):
+    """Crew task_callback: reports each finished task."""
+    if not streaming():
+        return
+    emit(TASK, agent=getattr(output, "agent", None), summary=clip(getattr(output, "raw", output)))
+
+
+_listener_lock = threading.Lock()
+_listener_installed = False
+
+
+def install_llm_stream_listener():
+    """
+    Forwards LLM stream chunks from the CrewAI event bus as token events.
+
+    Only takes effect when the agent's LLM is created with stream=True. Safe to
+    call more than once; does nothing on CrewAI versions without the event bus.
+    """
+    global _listener_installed
+    with _listener_lock:
+        if _listener_installed:
+            return
+        try:
+            from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+        except ImportError:
+            return
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def _on_chunk(source, event):
+            emit(TOKEN, text=event.chunk)
+
+        _listener_installed = True
@@ -0,0 +1,181 @@
+# app/telemetry.py
+
+import functools
+import sys
+import threading
+import time
+
+from shared import metrics, tracing
+
+# ---------------------------
+# Agent-side metrics
+# ---------------------------
+
+TOOL_LATENCY = metrics.histogram("tool_call_duration_seconds", "Agent tool call latency.", ("tool",))
+KB_LATENCY = metrics.histogram(
+    "kb_query_duration_seconds", "Knowledge base query latency.", ("backend", "answer_cache")
+)
+LLM_REQUESTS = metrics.counter("llm_requests_total", "LLM completions.", ("model", "cache_hit", "status"))
+LLM_LATENCY = metrics.histogram("llm_request_duration_seconds", "LLM completion latency.", ("model",))
+LLM_TOKENS = metrics.counter("llm_tokens_total", "LLM tokens processed.", ("model", "kind"))
+LLM_TOKENS_PER_SECOND = metrics.histogram(
+    "llm_tokens_per_second", "Completion tokens per second per LLM call.", ("model",),
+    buckets=(1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250, 500),
+)
+LLM_FALLBACKS = metrics.counter("llm_fallbacks_total", "LLM calls retried on a fallback model.", ("model", "fallback"))
+WEB_SEARCHES = metrics.counter(
+    "web_searches_total", "Web searches by how they were answered.", ("backend", "outcome")
+)
+CREW_RUNS = metrics.counter("crew_runs_total", "Crew runs by the highest support tier that ran.", ("tier",))
+JOB_DURATION = metrics.histogram("crew_job_duration_seconds", "Crew job run time.", ("status",))
+JOB_WAIT = metrics.histogram("crew_job_queue_wait_seconds", "Time crew jobs spend queued.")
+
+
+def _job_depth():
+    jobs = sys.modules.get("app.jobs")
+    manager = getattr(jobs, "_manager", None)
+    if manager is None:
+        return None
+    stats = manager.stats()
+    return {("queued",): stats["queued"], ("running",): stats["running"]}
+
+
+def _cache_stats():
+    # Only report caches that already exist; never import or build them here
+    found = {}
+    llm_cache = sys.modules.get("app.llm_cache")
+    if llm_cache is not None and llm_cache.get_llm_cache() is not None:
+        found["llm"] = llm_cache.get_llm_cache().stats()
+    retrieval = sys.modules.get("app.retrieval")
+    engine = getattr(retrieval, "_engine", None)
+    if engine is not None:
+        stats = engine.stats()
+        for name in ("embedding_cache", "answer_cache"):
+            if stats.get(name):
+                found[name.replace("_cache", "")] = stats[name]
+    web_search = getattr(sys.modules.get("app.web_search"), "_search", None)
+    if web_search is not None:
+        found["web_search"] = web_search.stats()["cache"]
+    return found
+
+
+metrics.gauge("crew_jobs", "Crew jobs by state (queue depth).", ("state",), function=_job_depth)
+metrics.gauge(
+    "cache_hit_ratio", "Hit ratio per cache since process start.", ("cache",),
+    function=lambda: {(name,): stats["hit_rate"] for name, stats in _cache_stats().items()},
+)
+metrics.gauge(
+    "cache_entries", "Entries held per cache.", ("cache",),
+    function=lambda: {(name,): stats["entries"] for name, stats in _cache_stats().items()},
+)
+
+
+# ---------------------------
+# LLM completion instrumentation
+# ---------------------------
+# CrewAI sends every agent step through litellm.completion, so wrapping it
+# yields request/token metrics and, with tracing on, one `llm.completion`
+# span per call. Installed before the completion cache so cache hits
+# (replayed via mock_response) are counted with cache_hit=true.
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install_llm_instrumentation():
+    """Wraps litellm.completion with metrics and span instrumentation. Idempotent."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        import litellm
+
+        original = litellm.completion
+
+        @functools.wraps(original)
+        def completion(*args, **kwargs):
+            model = str(kwargs.get("model", args[0] if args else None))
+            cache_hit = bool(kwargs.get("mock_response"))
+            span = tracing.start_span(
+                "llm.completion",
+                model=model,
+                stream=bool(kwargs.get("stream")),
+                temperature=kwargs.get("temperature"),
+                cache_hit=cache_hit,
+            )
+            call = _LLMCall(model, cache_hit, span)
+            try:
+                response = original(*args, **kwargs)
+            except Exception as e:
+                call.finish(None, error=e)
+                raise
+            if kwargs.get("stream"):
+                return _InstrumentedStream(response, call)
+            call.finish(getattr(response, "usage", None))
+            return response
+
+        litellm.completion = completion
+        _installed = True
+
+
+class _LLMCall:
+    """Timing and token accounting for one completion, recorded once it finishes."""
+
+    def __init__(self, model: str, cache_hit: bool, span):
+        self.model = model
+        self.cache_hit = cache_hit
+        self.span = span
+        self.started = time.perf_counter()
+
+    def finish(self, usage, error=None, chunks=None):
+        seconds = time.perf_counter() - self.started
+        status = "error" if error is not None else "ok"
+        LLM_REQUESTS.inc(model=self.model, cache_hit=str(self.cache_hit).lower(), status=status)
+        if error is None and not self.cache_hit:
+            LLM_LATENCY.observe(seconds, model=self.model)
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            # Streams without usage data: each chunk is roughly one token
+            completion_tokens = getattr(usage, "completion_tokens", None) or chunks
+            if prompt_tokens:
+                LLM_TOKENS.inc(prompt_tokens, model=self.model, kind="prompt")
+            if completion_tokens:
+                LLM_TOKENS.inc(completion_tokens, model=self.model, kind="completion")
+                if seconds > 0:
+                    LLM_TOKENS_PER_SECOND.observe(completion_tokens / seconds, model=self.model)
+                    self.span.set_attribute("tokens_per_second", round(completion_tokens / seconds, 2))
+            self.span.set_attributes(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=getattr(usage, "total_tokens", None),
+            )
+        if chunks is not None:
+            self.span.set_attribute("chunks", chunks)
+        tracing.end_span(self.span, error)
+
+
+class _InstrumentedStream:
+    """Finishes the completion record once the stream is consumed, adding time to first chunk."""
+
+    def __init__(self, stream, call: _LLMCall):
+        self._stream = stream
+        self._call = call
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __iter__(self):
+        chunks = 0
+        usage = None
+        try:
+            for chunk in self._stream:
+                if chunks == 0:
+                    self._call.span.set_attribute(
+                        "time_to_first_chunk_ms", round((time.perf_counter() - self._call.started) * 1000, 2)
+                    )
+                chunks += 1
+                usage = getattr(chunk, "usage", None) or usage
+                yield chunk
+        except Exception as e:
+            self._call.finish(usage, error=e, chunks=chunks)
+            raise
+        self._call.finish(usage, chunks=chunks)
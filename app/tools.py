@@ -1,15 +1,21 @@
 # app/tools.py
 
-import os
+import asyncio
 import json
+import time
+import functools
+import httpx
 import requests
-import weaviate
-from typing import Type
-from pydantic import BaseModel, Field
+from urllib.parse import quote
+from typing import Any, ClassVar, Dict, List, Optional, Type
+from pydantic import BaseModel, Field, PrivateAttr
 from crewai.tools.base_tool import BaseTool
-from llama_index.core import VectorStoreIndex
-from llama_index.vector_stores.weaviate import WeaviateVectorStore
-from tavily import TavilyClient
+from app import config, streaming
+from shared import tracing
+from app.parallel import ToolCall, format_results, get_executor
+from app.telemetry import TOOL_LATENCY
+from app.transport import get_async_transport, get_transport
+from app.web_search import SearchUnavailable, get_web_search
 
 # ---------------------------
 # 1. Argument Schemas
@@ -17,12 +23,13 @@ from tavily import TavilyClient
 
 class KnowledgeBaseInput(BaseModel):
     question: str = Field(..., description="User's question for the knowledge base.")
+    category: Optional[str] = Field(None, description="Optional FAQ category to search within, e.g. 'network' or 'account'.")
 
 class CustomerDetailsInput(BaseModel):
     account_id: str = Field(..., description="Customer's unique account ID.")
 
 class TroubleshootingInput(BaseModel):
-    issue_type: str = Field(..., description="Issue type, e.g. 'login_issue'.")
+    issue_type: str = Field(..., description="Issue type or a short description, e.g. 'login_issue' or 'slow internet'.")
 
 class TicketingInput(BaseModel):
     customer_id: str = Field(..., description="Customer's unique account ID.")
@@ -34,101 +41,300 @@ class DeviceRebootInput(BaseModel):
 class TavilySearchInput(BaseModel):
     query: str = Field(..., description="Web search query string.")
 
+class ToolCallInput(BaseModel):
+    tool: str = Field(..., description="Name of the tool to call, e.g. 'Get Customer Details'.")
+    arguments: Dict[str, Any] = Field(default_factory=dict, description="That tool's arguments.")
+
+class ParallelLookupInput(BaseModel):
+    calls: List[ToolCallInput] = Field(..., description="Independent lookups to run at the same time.")
+
+
+# ---------------------------
+# 2. Batch helpers
+# ---------------------------
+# Used by the service tools' run_batch methods (nightly reconciliation, bulk
+# ticket import) to hit the /batch endpoints instead of one call per item.
+
+def _post_batch(url: str, field: str, items: list, headers: Optional[Dict[str, str]] = None) -> List[Dict]:
+    results = []
+    for start in range(0, len(items), config.SERVICE_BATCH_SIZE):
+        r = get_transport().post(url, json={field: items[start:start + config.SERVICE_BATCH_SIZE]}, headers=headers)
+        r.raise_for_status()
+        results.extend(r.json())
+    return results
+
+
+def _detail(response) -> str:
+    # FastAPI error bodies carry the reason (and, for guides, the closest matches) in "detail"
+    try:
+        return str(response.json().get("detail"))
+    except ValueError:
+        return f"HTTP {response.status_code}"
+
 
 # ---------------------------
-# 2. Tool Implementations
+# 3. Tool Implementations
 # ---------------------------
 
-class KnowledgeBaseTool(BaseTool):
+def _finish(tool, result, started: float):
+    seconds = time.perf_counter() - started
+    TOOL_LATENCY.observe(seconds, tool=tool.name)
+    streaming.emit(streaming.TOOL_END, tool=tool.name, output=streaming.clip(result), seconds=seconds)
+
+def _observed(run):
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        streaming.emit(streaming.TOOL_START, tool=self.name, args=kwargs)
+        started = time.perf_counter()
+        with tracing.span("tool.run", tool=self.name) as span:
+            result = run(self, *args, **kwargs)
+            span.set_attribute("output_chars", len(str(result)))
+        _finish(self, result, started)
+        return result
+    return wrapper
+
+def _observed_async(arun):
+    @functools.wraps(arun)
+    async def wrapper(self, *args, **kwargs):
+        streaming.emit(streaming.TOOL_START, tool=self.name, args=kwargs)
+        started = time.perf_counter()
+        with tracing.span("tool.run", tool=self.name) as span:
+            result = await arun(self, *args, **kwargs)
+            span.set_attribute("output_chars", len(str(result)))
+        _finish(self, result, started)
+        return result
+    return wrapper
+
+class SupportTool(BaseTool):
+    """Base for the support tools; reports each invocation to the progress stream."""
+
+    # Read-only lookups that may run alongside other calls (see app/parallel.py)
+    parallel_safe: ClassVar[bool] = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Wrap _run/_arun themselves: CrewAI invokes them through the structured tool, not via run()
+        if "_run" in cls.__dict__:
+            cls._run = _observed(cls.__dict__["_run"])
+        if "_arun" in cls.__dict__:
+            cls._arun = _observed_async(cls.__dict__["_arun"])
+
+class KnowledgeBaseTool(SupportTool):
     name: str = "Knowledge Base Search"
-    description: str = "Searches FAQs using a vector database."
+    description: str = "Searches FAQs using hybrid keyword and vector search, optionally within one category."
     args_schema: Type[BaseModel] = KnowledgeBaseInput
+    parallel_safe: ClassVar[bool] = True
 
-    def _run(self, question: str) -> str:
-        client = None
+    def _run(self, question: str, category: Optional[str] = None) -> str:
         try:
-            client = weaviate.connect_to_local()
-            store = WeaviateVectorStore(weaviate_client=client, index_name="SupportFAQs")
-            index = VectorStoreIndex.from_vector_store(vector_store=store)
-            engine = index.as_query_engine()
-            response = engine.query(question)
-            return str(response)
+            # Shared engine: pooled connections, index and query engine are built once per process.
+            # Imported here so weaviate/llama_index/torch load on the first KB query, not at startup.
+            from app.retrieval import get_engine
+            return get_engine().query(question, category=category)
         except Exception as e:
             return f"Knowledge base query failed: {e}"
-        finally:
-            if client:
-                client.close()
 
-class CustomerDetailsTool(BaseTool):
+    async def _arun(self, question: str, category: Optional[str] = None) -> str:
+        try:
+            from app.retrieval import get_engine
+            return await get_engine().aquery(question, category=category)
+        except Exception as e:
+            return f"Knowledge base query failed: {e}"
+
+class CustomerDetailsTool(SupportTool):
     name: str = "Get Customer Details"
     description: str = "Fetches customer account details."
     args_schema: Type[BaseModel] = CustomerDetailsInput
+    parallel_safe: ClassVar[bool] = True
 
     def _run(self, account_id: str) -> str:
-        url = f"http://localhost:8000/account_status/{account_id}"
+        url = f"{config.CUSTOMER_SERVICE_URL}/account_status/{account_id}"
         try:
-            r = requests.get(url, timeout=5)
+            r = get_transport().get(url)
             r.raise_for_status()
             return json.dumps(r.json(), indent=2)
         except requests.RequestException as e:
             return f"Failed to fetch customer details: {e}"
 
-class TroubleshootingTool(BaseTool):
+    async def _arun(self, account_id: str) -> str:
+        url = f"{config.CUSTOMER_SERVICE_URL}/account_status/{account_id}"
+        try:
+            r = await get_async_transport().get(url)
+            r.raise_for_status()
+            return json.dumps(r.json(), indent=2)
+        except httpx.HTTPError as e:
+            return f"Failed to fetch customer details: {e}"
+
+    def run_batch(self, account_ids: List[str]) -> List[Dict]:
+        """Bulk lookup; one {account_id, result, error} item per id, in order."""
+        return _post_batch(f"{config.CUSTOMER_SERVICE_URL}/account_status/batch", "account_ids", account_ids)
+
+class TroubleshootingTool(SupportTool):
     name: str = "Get Troubleshooting Steps"
-    description: str = "Provides troubleshooting guides for known issues."
+    description: str = "Provides troubleshooting guides for known issues; unknown issue types return the closest guide names."
     args_schema: Type[BaseModel] = TroubleshootingInput
+    parallel_safe: ClassVar[bool] = True
 
     def _run(self, issue_type: str) -> str:
-        url = f"http://localhost:8001/troubleshooting_steps/{issue_type}"
+        # Free-text descriptions are resolved by the service; quote them into one path segment
+        url = f"{config.TROUBLESHOOTING_SERVICE_URL}/troubleshooting_steps/{quote(issue_type, safe='')}"
         try:
-            r = requests.get(url, timeout=5)
+            r = get_transport().get(url)
+            if r.status_code == 404:
+                return f"Failed to fetch troubleshooting steps: {_detail(r)}"
             r.raise_for_status()
             return json.dumps(r.json(), indent=2)
         except requests.RequestException as e:
             return f"Failed to fetch troubleshooting steps: {e}"
 
-class TicketingTool(BaseTool):
+    async def _arun(self, issue_type: str) -> str:
+        url = f"{config.TROUBLESHOOTING_SERVICE_URL}/troubleshooting_steps/{quote(issue_type, safe='')}"
+        try:
+            r = await get_async_transport().get(url)
+            if r.status_code == 404:
+                return f"Failed to fetch troubleshooting steps: {_detail(r)}"
+            r.raise_for_status()
+            return json.dumps(r.json(), indent=2)
+        except httpx.HTTPError as e:
+            return f"Failed to fetch troubleshooting steps: {e}"
+
+    def run_batch(self, issue_types: List[str]) -> List[Dict]:
+        """Bulk guide fetch; one {issue_type, result, error} item per issue type, in order."""
+        return _post_batch(f"{config.TROUBLESHOOTING_SERVICE_URL}/troubleshooting_steps/batch", "issue_types", issue_types)
+
+class TicketingTool(SupportTool):
     name: str = "Create Support Ticket"
     description: str = "Creates a new support ticket."
     args_schema: Type[BaseModel] = TicketingInput
 
     def _run(self, customer_id: str, issue_summary: str) -> str:
-        url = "http://localhost:8002/create_ticket"
+        url = f"{config.TICKETING_SERVICE_URL}/create_ticket"
         payload = {"customer_id": customer_id, "issue_summary": issue_summary}
         try:
-            r = requests.post(url, json=payload, timeout=5)
+            r = get_transport().post(url, json=payload)
             r.raise_for_status()
             return json.dumps(r.json(), indent=2)
         except requests.RequestException as e:
             return f"Failed to create support ticket: {e}"
 
-class DeviceRebootTool(BaseTool):
+    async def _arun(self, customer_id: str, issue_summary: str) -> str:
+        url = f"{config.TICKETING_SERVICE_URL}/create_ticket"
+        payload = {"customer_id": customer_id, "issue_summary": issue_summary}
+        try:
+            r = await get_async_transport().post(url, json=payload)
+            r.raise_for_status()
+            return json.dumps(r.json(), indent=2)
+        except httpx.HTTPError as e:
+            return f"Failed to create support ticket: {e}"
+
+    def run_batch(self, tickets: List[Dict]) -> List[Dict]:
+        """Bulk creation from {customer_id, issue_summary[, priority]} dicts; one {index, result, error} item each."""
+        results = _post_batch(f"{config.TICKETING_SERVICE_URL}/create_ticket/batch", "tickets", tickets)
+        # The service numbers items per request chunk; renumber across the whole batch
+        for index, item in enumerate(results):
+            item["index"] = index
+        return results
+
+def _reboot_headers(device_id: str) -> Dict[str, str]:
+    # Keyed on the inquiry's correlation id, so an agent that repeats the call gets the first job back
+    correlation_id = tracing.correlation_id()
+    return {"Idempotency-Key": f"{correlation_id}:{device_id}"} if correlation_id else {}
+
+
+class DeviceRebootTool(SupportTool):
     name: str = "Reboot Device"
-    description: str = "Sends a remote reboot command to a device."
+    description: str = "Sends a remote reboot command to a device and reports whether the reboot completed."
     args_schema: Type[BaseModel] = DeviceRebootInput
 
     def _run(self, device_id: str) -> str:
-        url = f"http://localhost:8003/reboot_device/{device_id}"
+        url = f"{config.DEVICE_SERVICE_URL}/reboot_device/{quote(device_id, safe='')}"
         try:
-            r = requests.post(url, timeout=5)
+            r = get_transport().post(url, headers=_reboot_headers(device_id))
+            if r.status_code == 429:
+                return f"Failed to reboot device: {_detail(r)}"
             r.raise_for_status()
-            return json.dumps(r.json(), indent=2)
+            job = r.json()
+            if job.get("finished_at") is None and config.DEVICE_REBOOT_WAIT > 0:
+                # Long-poll; another worker may not know the job, so keep the queued one on failure
+                r = get_transport().get(f"{config.DEVICE_SERVICE_URL}/reboot_jobs/{job['job_id']}",
+                                        params={"wait": config.DEVICE_REBOOT_WAIT})
+                if r.ok:
+                    job = r.json()
+            return json.dumps(job, indent=2)
         except requests.RequestException as e:
             return f"Failed to reboot device: {e}"
 
-class TavilySearchTool(BaseTool):
+    async def _arun(self, device_id: str) -> str:
+        url = f"{config.DEVICE_SERVICE_URL}/reboot_device/{quote(device_id, safe='')}"
+        try:
+            r = await get_async_transport().post(url, headers=_reboot_headers(device_id))
+            if r.status_code == 429:
+                return f"Failed to reboot device: {_detail(r)}"
+            r.raise_for_status()
+            job = r.json()
+            if job.get("finished_at") is None and config.DEVICE_REBOOT_WAIT > 0:
+                r = await get_async_transport().get(f"{config.DEVICE_SERVICE_URL}/reboot_jobs/{job['job_id']}",
+                                                    params={"wait": config.DEVICE_REBOOT_WAIT})
+                if r.is_success:
+                    job = r.json()
+            return json.dumps(job, indent=2)
+        except httpx.HTTPError as e:
+            return f"Failed to reboot device: {e}"
+
+    def run_batch(self, device_ids: List[str], idempotency_key: Optional[str] = None) -> List[Dict]:
+        """Bulk reboot (area outages); one {device_id, result, error} item per device, in order."""
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else None
+        return _post_batch(f"{config.DEVICE_SERVICE_URL}/reboot_device/batch", "device_ids", device_ids, headers)
+
+class TavilySearchTool(SupportTool):
     name: str = "Web Search"
     description: str = "Performs real-time web search using Tavily (requires API key)."
     args_schema: Type[BaseModel] = TavilySearchInput
+    parallel_safe: ClassVar[bool] = True
 
     def _run(self, query: str) -> str:
-        key = os.getenv("TAVILY_API_KEY")
-        if not key:
-            return "Tavily API key not set. Web search is disabled."
+        # Cached, coalesced and rate-limited; see app/web_search.py
+        try:
+            return json.dumps(get_web_search().search(query), indent=2)
+        except SearchUnavailable as e:
+            return str(e)
+        except Exception as e:
+            return f"Web search failed: {e}"
 
+    async def _arun(self, query: str) -> str:
+        # On a worker thread so coalescing and the rate limit span sync and async callers
         try:
-            client = TavilyClient(api_key=key)
-            res = client.search(query=query, search_depth="basic")
-            return json.dumps(res.get("results", []), indent=2)
+            return json.dumps(await asyncio.to_thread(get_web_search().search, query), indent=2)
+        except SearchUnavailable as e:
+            return str(e)
         except Exception as e:
-            return f"Tavily search failed: {e}"
\ No newline at end of file
+            return f"Web search failed: {e}"
+
+class ParallelLookupTool(SupportTool):
+    name: str = "Run Lookups In Parallel"
+    description: str = (
+        "Runs several independent lookups at the same time and returns their results numbered in the "
+        "order given. Use it instead of separate steps when no lookup needs another's result."
+    )
+    args_schema: Type[BaseModel] = ParallelLookupInput
+    _tools: Dict[str, BaseTool] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, tools: List[BaseTool], **kwargs):
+        # Only read-only tools; actions such as reboots and tickets stay one per step
+        lookups = {tool.name: tool for tool in tools if getattr(tool, "parallel_safe", False)}
+        # Passed in rather than set afterwards: BaseTool renders the description during init
+        default = type(self).model_fields["description"].default
+        kwargs.setdefault("description", f"{default} Available: {', '.join(lookups)}.")
+        super().__init__(**kwargs)
+        self._tools = lookups
+
+    @staticmethod
+    def _calls(calls) -> List[ToolCall]:
+        calls = [c if isinstance(c, dict) else c.model_dump() for c in calls]
+        return [ToolCall(c["tool"], c.get("arguments") or {}) for c in calls]
+
+    def _run(self, calls: List[ToolCallInput]) -> str:
+        return format_results(get_executor().run(self._tools, self._calls(calls)))
+
+    async def _arun(self, calls: List[ToolCallInput]) -> str:
+        return format_results(await get_executor().arun(self._tools, self._calls(calls)))
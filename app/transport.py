@@ -0,0 +1,209 @@
+# app/transport.py
+
+import asyncio
+import random
+import threading
+import weakref
+from typing import Awaitable, Callable
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app import config
+from shared import tracing
+
+
+class ServiceTransport:
+    """
+    Shared, thread-safe HTTP transport for the service-calling tools.
+
+    Keeps one keep-alive session (and therefore one bounded connection pool)
+    per host. Idempotent GETs are retried with jittered exponential backoff;
+    POSTs are never retried, so a ticket or reboot is not sent twice.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = config.HTTP_POOL_SIZE,
+        connect_timeout: float = config.HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = config.HTTP_READ_TIMEOUT,
+        retries: int = config.HTTP_RETRIES,
+        backoff: float = config.HTTP_BACKOFF,
+        backoff_jitter: float = config.HTTP_BACKOFF_JITTER,
+    ):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            backoff_jitter=backoff_jitter,
+            allowed_methods=frozenset({"GET"}),
+            status_forcelist=(502, 503, 504),
+            raise_on_status=False,
+        )
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url: str) -> requests.Session:
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(host)
+                if session is None:
+                    session = requests.Session()
+                    # pool_block keeps the number of sockets per host bounded under load
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size,
+                                          pool_block=True, max_retries=self.retry)
+                    session.mount(f"{host}/", adapter)
+                    self._sessions[host] = session
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        with tracing.span("http.client", method=method, url=url) as span:
+            if tracing.enabled():
+                kwargs["headers"] = tracing.inject_headers(kwargs.get("headers"))
+            response = self.session_for(url).request(method, url, **kwargs)
+            span.set_attribute("status_code", response.status_code)
+            return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+# ---------------------------
+# Event-loop scoped clients
+# ---------------------------
+# Async clients (httpx, Weaviate) belong to the loop that opened them and must
+# be closed on it. Each one is paired with a suspended async generator:
+# asyncio.run() finalizes live async generators (loop.shutdown_asyncgens)
+# before it closes the loop, which runs the generator's finally block there.
+
+async def _close_on_shutdown(aclose: Callable[[], Awaitable]):
+    try:
+        yield
+    finally:
+        await aclose()
+
+
+def close_with_loop(aclose: Callable[[], Awaitable]):
+    """
+    Runs `aclose()` on the running loop when that loop shuts down. Keep the
+    returned handle as long as the client: dropping it closes the client early.
+    """
+    handle = _close_on_shutdown(aclose)
+    try:
+        # Steps into the try block; nothing before the yield awaits, so this completes synchronously
+        handle.asend(None).send(None)
+    except StopIteration:
+        pass
+    return handle
+
+
+class AsyncServiceTransport:
+    """
+    Async counterpart of ServiceTransport built on httpx. Keeps one
+    httpx.AsyncClient (and connection pool) per host; GETs are retried with
+    the same jittered backoff policy. Clients are bound to an event loop, so
+    use get_async_transport() rather than sharing an instance across loops.
+    """
+
+    RETRY_STATUSES = (502, 503, 504)
+
+    def __init__(
+        self,
+        pool_size: int = config.HTTP_POOL_SIZE,
+        connect_timeout: float = config.HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = config.HTTP_READ_TIMEOUT,
+        retries: int = config.HTTP_RETRIES,
+        backoff: float = config.HTTP_BACKOFF,
+        backoff_jitter: float = config.HTTP_BACKOFF_JITTER,
+    ):
+        self.limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_jitter = backoff_jitter
+        self._clients = {}
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(host)
+        if client is None:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            self._clients[host] = client
+        return client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        with tracing.span("http.client", method=method, url=url) as span:
+            if tracing.enabled():
+                kwargs["headers"] = tracing.inject_headers(kwargs.get("headers"))
+            response = await self._request(method, url, **kwargs)
+            span.set_attribute("status_code", response.status_code)
+            return response
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self.client_for(url)
+        attempts = self.retries + 1 if method == "GET" else 1
+        for attempt in range(attempts):
+            last = attempt + 1 == attempts
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                if last:
+                    raise
+            else:
+                if last or response.status_code not in self.RETRY_STATUSES:
+                    return response
+            await asyncio.sleep(self.backoff * (2 ** attempt) + random.uniform(0, self.backoff_jitter))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+_async_transports = weakref.WeakKeyDictionary()
+
+
+def get_transport() -> ServiceTransport:
+    """The sync transport every service-calling tool goes through, so crews and threads share its per-host pools."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = ServiceTransport()
+    return _transport
+
+
+def get_async_transport() -> AsyncServiceTransport:
+    """Returns the async service transport for the running event loop; it is closed when the loop shuts down."""
+    loop = asyncio.get_running_loop()
+    transport = _async_transports.get(loop)
+    if transport is None:
+        transport = _async_transports[loop] = AsyncServiceTransport()
+        transport._closer = close_with_loop(transport.aclose)
+    return transport
@@ -0,0 +1,242 @@
+# app/vector_index.py
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from llama_index.core.schema import BaseNode, NodeRelationship, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterOperator,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from pydantic import PrivateAttr
+
+# Rows scored per matmul when the matrix is int8, to bound the dequantized copy
+_SEARCH_BLOCK_ROWS = 65536
+
+
+class Hit(NamedTuple):
+    row: int
+    score: float
+
+
+# ---------------------------
+# Memory-mapped index
+# ---------------------------
+
+class LocalVectorIndex:
+    """
+    Read-only, in-process vector index over a memory-mapped embedding matrix.
+
+    Layout inside `<directory>/<index_name>/`:
+      - meta.json   : dim, dtype ("float32" or "int8") and row count
+      - vectors.npy : one L2-normalized embedding per row
+      - scales.npy  : per-row dequantization scale (int8 only)
+      - docs.jsonl  : metadata sidecar, line N describes row N
+
+    Opening only maps the matrix, so startup cost is reading the sidecar.
+    """
+
+    def __init__(self, directory: str, index_name: str):
+        self.path = os.path.join(directory, index_name)
+        self.dim = 0
+        self.dtype = "float32"
+        self.vectors = None
+        self.scales = None
+        self.docs: List[Dict[str, Any]] = []
+        self._rows_by_value: Dict[str, Dict[Any, np.ndarray]] = {}
+
+        meta_path = os.path.join(self.path, "meta.json")
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self.dtype = meta["dtype"]
+        if meta["count"]:
+            self.vectors = np.load(os.path.join(self.path, "vectors.npy"), mmap_mode="r")
+            if self.dtype == "int8":
+                self.scales = np.load(os.path.join(self.path, "scales.npy"), mmap_mode="r")
+        with open(os.path.join(self.path, "docs.jsonl"), "r") as f:
+            self.docs = [json.loads(line) for line in f if line.strip()]
+
+    def __len__(self):
+        return len(self.docs)
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "meta.json"))
+
+    def rows_where(self, key: str, value) -> np.ndarray:
+        """Row ids whose metadata `key` equals `value`, used to pre-filter a search."""
+        if key not in self._rows_by_value:
+            groups: Dict[Any, List[int]] = {}
+            for row, doc in enumerate(self.docs):
+                groups.setdefault(doc["metadata"].get(key), []).append(row)
+            self._rows_by_value[key] = {v: np.asarray(rows, dtype=np.int64) for v, rows in groups.items()}
+        return self._rows_by_value[key].get(value, np.zeros(0, dtype=np.int64))
+
+    def scores(self, query, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Dot-product scores of `query` against every row (or only `rows`)."""
+        query = np.asarray(query, dtype=np.float32)
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        if self.dtype != "int8":
+            return vectors @ query
+        scales = self.scales if rows is None else self.scales[rows]
+        out = np.empty(vectors.shape[0], dtype=np.float32)
+        for start in range(0, vectors.shape[0], _SEARCH_BLOCK_ROWS):
+            end = start + _SEARCH_BLOCK_ROWS
+            out[start:end] = (vectors[start:end].astype(np.float32) @ query) * scales[start:end]
+        return out
+
+    def search(self, query, top_k: int = 5, rows: Optional[np.ndarray] = None) -> List[Hit]:
+        if self.vectors is None or (rows is not None and len(rows) == 0):
+            return []
+        scores = self.scores(query, rows)
+        k = min(top_k, scores.shape[0])
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        row_ids = best if rows is None else rows[best]
+        return [Hit(int(row), float(scores[i])) for row, i in zip(row_ids, best)]
+
+    def dequantized(self) -> np.ndarray:
+        if self.vectors is None:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        if self.dtype == "int8":
+            return self.vectors.astype(np.float32) * self.scales[:, None]
+        return np.array(self.vectors, dtype=np.float32)
+
+
+class LocalIndexWriter:
+    """Applies upserts and deletes to a LocalVectorIndex and rewrites it atomically."""
+
+    def __init__(self, directory: str, index_name: str, quantize: str = "none"):
+        self.directory = directory
+        self.index_name = index_name
+        self.quantize = quantize
+        existing = LocalVectorIndex(directory, index_name)
+        self._docs = list(existing.docs)
+        self._vectors = list(existing.dequantized())
+        self._dim = existing.dim
+
+    def exists(self) -> bool:
+        return bool(self._docs)
+
+    def reset(self):
+        self._docs, self._vectors = [], []
+
+    def delete(self, doc_ids):
+        doc_ids = set(doc_ids)
+        if not doc_ids:
+            return
+        keep = [i for i, doc in enumerate(self._docs) if doc["doc_id"] not in doc_ids]
+        self._docs = [self._docs[i] for i in keep]
+        self._vectors = [self._vectors[i] for i in keep]
+
+    def add(self, nodes: Sequence[BaseNode]):
+        for node in nodes:
+            vector = np.asarray(node.get_embedding(), dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            self._vectors.append(vector / norm if norm else vector)
+            self._dim = int(vector.shape[0])
+            self._docs.append({
+                "doc_id": node.ref_doc_id or node.node_id,
+                "node_id": node.node_id,
+                "text": node.get_content(),
+                "metadata": node.metadata,
+            })
+
+    def upsert(self, nodes: Sequence[BaseNode], replace: Optional[Iterable[str]] = None):
+        # `replace`: ids whose old chunks may be stored; defaults to every document in `nodes`
+        self.delete({node.ref_doc_id for node in nodes} if replace is None else replace)
+        self.add(nodes)
+
+    def save(self):
+        path = os.path.join(self.directory, self.index_name)
+        os.makedirs(path, exist_ok=True)
+
+        matrix = np.vstack(self._vectors).astype(np.float32) if self._vectors else np.zeros((0, self._dim), np.float32)
+        if self.quantize == "int8" and len(matrix):
+            scales = np.abs(matrix).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            _save_npy(os.path.join(path, "scales.npy"), scales.astype(np.float32))
+            matrix = np.round(matrix / scales[:, None]).astype(np.int8)
+        _save_npy(os.path.join(path, "vectors.npy"), matrix)
+
+        _replace_text(os.path.join(path, "docs.jsonl"), "".join(json.dumps(doc) + "\n" for doc in self._docs))
+        # meta.json goes last: readers treat it as the commit point
+        meta = {"dim": self._dim, "dtype": self.quantize if self.quantize == "int8" else "float32", "count": len(self._docs)}
+        _replace_text(os.path.join(path, "meta.json"), json.dumps(meta))
+
+    def close(self):
+        self.save()
+
+
+def _save_npy(path: str, array: np.ndarray):
+    tmp = f"{path}.tmp.npy"
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+def _replace_text(path: str, text: str):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# ---------------------------
+# LlamaIndex adapter
+# ---------------------------
+
+class LocalVectorStore(BasePydanticVectorStore):
+    """Read-only LlamaIndex vector store backed by a LocalVectorIndex."""
+
+    stores_text: bool = True
+    _index: LocalVectorIndex = PrivateAttr()
+
+    def __init__(self, index: LocalVectorIndex, **kwargs):
+        super().__init__(**kwargs)
+        self._index = index
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LocalVectorStore"
+
+    @property
+    def client(self) -> LocalVectorIndex:
+        return self._index
+
+    def add(self, nodes: List[BaseNode], **kwargs) -> List[str]:
+        raise NotImplementedError("LocalVectorStore is read-only; write through rag-setup/ingest_data.py")
+
+    def delete(self, ref_doc_id: str, **kwargs) -> None:
+        raise NotImplementedError("LocalVectorStore is read-only; write through rag-setup/ingest_data.py")
+
+    def query(self, query: VectorStoreQuery, **kwargs) -> VectorStoreQueryResult:
+        rows = None
+        if query.filters is not None:
+            # Only exact-match filters are supported; they shrink the candidate rows before scoring
+            for f in query.filters.filters:
+                if f.operator != FilterOperator.EQ:
+                    raise NotImplementedError(f"LocalVectorStore does not support filter operator {f.operator}")
+                matched = self._index.rows_where(f.key, f.value)
+                rows = matched if rows is None else np.intersect1d(rows, matched)
+        hits = self._index.search(query.query_embedding, query.similarity_top_k, rows=rows)
+        return self._to_result(hits)
+
+    def _to_result(self, hits: List[Hit]) -> VectorStoreQueryResult:
+        nodes, scores, ids = [], [], []
+        for hit in hits:
+            doc = self._index.docs[hit.row]
+            nodes.append(TextNode(
+                id_=doc["node_id"],
+                text=doc["text"],
+                metadata=doc["metadata"],
+                relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=doc["doc_id"])},
+            ))
+            scores.append(hit.score)
+            ids.append(doc["node_id"])
+        return VectorStoreQueryResult(nodes=nodes, similarities=scores, ids=ids)
@@ -0,0 +1,133 @@
+# app/warmup.py
+
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from app import config
+from shared import tracing
+
+IDLE = "idle"
+RUNNING = "running"
+READY = "ready"
+FAILED = "failed"
+
+
+# ---------------------------
+# Warm-up steps
+# ---------------------------
+# app.tools and app.agents keep weaviate, llama_index, the embedding model
+# and tavily out of the import path, so a cold process starts quickly but
+# pays for them on its first inquiry. These steps move that cost to
+# start-up (WARMUP=startup) or to the readiness probe (WARMUP=probe).
+
+def _load_crew():
+    # Imports crewai and the tools and builds the pool's first crew
+    from app.agents import get_crew_pool
+
+    pool = get_crew_pool()
+    pool.release(pool.acquire())
+
+
+def _load_knowledge_base():
+    # Loads the embedding model and opens the vector store
+    from app.retrieval import get_engine
+
+    get_engine().warm_up()
+
+
+# (name, step, required). A failed optional step is reported but does not hold
+# back readiness: the knowledge base reconnects on its next query, so an
+# unreachable Weaviate only affects the knowledge-base tool, not the pod.
+STEPS: Sequence[Tuple[str, Callable[[], None], bool]] = (
+    ("crew", _load_crew, True),
+    ("knowledge_base", _load_knowledge_base, False),
+)
+
+
+class WarmUp:
+    """
+    Runs the warm-up steps once in a background thread and reports progress
+    for readiness checks. A failed required step can be started again; the
+    next probe retries it. Failed optional steps (for example Weaviate not
+    yet reachable) are listed under "degraded" and warm-up still finishes.
+    """
+
+    def __init__(self, steps: Sequence[Tuple[str, Callable[[], None], bool]] = STEPS):
+        self.steps = steps
+        self.state = IDLE
+        self.error: Optional[str] = None
+        self.seconds: Dict[str, float] = {}
+        self.degraded: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> "WarmUp":
+        with self._lock:
+            if self.state in (RUNNING, READY):
+                return self
+            self.state = RUNNING
+            self.error = None
+            self.degraded = {}
+        threading.Thread(target=self._run, name="warm-up", daemon=True).start()
+        return self
+
+    def _run(self):
+        with tracing.span("warmup") as span:
+            try:
+                for name, step, required in self.steps:
+                    started = time.perf_counter()
+                    try:
+                        step()
+                    except Exception as e:
+                        if required:
+                            raise
+                        span.record_exception(e)
+                        self.degraded[name] = f"{type(e).__name__}: {e}"
+                        continue
+                    self.seconds[name] = round(time.perf_counter() - started, 3)
+            except Exception as e:
+                span.record_exception(e)
+                self.error = f"{type(e).__name__}: {e}"
+                self.state = FAILED
+                return
+            finally:
+                span.set_attributes(**{f"{name}_seconds": s for name, s in self.seconds.items()})
+            self.state = READY
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "seconds": dict(self.seconds),
+            "error": self.error,
+            "degraded": dict(self.degraded),
+        }
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup() -> WarmUp:
+    """The warm-up started by the UI and API at startup and reported by readiness()."""
+    global _warmup
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                _warmup = WarmUp()
+    return _warmup
+
+
+def readiness() -> Tuple[bool, dict]:
+    """
+    Readiness for the WARMUP mode: always ready when off, otherwise ready
+    once the required warm-up steps have finished. Starts warm-up if it has
+    not run yet ("probe" mode) and retries it after a failure.
+    """
+    if config.WARMUP == "off":
+        return True, {"state": READY, "warmup": "off"}
+    warmup = get_warmup().start()
+    return warmup.ready, warmup.status()
@@ -0,0 +1,226 @@
+# app/web_search.py
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Hashable, List, Optional
+
+from app import config
+from app.telemetry import WEB_SEARCHES
+from shared.cache import LRUCache
+from shared.ratelimit import TokenBucket
+
+# ---------------------------
+# Web search
+# ---------------------------
+# The Web Search tool goes through one process-wide WebSearch: results are
+# cached per normalized query and depth, concurrent identical queries share
+# one backend call, and a token bucket keeps the process under the search
+# API's rate limit. The backend is Tavily, or a deterministic offline stub
+# for tests and benchmarks (WEB_SEARCH_BACKEND=stub).
+
+
+class SearchUnavailable(Exception):
+    """Raised when web search cannot run (no API key, rate limit exhausted)."""
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: lowercase, single-spaced."""
+    return " ".join(str(query).lower().split())
+
+
+class TavilyBackend:
+    """
+    Tavily search with one client per API key, created on first use. Without
+    an explicit `api_key`, TAVILY_API_KEY is read from the environment on
+    every call, so a key set after startup takes effect.
+    """
+
+    name = "tavily"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key
+        self._client = None
+        self._client_key = None
+        self._lock = threading.Lock()
+
+    @property
+    def api_key(self) -> str:
+        if self._api_key is not None:
+            return self._api_key
+        return os.getenv("TAVILY_API_KEY", "")
+
+    def check(self) -> None:
+        """Raises SearchUnavailable if a search cannot be sent."""
+        if not self.api_key:
+            raise SearchUnavailable("Tavily API key not set. Web search is disabled.")
+
+    def _get_client(self):
+        self.check()
+        api_key = self.api_key
+        with self._lock:
+            if self._client is None or self._client_key != api_key:
+                # Imported here so tavily loads on the first search, not at startup
+                from tavily import TavilyClient
+                self._client = TavilyClient(api_key=api_key)
+                self._client_key = api_key
+            return self._client
+
+    def search(self, query: str, depth: str) -> List[Dict]:
+        return self._get_client().search(query=query, search_depth=depth).get("results", [])
+
+
+class StubBackend:
+    """
+    Offline backend: the same made-up results for the same query, after
+    `latency` seconds standing in for the round trip to the search API.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0, results: int = 3):
+        self.latency = latency
+        self.results = results
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def check(self) -> None:
+        pass
+
+    def search(self, query: str, depth: str) -> List[Dict]:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha1(f"{query}|{depth}".encode("utf-8")).hexdigest()[:8]
+        return [
+            {
+                "title": f"{query.title()} - result {i}",
+                "url": f"https://example.com/{digest}/{i}",
+                "content": f"Stub {depth} search result {i} for '{query}'.",
+                "score": round(1.0 - i * 0.1, 2),
+            }
+            for i in range(1, self.results + 1)
+        ]
+
+
+class WebSearch:
+    """
+    Cached, coalescing, rate-limited front for a search backend.
+
+    Results are kept for `ttl` seconds in an LRU of `cache_size` queries.
+    When several threads miss the cache on the same query at once, the
+    first runs the search and the others wait for its result (or its
+    error) instead of sending duplicates. Backend calls take a token from a
+    bucket of `burst` tokens refilled at `rate` per second (0 = unlimited),
+    waiting at most `max_wait` seconds for one before giving up.
+    """
+
+    def __init__(self, backend, cache_size: int = 1024, ttl: float = 3600, rate: float = 0,
+                 burst: int = 5, max_wait: float = 10, depth: str = "basic"):
+        self.backend = backend
+        self.depth = depth
+        self.max_wait = max_wait
+        self._cache = LRUCache(max_size=cache_size, ttl=ttl)
+        self._bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.backend_calls = 0
+        self.coalesced = 0
+        self.rate_limited = 0
+
+    def search(self, query: str, depth: Optional[str] = None) -> List[Dict]:
+        depth = depth or self.depth
+        query = normalize_query(query)
+        key = (query, depth)
+        cached = self._cache.get(key)
+        if cached is not None:
+            WEB_SEARCHES.inc(backend=self.backend.name, outcome="cache_hit")
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            WEB_SEARCHES.inc(backend=self.backend.name, outcome="coalesced")
+            return future.result()
+
+        try:
+            results = self._call_backend(query, depth)
+            self._cache.put(key, results)
+            future.set_result(results)
+            return results
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _call_backend(self, query: str, depth: str) -> List[Dict]:
+        # A search that cannot be sent must not spend a token
+        try:
+            self.backend.check()
+        except SearchUnavailable:
+            WEB_SEARCHES.inc(backend=self.backend.name, outcome="unavailable")
+            raise
+        if self._bucket is not None and not self._bucket.acquire(timeout=self.max_wait):
+            with self._lock:
+                self.rate_limited += 1
+            WEB_SEARCHES.inc(backend=self.backend.name, outcome="rate_limited")
+            raise SearchUnavailable("Web search rate limit reached; try again shortly.")
+        with self._lock:
+            self.backend_calls += 1
+        try:
+            results = self.backend.search(query, depth)
+        except Exception:
+            WEB_SEARCHES.inc(backend=self.backend.name, outcome="error")
+            raise
+        WEB_SEARCHES.inc(backend=self.backend.name, outcome="backend")
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "backend_calls": self.backend_calls,
+            "coalesced": self.coalesced,
+            "rate_limited": self.rate_limited,
+            "cache": self._cache.stats(),
+        }
+
+
+def create_backend(name: Optional[str] = None):
+    name = (name or config.WEB_SEARCH_BACKEND).lower()
+    if name == "tavily":
+        return TavilyBackend()
+    if name == "stub":
+        return StubBackend(latency=config.WEB_SEARCH_STUB_LATENCY)
+    raise ValueError(f"Unknown WEB_SEARCH_BACKEND '{name}'")
+
+
+_search = None
+_search_lock = threading.Lock()
+
+
+def get_web_search() -> WebSearch:
+    """The WebSearch behind TavilySearchTool, configured from WEB_SEARCH_*; one instance means one cache and one rate limit per process."""
+    global _search
+    if _search is None:
+        with _search_lock:
+            if _search is None:
+                _search = WebSearch(
+                    create_backend(),
+                    cache_size=config.WEB_SEARCH_CACHE_SIZE,
+                    ttl=config.WEB_SEARCH_CACHE_TTL,
+                    rate=config.WEB_SEARCH_RATE,
+                    burst=config.WEB_SEARCH_BURST,
+                    max_wait=config.WEB_SEARCH_MAX_WAIT,
+                    depth=config.WEB_SEARCH_DEPTH,
+                )
+    return _search
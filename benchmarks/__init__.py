@@ -0,0 +1 @@
+# Offline benchmarks; run as modules from the repo root, e.g. `python -m benchmarks.crew_bench`.
@@ -0,0 +1,223 @@
+# benchmarks/crew_bench.py
+"""
+Offline end-to-end benchmark of app.agents.run.
+
+Replays examples/sample-queries.txt through the real crew, tools and
+retrieval engine against a scripted stub LLM, a stub web search backend, the
+four mcp-services served in-process, and the local vector index (built on
+first run). Reports per-stage latency percentiles, tool-call counts,
+throughput per concurrency level and peak memory, and saves everything as
+JSON under benchmarks/results/.
+
+    python -m benchmarks.crew_bench --concurrency 1,4,8 --repeat 3
+"""
+
+import argparse
+import importlib.util
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import REPO_ROOT, SAMPLE_QUERIES, load_queries, peak_rss_mb, save_results, summarize
+from benchmarks.stubs import ScriptedLLM, ServiceStubs, install_stub_synthesizer_llm
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline crew benchmark with stub LLM and services.")
+    parser.add_argument("--queries", default=SAMPLE_QUERIES, help="One inquiry per line")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--repeat", type=int, default=2, help="Passes over the queries per level")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Stub LLM seconds per call")
+    parser.add_argument("--llm-per-token", type=float, default=0.0, help="Stub LLM seconds per completion token")
+    parser.add_argument("--llm-cache", action="store_true", help="Keep the completion cache on (off by default)")
+    parser.add_argument("--answer-cache", action="store_true", help="Keep the semantic answer cache on")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="Stub web search seconds per call")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/crew-<time>-<rev>.json)")
+    return parser.parse_args()
+
+
+def configure_environment(args, levels):
+    # Settings are read when app.config is imported, so this runs first
+    os.environ["KB_BACKEND"] = "local"
+    os.environ["LLM_STREAM"] = "false"
+    if args.llm_cache:
+        # Only temperature-0 completions are cached
+        os.environ.setdefault("LLM_TEMPERATURE", "0")
+    else:
+        os.environ["LLM_CACHE"] = "off"
+    os.environ["ANSWER_CACHE_ENABLED"] = "true" if args.answer_cache else "false"
+    os.environ["CREW_POOL_SIZE"] = str(max(levels))
+    # Offline web search: deterministic results after --search-latency seconds
+    os.environ["WEB_SEARCH_BACKEND"] = "stub"
+    os.environ["WEB_SEARCH_STUB_LATENCY"] = str(args.search_latency)
+    os.environ.setdefault("LITELLM_CONFIG_PATH", os.path.join(REPO_ROOT, "litellm.config.json"))
+
+
+def ensure_local_index():
+    from app import config
+    from app.vector_index import LocalVectorIndex
+
+    if LocalVectorIndex(config.KB_DATA_DIR, config.KB_INDEX_NAME).exists():
+        return
+    print("No local index found; running ingestion with --backend local")
+    path = os.path.join(REPO_ROOT, "rag-setup", "ingest_data.py")
+    spec = importlib.util.spec_from_file_location("bench_ingest_data", path)
+    ingest = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ingest)
+    ingest.ingest_data_weaviate_v4(mode="full", backend="local")
+
+
+# ---------------------------
+# Measurement
+# ---------------------------
+
+class InquiryRecorder:
+    """Progress-stream sink collecting LLM and tool timings for one inquiry."""
+
+    def __init__(self):
+        self.llm_seconds = []
+        self.llm_models = Counter()
+        self.tool_seconds = defaultdict(list)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def __call__(self, kind, data):
+        from app import streaming
+
+        if kind == "llm":
+            self.llm_seconds.append(data["seconds"])
+            self.llm_models[data["model"]] += 1
+            self.prompt_tokens += data["prompt_tokens"]
+            self.completion_tokens += data["completion_tokens"]
+        elif kind == streaming.TOOL_END:
+            self.tool_seconds[data["tool"]].append(data["seconds"])
+
+
+def run_inquiry(run, inquiry):
+    from app import streaming
+
+    recorder = InquiryRecorder()
+    started = time.perf_counter()
+    error = None
+    with streaming.streaming_to(recorder):
+        try:
+            run(inquiry)
+        except Exception as e:
+            error = repr(e)
+    return time.perf_counter() - started, error, recorder
+
+
+def run_level(run, queries, concurrency, repeat):
+    workload = [q for _ in range(repeat) for q in queries]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda q: run_inquiry(run, q), workload))
+    wall = time.perf_counter() - started
+
+    totals, llm, overhead, errors = [], [], [], []
+    tools = defaultdict(list)
+    tool_calls = Counter()
+    tokens = Counter()
+    llm_models = Counter()
+    llm_calls = 0
+    for seconds, error, recorder in outcomes:
+        if error:
+            errors.append(error)
+            continue
+        totals.append(seconds)
+        llm.extend(recorder.llm_seconds)
+        llm_calls += len(recorder.llm_seconds)
+        llm_models.update(recorder.llm_models)
+        tool_time = 0.0
+        for name, durations in recorder.tool_seconds.items():
+            tools[name].extend(durations)
+            tool_calls[name] += len(durations)
+            tool_time += sum(durations)
+        overhead.append(max(0.0, seconds - sum(recorder.llm_seconds) - tool_time))
+        tokens["prompt"] += recorder.prompt_tokens
+        tokens["completion"] += recorder.completion_tokens
+
+    completed = len(totals)
+    return {
+        "concurrency": concurrency,
+        "requests": len(workload),
+        "completed": completed,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "wall_seconds": wall,
+        "throughput_rps": completed / wall if wall else 0.0,
+        "latency": {
+            "inquiry": summarize(totals),
+            "llm_call": summarize(llm),
+            "agent_overhead": summarize(overhead),
+            **{f"tool:{name}": summarize(durations) for name, durations in sorted(tools.items())},
+        },
+        "llm_calls_per_inquiry": llm_calls / completed if completed else 0.0,
+        # Tier routing: calls per model alias (tier-2 calls only happen on escalation)
+        "llm_calls_by_model": dict(llm_models),
+        "tool_calls": dict(tool_calls),
+        "tool_calls_per_inquiry": sum(tool_calls.values()) / completed if completed else 0.0,
+        "tokens": dict(tokens),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def print_level(level):
+    inquiry = level["latency"]["inquiry"]
+    print(
+        f"concurrency={level['concurrency']:>3}  {level['throughput_rps']:7.2f} inquiries/s  "
+        f"p50={inquiry.get('p50_ms', 0):8.1f}ms  p95={inquiry.get('p95_ms', 0):8.1f}ms  "
+        f"p99={inquiry.get('p99_ms', 0):8.1f}ms  errors={level['errors']}  "
+        f"tools/inquiry={level['tool_calls_per_inquiry']:.1f}  rss={level['peak_rss_mb']:.0f}MB"
+    )
+
+
+def main():
+    args = parse_args()
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    queries = load_queries(args.queries)
+    configure_environment(args, levels)
+
+    services = ServiceStubs().start()
+    llm = ScriptedLLM(latency=args.llm_latency, per_token=args.llm_per_token).install()
+    try:
+        install_stub_synthesizer_llm()
+        ensure_local_index()
+
+        import_started = time.perf_counter()
+        from app.agents import get_crew_pool, run
+        from app.web_search import get_web_search
+        import_seconds = time.perf_counter() - import_started
+
+        # One untimed inquiry loads the embedding model and builds the first crew
+        warmup_seconds, error, _ = run_inquiry(run, queries[0])
+        if error:
+            raise SystemExit(f"Warm-up inquiry failed: {error}")
+        print(f"import {import_seconds:.2f}s, warm-up {warmup_seconds:.2f}s, {len(queries)} queries x {args.repeat}")
+
+        results = []
+        for concurrency in levels:
+            level = run_level(run, queries, concurrency, args.repeat)
+            print_level(level)
+            results.append(level)
+    finally:
+        llm.uninstall()
+        services.stop()
+
+    path = save_results("crew", {
+        "config": vars(args),
+        "queries": len(queries),
+        "import_seconds": import_seconds,
+        "warmup_seconds": warmup_seconds,
+        "stub_llm_calls": llm.calls,
+        "crew_pool": get_crew_pool().stats(),
+        "web_search": get_web_search().stats(),
+        "levels": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/customer_store_bench.py
+"""
+Scaling benchmark of the customer store (shared/customer_store.py).
+
+For each dataset size, streams N synthetic accounts through the JSONL bulk
+loader into a fresh SQLite file, then measures single-account lookup
+latency uncached (random IDs straight from SQLite, plus unknown IDs) and
+through the read-through cache (a skewed hot set), and 100-ID batch
+lookups. Flat p50/p99 across sizes is the property to watch.
+
+    python -m benchmarks.customer_store_bench --sizes 10000,100000,1000000 --lookups 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import save_results, summarize
+from shared.customer_store import CachedCustomerStore, SQLiteCustomerStore, iter_records, load_records
+
+PLANS = ["Basic Internet", "Premium Internet", "Fiber Max", "Standard TV", "Mobile Unlimited"]
+ISSUES = ["internet_down", "billing_issue", "login_failure", "slow_speed"]
+
+
+def account_id(i: int) -> str:
+    return f"CUST{i:09d}"
+
+
+def write_jsonl(path: str, count: int, rng: random.Random):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps({
+                "account_id": account_id(i),
+                "name": f"Customer {i}",
+                "service_status": "Active" if rng.random() < 0.9 else "Inactive",
+                "plan": rng.choice(PLANS),
+                "current_issues": rng.sample(ISSUES, rng.randint(0, 2)),
+            }) + "\n")
+
+
+def time_calls(fn, args) -> dict:
+    durations = []
+    for arg in args:
+        started = time.perf_counter()
+        fn(arg)
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+def bench(count: int, lookups: int, workdir: str, seed: int) -> dict:
+    rng = random.Random(seed)
+    source = os.path.join(workdir, f"customers-{count}.jsonl")
+    write_jsonl(source, count, rng)
+
+    store = SQLiteCustomerStore(os.path.join(workdir, f"customers-{count}.db"))
+    started = time.perf_counter()
+    written, skipped = load_records(store, iter_records(source))
+    load_seconds = time.perf_counter() - started
+
+    random_ids = [account_id(rng.randrange(count)) for _ in range(lookups)]
+    unknown_ids = [f"NOPE{i}" for i in range(min(lookups, 2000))]
+    # Skewed workload: 90% of lookups go to 1,000 hot accounts
+    hot = [account_id(rng.randrange(count)) for _ in range(1000)]
+    skewed = [rng.choice(hot) if rng.random() < 0.9 else account_id(rng.randrange(count)) for _ in range(lookups)]
+    batches = [[account_id(rng.randrange(count)) for _ in range(100)] for _ in range(max(1, lookups // 100))]
+
+    cached = CachedCustomerStore(store, max_size=10_000, ttl=300)
+    result = {
+        "customers": written,
+        "skipped": skipped,
+        "load_seconds": load_seconds,
+        "load_rate": written / load_seconds if load_seconds else 0.0,
+        "db_bytes": os.path.getsize(store.path),
+        "sqlite_get": time_calls(store.get, random_ids),
+        "sqlite_unknown": time_calls(store.get, unknown_ids),
+        "sqlite_get_many_100": time_calls(store.get_many, batches),
+        "cached_get_skewed": time_calls(cached.get, skewed),
+    }
+    result["cache"] = cached.stats()["cache"]
+    os.remove(source)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Customer store scaling benchmark.")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated account counts")
+    parser.add_argument("--lookups", type=int, default=20000, help="Lookups per measurement")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/customer_store-<time>-<rev>.json)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="customer-bench-") as workdir:
+        for count in [int(c) for c in args.sizes.split(",") if c]:
+            result = bench(count, args.lookups, workdir, args.seed)
+            print(
+                f"customers={result['customers']:>9,}  load={result['load_rate']:>9,.0f}/s  "
+                f"get p50={result['sqlite_get']['p50_ms']:.3f}ms p99={result['sqlite_get']['p99_ms']:.3f}ms  "
+                f"batch(100) p50={result['sqlite_get_many_100']['p50_ms']:.2f}ms  "
+                f"cached p50={result['cached_get_skewed']['p50_ms']:.4f}ms "
+                f"(hit rate {result['cache']['hit_rate']:.0%})"
+            )
+            results.append(result)
+
+    path = save_results("customer_store", {"config": {k: v for k, v in vars(args).items() if k != "output"},
+                                            "results": results}, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
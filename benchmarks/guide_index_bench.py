@@ -0,0 +1,106 @@
+# benchmarks/guide_index_bench.py
+"""
+Micro-benchmark of the troubleshooting guide index (shared/guide_index.py).
+
+Builds indexes over the stock guides plus N synthetic ones and measures
+build time and per-query resolution latency, both uncached (every query
+distinct, memo cleared) and memoized (repeated queries), along with the
+resolution rate of the stock free-text queries.
+
+    python -m benchmarks.guide_index_bench --guides 100,1000,5000 --queries 2000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import save_results, summarize
+from shared.guide_index import GuideIndex
+
+STOCK_GUIDES = {
+    "internet_slow": {"issue": "Internet Slow", "steps": []},
+    "no_internet_connection": {"issue": "No Internet Connection", "steps": []},
+    "login_issue": {"issue": "Login Issues", "steps": []},
+}
+# Descriptions LLMs actually send, with the guide each should resolve to
+STOCK_QUERIES = {
+    "slow internet": "internet_slow",
+    "internet_down": "no_internet_connection",
+    "Internet is down!": "no_internet_connection",
+    "wifi keeps dropping": "no_internet_connection",
+    "sluggish wifi": "internet_slow",
+    "interent slow": "internet_slow",
+    "cant log in": "login_issue",
+    "forgot my password": "login_issue",
+    "account locked": "login_issue",
+}
+WORDS = (
+    "router modem printer email vpn tv cable phone voicemail billing firmware dns dhcp ethernet fiber "
+    "bluetooth laptop tablet app update battery screen audio camera streaming remote mesh extender "
+    "outage slow login password account payment invoice roaming sim port"
+).split()
+
+
+def synthetic_guides(count: int, rng: random.Random) -> dict:
+    guides = dict(STOCK_GUIDES)
+    for i in range(count):
+        words = rng.sample(WORDS, 3)
+        guides[f"{'_'.join(words)}_{i}"] = {"issue": " ".join(words).title(), "steps": []}
+    return guides
+
+
+def time_queries(index: GuideIndex, queries, clear: bool) -> dict:
+    durations = []
+    for query in queries:
+        if clear:
+            index._cache.clear()
+        started = time.perf_counter()
+        index.resolve(query)
+        durations.append(time.perf_counter() - started)
+    return summarize(durations)
+
+
+def bench(count: int, queries: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    guides = synthetic_guides(count, rng)
+    started = time.perf_counter()
+    index = GuideIndex(guides)
+    build_seconds = time.perf_counter() - started
+
+    workload = [" ".join(rng.sample(WORDS, rng.randint(1, 3))) for _ in range(queries)]
+    resolved = {q: getattr(index.resolve(q), "issue_type", None) for q in STOCK_QUERIES}
+    return {
+        "guides": len(guides),
+        "build_seconds": build_seconds,
+        "uncached": time_queries(index, workload, clear=True),
+        "cached": time_queries(index, workload[:50] * (queries // 50 or 1), clear=False),
+        "stock_accuracy": sum(resolved[q] == want for q, want in STOCK_QUERIES.items()) / len(STOCK_QUERIES),
+        "index": index.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Guide index resolution benchmark.")
+    parser.add_argument("--guides", default="100,1000,5000", help="Comma-separated synthetic guide counts")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries per index size")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/guide_index-<time>-<rev>.json)")
+    args = parser.parse_args()
+
+    results = []
+    for count in [int(c) for c in args.guides.split(",") if c]:
+        result = bench(count, args.queries, args.seed)
+        print(
+            f"guides={result['guides']:>6}  build={result['build_seconds'] * 1000:7.1f}ms  "
+            f"uncached p50={result['uncached']['p50_ms']:.3f}ms p99={result['uncached']['p99_ms']:.3f}ms  "
+            f"cached p50={result['cached']['p50_ms']:.4f}ms  stock accuracy={result['stock_accuracy']:.0%}"
+        )
+        results.append(result)
+
+    path = save_results("guide_index", {"config": {k: v for k, v in vars(args).items() if k != "output"},
+                                         "results": results}, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# benchmarks/http_bench.py
+"""
+HTTP load test for the support services.
+
+Starts each service under uvicorn (as a subprocess, so --workers applies),
+then drives every endpoint with open-loop arrivals: "fixed" sends at a
+constant interval, "poisson" draws exponential inter-arrival gaps. Latency
+is measured from each request's scheduled send time, so queueing behind a
+slow server counts instead of being hidden (no coordinated omission).
+
+For each worker count, endpoint, arrival mode and rate it reports
+p50/p95/p99 latency, error rate and achieved throughput, plus the
+saturation throughput: the highest rate sustained with <=1% errors and
+>=95% of the offered rate achieved.
+
+    python -m benchmarks.http_bench --workers 1,2,4 --rates 100,200,400,800 --duration 10
+    python -m benchmarks.http_bench --target api --endpoints account_status,ticket_create
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import REPO_ROOT, free_port, save_results, summarize
+
+
+@dataclass
+class Endpoint:
+    service: str
+    method: str
+    path: str
+    body: Optional[dict] = None
+
+
+ENDPOINTS: Dict[str, Endpoint] = {
+    "account_status": Endpoint("customer-db-service", "GET", "/account_status/CUST123"),
+    "troubleshooting_steps": Endpoint("troubleshooting-service", "GET", "/troubleshooting_steps/internet_slow"),
+    "ticket_create": Endpoint(
+        "ticketing-system-service", "POST", "/create_ticket",
+        {"customer_id": "CUST123", "issue_summary": "Load test ticket"},
+    ),
+    "ticket_status": Endpoint("ticketing-system-service", "GET", "/ticket_status/{ticket_id}"),
+    "device_reboot": Endpoint("remote-device-service", "POST", "/reboot_device/DEV-1001"),
+}
+
+
+# ---------------------------
+# Server under test
+# ---------------------------
+
+class UvicornProcess:
+    """`uvicorn <module>:app --workers N` on a free port, in a subprocess."""
+
+    def __init__(self, app_dir: str, module: str, workers: int, env: Optional[dict] = None):
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.command = [
+            sys.executable, "-m", "uvicorn", f"{module}:app",
+            "--app-dir", app_dir, "--host", "127.0.0.1", "--port", str(self.port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ]
+        self.env = {**os.environ, **(env or {})}
+        self._process = None
+
+    def start(self, timeout: float = 30.0) -> "UvicornProcess":
+        self._process = subprocess.Popen(self.command, env=self.env, stdout=subprocess.DEVNULL)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {self._process.returncode}: {' '.join(self.command)}")
+            try:
+                if httpx.get(f"{self.url}/openapi.json", timeout=1).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"Server on port {self.port} did not become ready")
+
+    def stop(self):
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+def app_location(target: str, service: str):
+    if target == "api":
+        return os.path.join(REPO_ROOT, "api"), "main"
+    return os.path.join(REPO_ROOT, "mcp-services", service), "app"
+
+
+# ---------------------------
+# Load generation
+# ---------------------------
+
+def arrival_gaps(mode: str, rate: float, count: int, rng: random.Random) -> List[float]:
+    if mode == "fixed":
+        return [1.0 / rate] * count
+    return [rng.expovariate(rate) for _ in range(count)]
+
+
+async def drive(client: httpx.AsyncClient, base_url: str, endpoint: Endpoint, path: str,
+                mode: str, rate: float, duration: float, max_outstanding: int, seed: int) -> dict:
+    gaps = arrival_gaps(mode, rate, max(1, int(rate * duration)), random.Random(seed))
+    latencies, errors = [], []
+    dropped = 0
+    outstanding = 0
+    tasks = []
+
+    async def fire(scheduled: float):
+        nonlocal outstanding
+        try:
+            r = await client.request(endpoint.method, base_url + path, json=endpoint.body)
+            if r.status_code >= 400:
+                errors.append(f"HTTP {r.status_code}")
+            else:
+                latencies.append(time.perf_counter() - scheduled)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        finally:
+            outstanding -= 1
+
+    started = time.perf_counter()
+    scheduled = started
+    for gap in gaps:
+        scheduled += gap
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if outstanding >= max_outstanding:
+            # The generator is the bottleneck or the server stopped answering
+            dropped += 1
+            continue
+        outstanding += 1
+        tasks.append(asyncio.create_task(fire(scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    sent = len(gaps)
+    failed = len(errors) + dropped
+    return {
+        "mode": mode,
+        "offered_rps": rate,
+        "requests": sent,
+        "achieved_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "error_rate": failed / sent if sent else 0.0,
+        "errors": len(errors),
+        "dropped": dropped,
+        "error_samples": sorted(set(errors))[:5],
+        "latency": summarize(latencies),
+    }
+
+
+def saturation(runs: List[dict]) -> dict:
+    sustained = [r for r in runs if r["error_rate"] <= 0.01 and r["achieved_rps"] >= 0.95 * r["offered_rps"]]
+    return {
+        "sustained_rps": max((r["offered_rps"] for r in sustained), default=0.0),
+        "max_achieved_rps": max((r["achieved_rps"] for r in runs), default=0.0),
+    }
+
+
+async def bench_endpoint(base_url: str, name: str, args) -> dict:
+    endpoint = ENDPOINTS[name]
+    limits = httpx.Limits(max_connections=args.max_outstanding, max_keepalive_connections=args.max_outstanding)
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        path = endpoint.path
+        if "{ticket_id}" in path:
+            create = ENDPOINTS["ticket_create"]
+            r = await client.post(base_url + create.path, json=create.body)
+            r.raise_for_status()
+            path = path.format(ticket_id=r.json()["ticket_id"])
+
+        # Warm up connections and the server before measuring
+        await drive(client, base_url, endpoint, path, "fixed", min(args.rates), 1.0, args.max_outstanding, 0)
+
+        result = {}
+        for mode in args.modes:
+            runs = []
+            for rate in args.rates:
+                run = await drive(client, base_url, endpoint, path, mode, rate, args.duration,
+                                  args.max_outstanding, args.seed)
+                lat = run["latency"]
+                print(
+                    f"  {name:<22} {mode:<7} {rate:>7.0f} rps -> {run['achieved_rps']:8.1f} rps  "
+                    f"p50={lat.get('p50_ms', 0):7.2f}ms p95={lat.get('p95_ms', 0):7.2f}ms "
+                    f"p99={lat.get('p99_ms', 0):7.2f}ms  errors={run['error_rate']:.1%}"
+                )
+                runs.append(run)
+            result[mode] = {"runs": runs, "saturation": saturation(runs)}
+        return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="HTTP load test for the support services.")
+    parser.add_argument("--target", choices=["services", "api"], default="services",
+                        help="services: each mcp-service app; api: the unified api/main.py")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Comma-separated endpoint names")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated uvicorn worker counts")
+    parser.add_argument("--rates", default="50,100,200,400,800", help="Comma-separated request rates (req/s)")
+    parser.add_argument("--modes", default="fixed,poisson", help="Arrival modes: fixed, poisson")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per rate step")
+    parser.add_argument("--max-outstanding", type=int, default=1000, help="In-flight cap before requests are dropped")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for Poisson arrivals")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/http-<time>-<rev>.json)")
+    args = parser.parse_args()
+    args.endpoints = [e for e in args.endpoints.split(",") if e]
+    args.workers = [int(w) for w in args.workers.split(",") if w]
+    args.rates = [float(r) for r in args.rates.split(",") if r]
+    args.modes = [m for m in args.modes.split(",") if m]
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+    return args
+
+
+def main():
+    args = parse_args()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            # Workers share tickets through one SQLite file so ticket_status finds them
+            env = {
+                "TICKET_STORE": "sqlite", "TICKET_DB_PATH": os.path.join(tmp, f"tickets-{workers}.db"),
+                "CUSTOMER_DB_PATH": os.path.join(tmp, f"customers-{workers}.db"),
+                # device_reboot measures queueing the job, not the per-device rate limit
+                "DEVICE_REBOOT_INTERVAL": "0",
+            }
+            by_location = {}
+            for name in args.endpoints:
+                by_location.setdefault(app_location(args.target, ENDPOINTS[name].service), []).append(name)
+
+            for (app_dir, module), names in by_location.items():
+                print(f"{os.path.basename(app_dir)} with {workers} worker(s)")
+                server = UvicornProcess(app_dir, module, workers, env).start()
+                try:
+                    for name in names:
+                        results.append({
+                            "workers": workers,
+                            "endpoint": name,
+                            "app": os.path.basename(app_dir),
+                            **asyncio.run(bench_endpoint(server.url, name, args)),
+                        })
+                finally:
+                    server.stop()
+
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    path = save_results("http", {"config": config, "results": results}, args.output)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+# benchmarks/import_bench.py
+"""
+Cold import-time benchmark for the agent runtime's entry modules.
+
+Imports each module in a fresh interpreter with `-X importtime`, repeated
+to smooth out noise, and reports the median wall time, the slowest
+top-level imports it pulled in and which heavy dependencies (weaviate,
+llama_index, torch, tavily, crewai...) were loaded. Comparing against a
+previous results file fails the run when a module got slower than the
+tolerance allows, so start-up regressions show up in CI.
+
+    python -m benchmarks.import_bench
+    python -m benchmarks.import_bench --modules app.tools --baseline benchmarks/results/import-....json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.common import REPO_ROOT, save_results
+
+MODULES = ["app.config", "app.jobs", "app.tools", "app.agents", "api.main"]
+HEAVY = ["crewai", "litellm", "weaviate", "llama_index", "sentence_transformers", "torch", "tavily", "numpy"]
+
+_PROBE = (
+    "import importlib, json, sys; importlib.import_module({module!r}); "
+    "print(json.dumps(sorted(name for name in {heavy!r} if name in sys.modules)))"
+)
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Top-level entries of `-X importtime` output: [{"module", "self_us", "cumulative_us"}]."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header row
+        # Nested imports are indented below the module that triggered them
+        if name.startswith("  "):
+            continue
+        entries.append({"module": name.strip(), "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return entries
+
+
+def import_once(module: str) -> dict:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")]))}
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+        return {"error": error}
+    return {
+        "wall_seconds": wall,
+        "heavy_loaded": json.loads(proc.stdout.strip().splitlines()[-1]),
+        "imports": parse_importtime(proc.stderr),
+    }
+
+
+def bench_module(module: str, repeat: int, top: int) -> dict:
+    runs = [import_once(module) for _ in range(repeat)]
+    failed = [r["error"] for r in runs if "error" in r]
+    if failed:
+        return {"module": module, "error": failed[0]}
+    walls = [r["wall_seconds"] for r in runs]
+    # Slowest top-level imports of the median run
+    median_run = sorted(runs, key=lambda r: r["wall_seconds"])[len(runs) // 2]
+    slowest = sorted(median_run["imports"], key=lambda e: e["cumulative_us"], reverse=True)[:top]
+    return {
+        "module": module,
+        "median_seconds": statistics.median(walls),
+        "min_seconds": min(walls),
+        "max_seconds": max(walls),
+        "heavy_loaded": median_run["heavy_loaded"],
+        "slowest_imports": [{"module": e["module"], "cumulative_ms": e["cumulative_us"] / 1000} for e in slowest],
+    }
+
+
+def compare(results: List[dict], baseline_path: str, tolerance: float) -> List[str]:
+    """Modules whose median import time exceeds the baseline by more than `tolerance`."""
+    with open(baseline_path) as f:
+        baseline = {r["module"]: r for r in json.load(f)["results"] if "median_seconds" in r}
+    regressions = []
+    for result in results:
+        before = baseline.get(result["module"])
+        if before is None or "median_seconds" not in result:
+            continue
+        limit = before["median_seconds"] * (1 + tolerance)
+        if result["median_seconds"] > limit:
+            regressions.append(
+                f"{result['module']}: {result['median_seconds']:.3f}s vs baseline {before['median_seconds']:.3f}s"
+            )
+        newly_heavy = sorted(set(result["heavy_loaded"]) - set(before.get("heavy_loaded", [])))
+        if newly_heavy:
+            regressions.append(f"{result['module']}: now imports {', '.join(newly_heavy)}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cold import-time benchmark.")
+    parser.add_argument("--modules", default=",".join(MODULES), help="Comma-separated modules to import")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to report")
+    parser.add_argument("--baseline", help="Earlier import results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown over the baseline (0.2 = 20%%)")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/import-<time>-<rev>.json)")
+    args = parser.parse_args()
+    args.modules = [m for m in args.modules.split(",") if m]
+    return args
+
+
+def main():
+    args = parse_args()
+    results = []
+    for module in args.modules:
+        result = bench_module(module, args.repeat, args.top)
+        results.append(result)
+        if "error" in result:
+            print(f"{module:<12} failed: {result['error']}")
+            continue
+        slowest = ", ".join(f"{e['module']} {e['cumulative_ms']:.0f}ms" for e in result["slowest_imports"][:3])
+        print(
+            f"{module:<12} median={result['median_seconds'] * 1000:7.0f}ms  "
+            f"heavy=[{', '.join(result['heavy_loaded'])}]  slowest: {slowest}"
+        )
+
+    config = {k: v for k, v in vars(args).items() if k != "output"}
+    path = save_results("import", {"config": config, "python": sys.version.split()[0], "results": results}, args.output)
+    print(f"Results written to {path}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# benchmarks/stubs.py
+
+import importlib.util
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.common import REPO_ROOT, ThreadedServer
+
+# ---------------------------
+# Support services
+# ---------------------------
+# The mcp-services are self-contained FastAPI apps over mock data, so the
+# benchmark serves the real apps in-process on ephemeral ports.
+
+SERVICES = {
+    "CUSTOMER_SERVICE_URL": "customer-db-service",
+    "TROUBLESHOOTING_SERVICE_URL": "troubleshooting-service",
+    "TICKETING_SERVICE_URL": "ticketing-system-service",
+    "DEVICE_SERVICE_URL": "remote-device-service",
+}
+
+
+def load_service_app(service: str):
+    path = os.path.join(REPO_ROOT, "mcp-services", service, "app.py")
+    spec = importlib.util.spec_from_file_location(f"bench_{service.replace('-', '_')}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+class ServiceStubs:
+    """Starts the four services and points the app's *_SERVICE_URL settings at them."""
+
+    def __init__(self):
+        self.servers: Dict[str, ThreadedServer] = {}
+
+    def start(self) -> "ServiceStubs":
+        # Tickets and customers stay in memory so runs do not leave a database behind
+        os.environ.setdefault("TICKET_STORE", "memory")
+        os.environ.setdefault("CUSTOMER_STORE", "memory")
+        # Reboots finish at once and repeated inquiries may reboot the same device
+        os.environ.setdefault("DEVICE_REBOOT_SECONDS", "0")
+        os.environ.setdefault("DEVICE_REBOOT_INTERVAL", "0")
+        for env, service in SERVICES.items():
+            server = ThreadedServer(load_service_app(service)).start()
+            self.servers[service] = server
+            # Must be set before app.config is imported
+            os.environ[env] = server.url
+        return self
+
+    def stop(self):
+        for server in self.servers.values():
+            server.stop()
+
+
+# ---------------------------
+# Scripted LLM
+# ---------------------------
+
+_INQUIRY = re.compile(r'inquiry:\s*"(.*?)"', re.S)
+_TOOL_NAME = re.compile(r"^Tool Name: (.+?)\s*$", re.M)
+_PREFETCHED = re.compile(r"^\[\d+\] (.+?)\(", re.M)
+_PARALLEL_TOOL = "Run Lookups In Parallel"
+_READ_ONLY = {"Knowledge Base Search", "Get Customer Details", "Get Troubleshooting Steps", "Web Search"}
+# The Tier 1 task asks for this marker (config/tasks.yaml)
+_ESCALATION_PROMPT = '"Escalate: yes"'
+_ACCOUNT = re.compile(r"\bCUST\d{3}\b")
+_DEVICE = re.compile(r"\bDEV-\d+\b")
+_ISSUES = (
+    (re.compile(r"login|log in|password|sign in", re.I), "login_issue"),
+    (re.compile(r"down|no internet|disconnect|dropping", re.I), "no_internet_connection"),
+    (re.compile(r"slow|speed", re.I), "internet_slow"),
+)
+_TICKET = re.compile(r"ticket|billing|charged|dispute", re.I)
+
+
+def batch_lookups(actions: List[Tuple[str, dict]]) -> List[Tuple[str, dict]]:
+    """Folds runs of consecutive read-only lookups into one parallel lookup action."""
+    batched, run = [], []
+    for action in actions + [None]:
+        if action is not None and action[0] in _READ_ONLY:
+            run.append(action)
+            continue
+        if len(run) > 1:
+            calls = [{"tool": tool, "arguments": args} for tool, args in run]
+            batched.append((_PARALLEL_TOOL, {"calls": calls}))
+        else:
+            batched.extend(run)
+        run = []
+        if action is not None:
+            batched.append(action)
+    return batched
+
+
+def plan_actions(inquiry: str) -> List[Tuple[str, dict]]:
+    """Deterministic tool plan for an inquiry, roughly what the real agent does."""
+    actions = [("Knowledge Base Search", {"question": inquiry})]
+    account = _ACCOUNT.search(inquiry)
+    if account:
+        actions.append(("Get Customer Details", {"account_id": account.group(0)}))
+    for pattern, issue_type in _ISSUES:
+        if pattern.search(inquiry):
+            actions.append(("Get Troubleshooting Steps", {"issue_type": issue_type}))
+            break
+    else:
+        # No guide for the issue: the Tier 2 task searches the web
+        actions.append(("Web Search", {"query": inquiry}))
+    device = _DEVICE.search(inquiry)
+    if device:
+        actions.append(("Reboot Device", {"device_id": device.group(0)}))
+    if account and _TICKET.search(inquiry):
+        actions.append(("Create Support Ticket", {"customer_id": account.group(0), "issue_summary": inquiry[:120]}))
+    return actions
+
+
+class ScriptedLLM:
+    """
+    Drop-in replacement for litellm.completion that answers in CrewAI's ReAct
+    format. Each call looks at how many observations the conversation already
+    holds and returns the next action from plan_actions, then a final answer.
+    `latency` seconds (plus `per_token` per completion token) are slept per
+    call to model inference time.
+    """
+
+    def __init__(self, latency: float = 0.05, per_token: float = 0.0):
+        self.latency = latency
+        self.per_token = per_token
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._original = None
+
+    def install(self):
+        import litellm
+
+        self._original = litellm.completion
+        litellm.completion = self
+        return self
+
+    def uninstall(self):
+        import litellm
+
+        if self._original is not None:
+            litellm.completion = self._original
+
+    def _respond(self, messages) -> str:
+        text = "\n".join(str(m.get("content") or "") for m in messages)
+        match = _INQUIRY.search(text)
+        inquiry = match.group(1) if match else str(messages[-1].get("content") or "")
+        step = sum(str(m.get("content") or "").count("Observation:") for m in messages if m.get("role") == "assistant")
+        # Each tier's agent only gets its own tools; the rest of the plan is left for escalation.
+        # Prefetched lookups are skipped and independent ones batched, like the prompt asks.
+        prefetched = set(_PREFETCHED.findall(text))
+        planned = [a for a in plan_actions(inquiry) if a[0] not in prefetched]
+        available = set(_TOOL_NAME.findall(text))
+        actions = [a for a in planned if a[0] in available] if available else planned
+        escalate = len(actions) < len(planned)
+        if _PARALLEL_TOOL in available:
+            actions = batch_lookups(actions)
+        if step < len(actions):
+            tool, args = actions[step]
+            return f"Thought: I should use {tool}.\nAction: {tool}\nAction Input: {json.dumps(args)}"
+        answer = (
+            "Thought: I now know the final answer\n"
+            f"Final Answer: Here is how to resolve '{inquiry}': follow the troubleshooting steps above "
+            "and contact support if the problem persists."
+        )
+        if _ESCALATION_PROMPT in text:
+            answer += "\nEscalate: " + ("yes" if escalate else "no")
+        return answer
+
+    def __call__(self, *args, **kwargs):
+        from litellm.types.utils import Choices, Message, ModelResponse, Usage
+
+        from app import streaming
+
+        messages = kwargs.get("messages", args[1] if len(args) > 1 else [])
+        started = time.perf_counter()
+        content = self._respond(messages)
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in messages) // 4
+        completion_tokens = max(1, len(content) // 4)
+        time.sleep(self.latency + self.per_token * completion_tokens)
+        with self._lock:
+            self.calls += 1
+        streaming.emit(
+            "llm", model=kwargs.get("model", "stub"), seconds=time.perf_counter() - started,
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+        )
+        return ModelResponse(
+            model=kwargs.get("model", "stub"),
+            choices=[Choices(index=0, finish_reason="stop", message=Message(role="assistant", content=content))],
+            usage=Usage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens,
+            ),
+        )
+
+
+def install_stub_synthesizer_llm():
+    """The knowledge base synthesizer uses LlamaIndex's LLM; swap in its MockLLM."""
+    from llama_index.core import Settings
+    from llama_index.core.llms import MockLLM
+
+    Settings.llm = MockLLM(max_tokens=64)
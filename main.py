@@ -1,10 +1,76 @@
 import os
+import time
 import streamlit as st
-from app.agents import support_crew
+from app import streaming
+from app.jobs import QueueFull, QUEUED, SUCCEEDED, get_job_manager
 
 # Ensure LiteLLM picks up the correct config file (important for Docker)
 os.environ["LITELLM_CONFIG_PATH"] = "/app/litellm.config.json"
 
+@st.cache_resource
+def job_manager():
+    # One bounded worker pool per Streamlit server, shared by every session.
+    # Crew runs happen there, so script threads only submit and poll.
+    return get_job_manager()
+
+@st.cache_resource
+def metrics_server():
+    # Streamlit has no FastAPI app to mount /metrics on, so agent-side metrics
+    # (tool/LLM latency, tokens/sec, job queue depth) get their own port.
+    port = os.getenv("METRICS_PORT")
+    if not port:
+        return None
+    from shared import metrics
+    return metrics.start_http_server(int(port))
+
+@st.cache_resource
+def warm_up():
+    # Tools, LLM client, crews and the embedding model are built once per server
+    # process. With WARMUP set they load in the background while the first page
+    # renders; otherwise the first inquiry loads them.
+    from app import config, warmup
+    if config.WARMUP == "off":
+        return None
+    return warmup.get_warmup().start()
+
+def show_result(job):
+    if job.status == SUCCEEDED:
+        st.success("✅ Resolution:")
+        st.write(job.result)
+    else:
+        st.error(f"❌ Something went wrong:\n\n{job.error}")
+
+def describe_event(event):
+    data = event["data"]
+    if event["type"] == streaming.TOOL_START:
+        return f"🔧 Using **{data['tool']}**"
+    if event["type"] == streaming.TOOL_END:
+        return f"✔️ {data['tool']} returned"
+    if event["type"] == streaming.STEP and data.get("thought"):
+        return f"💭 {data['thought']}"
+    if event["type"] == streaming.TASK:
+        return "📋 Task finished"
+    return None
+
+@st.fragment(run_every=0.5)
+def show_progress(job_id):
+    job = job_manager().get(job_id)
+    if job is None or job.done:
+        # Re-render the whole page once, outside the polling fragment
+        st.rerun()
+    elapsed = time.time() - job.submitted_at
+    if job.status == QUEUED:
+        st.info(f"⏳ Waiting for a free agent... ({elapsed:.0f}s)")
+        return
+
+    st.info(f"🤖 AI agents are working... ({elapsed:.0f}s)")
+    steps = [line for line in map(describe_event, list(job.events)) if line]
+    for line in steps[-8:]:
+        st.caption(line)
+    text = job.streamed_text()
+    if text:
+        st.markdown(text[-4000:])
+
 def main():
     st.set_page_config(page_title="AI Support Assistant", page_icon="🤖")
     st.title("🤖 AI-Powered Customer Support")
@@ -13,22 +79,29 @@ def main():
         "Ask a customer support question and let the AI team help you out!"
     )
 
+    metrics_server()
+    warm_up()
+
     inquiry = st.text_area("📝 Describe your issue:", height=200)
 
     if st.button("🔍 Get Help"):
         if inquiry.strip() == "":
             st.warning("Please enter a support inquiry.")
         else:
-            with st.spinner("AI agents are working..."):
-                try:
-                    # Use kickoff instead of run
-                    resolution = support_crew.kickoff(inputs={"input": inquiry})
-                    st.success("✅ Resolution:")
-                    st.write(resolution)
-                except Exception as e:
-                    st.error(f"❌ Something went wrong:\n\n{e}")
-                    # Add debugging info
-                    st.error(f"Error details: {str(e)}")
+            try:
+                st.session_state["job_id"] = job_manager().submit(inquiry).job_id
+            except QueueFull:
+                st.warning("All agents are busy right now. Please try again in a moment.")
+
+    job_id = st.session_state.get("job_id")
+    if job_id:
+        job = job_manager().get(job_id)
+        if job is None:
+            st.warning("This request has expired. Please submit it again.")
+        elif job.done:
+            show_result(job)
+        else:
+            show_progress(job_id)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,40 +1,20 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
+from typing import Optional
 import uvicorn
 import os
+import sys
 
-# --- Mock Data for our Customer Database ---
-# This simulates real customer data that an actual MCP system would access.
-MOCK_CUSTOMERS = {
-    "CUST123": {
-        "account_id": "CUST123",
-        "name": "Alice Smith",
-        "service_status": "Active",
-        "plan": "Premium Internet",
-        "current_issues": []
-    },
-    "CUST456": {
-        "account_id": "CUST456",
-        "name": "Bob Johnson",
-        "service_status": "Inactive",
-        "plan": "Basic Internet",
-        "current_issues": ["internet_down", "billing_issue"]
-    },
-    "CUST789": {
-        "account_id": "CUST789",
-        "name": "Charlie Brown",
-        "service_status": "Active",
-        "plan": "Standard TV",
-        "current_issues": ["login_failure"]
-    },
-    "CUST000": {
-        "account_id": "CUST000",
-        "name": "Demo Customer",
-        "service_status": "Active",
-        "plan": "Fiber Max",
-        "current_issues": []
-    }
-}
+# Make the repository's shared modules importable when run as `python app.py`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared import metrics, tracing
+from shared.customer_store import CachedCustomerStore, create_customer_store
+
+# --- Customer Database ---
+# Accounts live in the store shared with the unified API: SQLite behind an
+# LRU read-through cache, seeded with the demo customers when empty. Load
+# real data with `python -m shared.customer_store load customers.csv`.
+customer_store = create_customer_store()
 
 # --- FastAPI Application Setup ---
 app = FastAPI(
@@ -42,6 +22,11 @@ app = FastAPI(
     description="A mock service to simulate retrieving customer account information.",
     version="1.0.0"
 )
+tracing.instrument_app(app, "customer-db-service")
+metrics.instrument_app(app, "customer-db-service")
+if isinstance(customer_store, CachedCustomerStore):
+    metrics.gauge("customer_cache_hit_ratio", "Customer lookups answered by the in-process cache.",
+                  function=customer_store.hit_rate)
 
 # Pydantic model for the response structure
 class AccountStatusResponse(BaseModel):
@@ -51,22 +36,59 @@ class AccountStatusResponse(BaseModel):
     plan: str
     current_issues: list[str]
 
+MAX_BATCH_SIZE = 1000
+
+class BatchAccountStatusRequest(BaseModel):
+    account_ids: list[str]
+
+class AccountStatusBatchItem(BaseModel):
+    account_id: str
+    result: Optional[AccountStatusResponse] = None
+    error: Optional[str] = None
+
+# Account endpoints are plain `def`: cache misses hit SQLite, so FastAPI runs
+# them in its threadpool instead of on the event loop.
+
 # --- API Endpoint: Get Account Status ---
 @app.get(
     "/account_status/{account_id}",
     response_model=AccountStatusResponse,
     summary="Retrieve detailed account status for a given customer ID"
 )
-async def get_account_status(account_id: str):
+def get_account_status(account_id: str):
     """
     Retrieves the service status and current issues for a specific customer.
     - **account_id**: The unique identifier for the customer.
     """
-    customer = MOCK_CUSTOMERS.get(account_id)
+    customer = customer_store.get(account_id)
     if not customer:
         raise HTTPException(status_code=404, detail="Account not found. Please provide a valid customer ID.")
     return customer
 
+# --- API Endpoint: Bulk Account Status ---
+@app.post(
+    "/account_status/batch",
+    response_model=list[AccountStatusBatchItem],
+    summary="Retrieve account status for many customer IDs in one call"
+)
+def get_account_status_batch(request: BatchAccountStatusRequest):
+    """
+    Looks up every account ID and returns one item per ID, in request order.
+    Unknown IDs produce an item with `error` set instead of failing the whole batch.
+    - **account_ids**: Customer identifiers to look up (at most 1000).
+    """
+    if len(request.account_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_SIZE} items).")
+    customers = customer_store.get_many(request.account_ids)
+    results = []
+    for account_id in request.account_ids:
+        customer = customers.get(account_id)
+        if customer:
+            results.append({"account_id": account_id, "result": customer})
+        else:
+            results.append({"account_id": account_id, "error": "Account not found."})
+    return results
+
 # --- API Endpoint: Simulate Device Reset ---
 @app.post(
     "/device_reset/{device_id}",
@@ -1,6 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException
+from pydantic import BaseModel
+from typing import Optional
 import uvicorn
+import math
 import os
+import sys
+
+# Make the repository's shared modules importable when run as `python app.py`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared import metrics, tracing
+from shared.device_jobs import RateLimited, create_device_job_manager
 
 # --- FastAPI Application Setup ---
 app = FastAPI(
@@ -8,22 +17,106 @@ app = FastAPI(
     description="A mock service to simulate remote device actions like reboots.",
     version="1.0.0"
 )
+tracing.instrument_app(app, "remote-device-service")
+metrics.instrument_app(app, "remote-device-service")
+
+# --- Reboot Jobs ---
+# Reboots run in the background (see shared/device_jobs.py): the endpoints
+# return a job to poll, duplicates of a pending reboot collapse onto it, and
+# each device may only be rebooted once per DEVICE_REBOOT_INTERVAL seconds.
+reboot_jobs = create_device_job_manager()
+metrics.gauge("device_reboot_jobs_active", "Reboot jobs queued or running.", function=reboot_jobs.active_count)
+
+MAX_BATCH_SIZE = 1000
+MAX_JOB_WAIT_SECONDS = 60
+
+class RebootJobResponse(BaseModel):
+    job_id: str
+    device_id: str
+    idempotency_key: Optional[str] = None
+    status: str
+    message: Optional[str] = None
+    error: Optional[str] = None
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # True when the request collapsed onto an earlier reboot of the device
+    duplicate: bool = False
 
-# --- API Endpoint: Simulate Device Reboot ---
+class BatchRebootRequest(BaseModel):
+    device_ids: list[str]
+
+class RebootBatchItem(BaseModel):
+    device_id: str
+    result: Optional[RebootJobResponse] = None
+    error: Optional[str] = None
+
+# --- API Endpoint: Bulk Device Reboot ---
+# Declared before /reboot_device/{device_id} so "batch" is not taken for a device ID
+@app.post(
+    "/reboot_device/batch",
+    response_model=list[RebootBatchItem],
+    status_code=202,
+    summary="Queue reboots for many devices in one call"
+)
+async def reboot_devices_batch(request: BatchRebootRequest, idempotency_key: Optional[str] = Header(None)):
+    """
+    Queues one reboot job per device and returns one item per ID, in request order.
+    Reboots run concurrently up to DEVICE_REBOOT_CONCURRENCY at a time; rate-limited
+    devices produce an item with `error` set instead of failing the whole batch.
+    - **device_ids**: Devices to reboot (at most 1000).
+    - **Idempotency-Key** (header): Retrying the batch with the same key returns the same jobs.
+    """
+    if len(request.device_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_SIZE} items).")
+    return [
+        {
+            "device_id": item["device_id"],
+            "result": {**item["job"].to_dict(), "duplicate": not item["created"]} if item["job"] else None,
+            "error": item["error"],
+        }
+        for item in reboot_jobs.submit_many(request.device_ids, idempotency_key)
+    ]
+
+# --- API Endpoint: Device Reboot ---
 @app.post(
     "/reboot_device/{device_id}",
-    summary="Simulate a remote device reboot"
+    response_model=RebootJobResponse,
+    status_code=202,
+    summary="Queue a remote device reboot"
 )
-async def reboot_device(device_id: str):
+async def reboot_device(device_id: str, idempotency_key: Optional[str] = Header(None)):
     """
-    Simulates initiating a remote reboot for a given device ID.
+    Queues a remote reboot for a given device ID and returns the job; poll
+    `/reboot_jobs/{job_id}` for the outcome.
     - **device_id**: The unique identifier for the device (e.g., router serial, modem MAC).
+    - **Idempotency-Key** (header): Repeating a request with the same key returns the same job.
+    """
+    try:
+        job, created = reboot_jobs.submit(device_id, idempotency_key)
+    except RateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    if created:
+        print(f"[{os.getenv('SERVICE_NAME', 'RemoteDevice')}] Queued remote reboot for device_id: {device_id}")
+    return {**job.to_dict(), "duplicate": not created}
+
+# --- API Endpoint: Reboot Job Status ---
+@app.get(
+    "/reboot_jobs/{job_id}",
+    response_model=RebootJobResponse,
+    summary="Get the status of a reboot job"
+)
+async def get_reboot_job(job_id: str, wait: float = 0):
+    """
+    Returns a reboot job's status: queued, running, succeeded or failed.
+    - **wait**: Seconds to wait for the job to finish before answering (long-poll, at most 60).
     """
-    # In a real system, this would interact with a device management platform.
-    print(f"[{os.getenv('SERVICE_NAME', 'RemoteDevice')}] Initiating remote reboot for device_id: {device_id}")
-    # Simulate some delay for realism, but keep it quick for demo
-    # await asyncio.sleep(2)
-    return {"status": "success", "message": f"Remote reboot command sent to device {device_id}."}
+    job = reboot_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Reboot job not found.")
+    if wait > 0 and not job.done:
+        await job.wait(min(wait, MAX_JOB_WAIT_SECONDS))
+    return job.to_dict()
 
 # --- Main function to run the service ---
 if __name__ == "__main__":
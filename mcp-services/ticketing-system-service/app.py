@@ -1,12 +1,22 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
+from typing import Optional
 import uvicorn
 import os
+import sys
 import uuid # To generate unique ticket IDs
 from datetime import datetime, timedelta
 
-# --- Mock Data for Ticketing System ---
-MOCK_TICKETS = {} # Stores created tickets
+# Make the repository's shared modules importable when run as `python app.py`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared import metrics, tracing
+from shared.ticket_store import InvalidCursor, create_ticket_store
+
+# --- Ticket Storage ---
+# SQLite/WAL by default so tickets survive restarts and are shared across
+# uvicorn workers; set TICKET_STORE=memory for a throwaway in-process store.
+ticket_store = create_ticket_store()
+metrics.gauge("ticket_store_size", "Tickets held by the ticket store.", function=ticket_store.count)
 
 class CreateTicketRequest(BaseModel):
     customer_id: str
@@ -22,27 +32,35 @@ class TicketResponse(BaseModel):
     created_at: str
     estimated_resolution: str
 
+class TicketListResponse(BaseModel):
+    tickets: list[TicketResponse]
+    next_cursor: Optional[str] = None
+
+MAX_BATCH_SIZE = 1000
+
+class BatchCreateTicketRequest(BaseModel):
+    tickets: list[CreateTicketRequest]
+
+class TicketBatchItem(BaseModel):
+    index: int
+    result: Optional[TicketResponse] = None
+    error: Optional[str] = None
+
 # --- FastAPI Application Setup ---
 app = FastAPI(
     title="Mock Ticketing System Service",
     description="A mock service to simulate creating and managing support tickets.",
     version="1.0.0"
 )
+tracing.instrument_app(app, "ticketing-system-service")
+metrics.instrument_app(app, "ticketing-system-service")
 
-# --- API Endpoint: Create a New Ticket ---
-@app.post(
-    "/create_ticket",
-    response_model=TicketResponse,
-    summary="Create a new support ticket"
-)
-async def create_ticket(request: CreateTicketRequest):
-    """
-    Creates a new support ticket in the system.
-    - **customer_id**: The ID of the customer reporting the issue.
-    - **issue_summary**: A brief description of the problem.
-    - **priority**: The urgency of the ticket (e.g., 'Low', 'Medium', 'High').
-    """
-    ticket_id = str(uuid.uuid4())[:8] # Generate a short unique ID
+# Endpoints are plain `def` so FastAPI runs the blocking ticket store calls
+# in its threadpool instead of on the event loop.
+
+# --- Ticket construction (shared by single and bulk creation) ---
+def build_ticket(request: CreateTicketRequest) -> dict:
+    ticket_id = str(uuid.uuid4()) # Full UUID: primary key of a store that keeps growing
     created_at = datetime.now()
     # Estimate resolution based on priority
     if request.priority.lower() == "high":
@@ -61,26 +79,91 @@ async def create_ticket(request: CreateTicketRequest):
         "created_at": created_at.isoformat(),
         "estimated_resolution": estimated_resolution.isoformat()
     }
-    MOCK_TICKETS[ticket_id] = ticket_data
+    ticket_store.create(ticket_data)
     print(f"[{os.getenv('SERVICE_NAME', 'Ticketing')}] Created ticket: {ticket_id} for {request.customer_id}")
     return ticket_data
 
+# --- API Endpoint: Create a New Ticket ---
+@app.post(
+    "/create_ticket",
+    response_model=TicketResponse,
+    summary="Create a new support ticket"
+)
+def create_ticket(request: CreateTicketRequest):
+    """
+    Creates a new support ticket in the system.
+    - **customer_id**: The ID of the customer reporting the issue.
+    - **issue_summary**: A brief description of the problem.
+    - **priority**: The urgency of the ticket (e.g., 'Low', 'Medium', 'High').
+    """
+    return build_ticket(request)
+
+# --- API Endpoint: Bulk Ticket Creation ---
+@app.post(
+    "/create_ticket/batch",
+    response_model=list[TicketBatchItem],
+    summary="Create many support tickets in one call"
+)
+def create_ticket_batch(request: BatchCreateTicketRequest):
+    """
+    Creates every ticket in the batch and returns one item per request, in
+    order. A failing item gets `error` set without aborting the others.
+    - **tickets**: Ticket creation requests (at most 1000).
+    """
+    if len(request.tickets) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_SIZE} items).")
+    results = []
+    for index, ticket_request in enumerate(request.tickets):
+        try:
+            results.append({"index": index, "result": build_ticket(ticket_request)})
+        except Exception as e:
+            results.append({"index": index, "error": str(e)})
+    return results
+
 # --- API Endpoint: Get Ticket Status ---
 @app.get(
     "/ticket_status/{ticket_id}",
     response_model=TicketResponse,
     summary="Retrieve the status of a specific ticket"
 )
-async def get_ticket_status(ticket_id: str):
+def get_ticket_status(ticket_id: str):
     """
     Retrieves the current status of a specific support ticket.
     - **ticket_id**: The unique identifier of the ticket.
     """
-    ticket = MOCK_TICKETS.get(ticket_id)
+    ticket = ticket_store.get(ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found.")
     return ticket
 
+# --- API Endpoint: List / Filter Tickets ---
+@app.get(
+    "/tickets",
+    response_model=TicketListResponse,
+    summary="List tickets by customer, status or priority, newest first"
+)
+def list_tickets(
+    customer_id: Optional[str] = None,
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    """
+    Lists tickets matching every given filter, newest first, using the store's
+    secondary indexes rather than a full scan.
+    - **customer_id** / **status** / **priority**: Optional exact-match filters.
+    - **limit**: Page size (1-500).
+    - **cursor**: The `next_cursor` from the previous page.
+    """
+    try:
+        tickets, next_cursor = ticket_store.list(
+            customer_id=customer_id, status=status, priority=priority, limit=limit, cursor=cursor
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"tickets": tickets, "next_cursor": next_cursor}
+
 # --- Main function to run the service ---
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8002)) # Using a different port: 8002
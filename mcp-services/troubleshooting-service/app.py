@@ -1,7 +1,14 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
+from typing import Optional
 import uvicorn
 import os
+import sys
+
+# Make the repository's shared modules importable when run as `python app.py`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from shared import metrics, tracing
+from shared.guide_index import GuideIndex
 
 # --- Mock Data for Troubleshooting Steps ---
 MOCK_TROUBLESHOOTING_GUIDES = {
@@ -37,17 +44,45 @@ MOCK_TROUBLESHOOTING_GUIDES = {
     }
 }
 
+# Resolves issue keys and free-text descriptions ("slow internet", "internet_down") to guides
+GUIDE_INDEX = GuideIndex(MOCK_TROUBLESHOOTING_GUIDES)
+
+def find_guide(issue_type: str) -> Optional[dict]:
+    match = GUIDE_INDEX.resolve(issue_type)
+    if match is None:
+        return None
+    return {**MOCK_TROUBLESHOOTING_GUIDES[match.issue_type], "issue_type": match.issue_type, "match_score": match.score}
+
 # --- FastAPI Application Setup ---
 app = FastAPI(
     title="Mock Troubleshooting Service",
     description="Provides predefined troubleshooting steps for common IT issues.",
     version="1.0.0"
 )
+tracing.instrument_app(app, "troubleshooting-service")
+metrics.instrument_app(app, "troubleshooting-service")
 
 # Pydantic model for the response structure
 class TroubleshootingGuideResponse(BaseModel):
     issue: str
     steps: list[str]
+    issue_type: Optional[str] = None
+    match_score: Optional[float] = None
+
+class GuideCandidate(BaseModel):
+    issue_type: str
+    issue: str
+    score: float
+
+MAX_BATCH_SIZE = 1000
+
+class BatchTroubleshootingRequest(BaseModel):
+    issue_types: list[str]
+
+class TroubleshootingBatchItem(BaseModel):
+    issue_type: str
+    result: Optional[TroubleshootingGuideResponse] = None
+    error: Optional[str] = None
 
 # --- API Endpoint: Get Troubleshooting Steps ---
 @app.get(
@@ -58,13 +93,50 @@ class TroubleshootingGuideResponse(BaseModel):
 async def get_troubleshooting_steps(issue_type: str):
     """
     Retrieves a list of troubleshooting steps for a common issue type.
-    - **issue_type**: Identifier for the issue (e.g., 'internet_slow', 'login_issue').
+    - **issue_type**: Identifier for the issue (e.g., 'internet_slow', 'login_issue') or a short
+      description ('slow internet'); the response names the guide it resolved to.
     """
-    guide = MOCK_TROUBLESHOOTING_GUIDES.get(issue_type.lower())
+    guide = find_guide(issue_type)
     if not guide:
-        raise HTTPException(status_code=404, detail=f"Troubleshooting guide for '{issue_type}' not found.")
+        raise HTTPException(status_code=404, detail=GUIDE_INDEX.not_found(issue_type))
     return guide
 
+# --- API Endpoint: Search Guides ---
+@app.get(
+    "/troubleshooting_guides/search",
+    response_model=list[GuideCandidate],
+    summary="Rank troubleshooting guides for a free-text issue description"
+)
+async def search_troubleshooting_guides(q: str, limit: int = Query(5, ge=1, le=50)):
+    """
+    Returns the best-matching guides with scores (1.0 = exact key, title or alias match).
+    - **q**: Issue description, e.g. 'wifi keeps dropping'.
+    """
+    return [match._asdict() for match in GUIDE_INDEX.search(q, limit=limit)]
+
+# --- API Endpoint: Bulk Troubleshooting Steps ---
+@app.post(
+    "/troubleshooting_steps/batch",
+    response_model=list[TroubleshootingBatchItem],
+    summary="Retrieve troubleshooting steps for many issue types in one call"
+)
+async def get_troubleshooting_steps_batch(request: BatchTroubleshootingRequest):
+    """
+    Returns one item per requested issue type, in request order. Unknown
+    issue types produce an item with `error` set.
+    - **issue_types**: Issue identifiers to look up (at most 1000).
+    """
+    if len(request.issue_types) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_SIZE} items).")
+    results = []
+    for issue_type in request.issue_types:
+        guide = find_guide(issue_type)
+        if guide:
+            results.append({"issue_type": issue_type, "result": guide})
+        else:
+            results.append({"issue_type": issue_type, "error": GUIDE_INDEX.not_found(issue_type)})
+    return results
+
 # --- Main function to run the service ---
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8001)) # Using a different port: 8001
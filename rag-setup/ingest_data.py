@@ -1,56 +1,393 @@
 # In agentic-ai-support-demo/rag-setup/ingest_data.py
 
 import os
+import sys
 import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import weaviate # Use the v4 client
-from llama_index.core import Document, VectorStoreIndex, Settings
+from weaviate.classes.query import Filter
+from llama_index.core import Document
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import MetadataMode
 from llama_index.vector_stores.weaviate import WeaviateVectorStore
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 
-def ingest_data_weaviate_v4():
+# Allow `python rag-setup/ingest_data.py` to import the shared app modules.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app import config
+from app.answer_cache import new_ingest_stamp, touch_ingest_stamp, write_collection_stamp
+from app.bm25 import BM25Index, bm25_path
+from app.vector_index import LocalIndexWriter
+
+# --- Configuration ---
+DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'product_faqs.json')
+EMBEDDING_MODEL_NAME = config.EMBEDDING_MODEL_NAME
+WEAVIATE_INDEX_NAME = config.KB_INDEX_NAME
+
+
+# ---------------------------
+# 1. Streaming input
+# ---------------------------
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """
+    Yields the items of a top-level JSON array one at a time, reading the file
+    in chunks instead of materializing the whole document with json.load.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    started = False
+    with open(path, 'r') as f:
+        eof = False
+        while True:
+            # Skip whitespace and separators between items
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if not started and pos < len(buf):
+                if buf[pos] != "[":
+                    raise ValueError(f"{path} does not contain a JSON array")
+                started = True
+                pos += 1
+                continue
+            if started and pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                if pos >= len(buf):
+                    raise ValueError("need more data")
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    if buf[pos:].strip():
+                        raise ValueError(f"Truncated or invalid JSON in {path}")
+                    return
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+            pos = end
+
+
+def content_hash(item):
+    payload = json.dumps(
+        {"title": item["title"], "content": item["content"], "category": item["category"]},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def to_document(item):
+    return Document(
+        id_=item["id"],
+        text=item["content"],
+        metadata={"id": item["id"], "title": item["title"], "category": item["category"]},
+    )
+
+
+# ---------------------------
+# 2. Manifest of ingested documents
+# ---------------------------
+
+def manifest_path(index_name, backend):
+    return os.path.join(config.KB_DATA_DIR, f"{index_name}.{backend}.manifest.json")
+
+
+def load_manifest(index_name, backend):
+    try:
+        with open(manifest_path(index_name, backend), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(index_name, backend, manifest):
+    path = manifest_path(index_name, backend)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# A run appends the ids of every batch to the journal before writing it to the
+# sink, and removes the journal once the manifest is saved. A journal left on
+# disk means the last run failed part-way: those ids may have stored chunks
+# the manifest does not know about.
+
+def journal_path(index_name, backend):
+    return os.path.join(config.KB_DATA_DIR, f"{index_name}.{backend}.journal")
+
+
+def load_journal(index_name, backend):
+    try:
+        with open(journal_path(index_name, backend), 'r') as f:
+            return {doc_id for line in f if line.strip() for doc_id in json.loads(line)}
+    except FileNotFoundError:
+        return set()
+
+
+def append_journal(index_name, backend, doc_ids):
+    path = journal_path(index_name, backend)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(sorted(doc_ids)) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# ---------------------------
+# 3. Batched embedding (process pool workers)
+# ---------------------------
+
+_worker_model = None
+
+def _init_worker(model_name):
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+    _worker_model = SentenceTransformer(model_name)
+
+def _embed_batch(texts):
+    # Same normalization HuggingFaceEmbedding applies at query time
+    return _worker_model.encode(texts, normalize_embeddings=True).tolist()
+
+
+class Embedder:
+    """Embeds text batches on a process pool, or in-process when workers <= 1."""
+
+    def __init__(self, model_name, workers):
+        self.workers = workers
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_name,))
+        else:
+            self.pool = None
+            _init_worker(model_name)
+
+    def submit(self, texts):
+        if self.pool:
+            return self.pool.submit(_embed_batch, texts)
+        return _Done(_embed_batch(texts))
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown()
+
+
+class _Done:
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+
+# ---------------------------
+# 4. Sinks (Weaviate or local NumPy index)
+# ---------------------------
+
+class WeaviateSink:
+    # Document ids per delete_many call; their chunks must stay under Weaviate's
+    # QUERY_MAXIMUM_RESULTS (10,000 by default)
+    DELETE_BATCH = 500
+
+    def __init__(self, index_name):
+        self.index_name = index_name
+        print("Connecting to Weaviate instance using the v4 client...")
+        # Use the v4 connection method
+        self.client = weaviate.connect_to_local(
+            host=config.WEAVIATE_HOST, port=config.WEAVIATE_PORT, grpc_port=config.WEAVIATE_GRPC_PORT
+        )
+        self.store = WeaviateVectorStore(weaviate_client=self.client, index_name=index_name)
+
+    def exists(self):
+        return self.client.collections.exists(self.index_name)
+
+    def reset(self):
+        if self.exists():
+            self.client.collections.delete(self.index_name)
+            print(f"Deleted existing Weaviate collection: {self.index_name}")
+        self.store = WeaviateVectorStore(weaviate_client=self.client, index_name=self.index_name)
+
+    def delete(self, doc_ids):
+        # One filtered delete per DELETE_BATCH documents instead of a round trip per document
+        doc_ids = sorted(doc_ids)
+        if not doc_ids:
+            return
+        collection = self.client.collections.get(self.index_name)
+        for start in range(0, len(doc_ids), self.DELETE_BATCH):
+            chunk = doc_ids[start:start + self.DELETE_BATCH]
+            collection.data.delete_many(where=Filter.by_property("ref_doc_id").contains_any(chunk))
+
+    def upsert(self, nodes, replace=None):
+        # `replace`: ids whose old chunks may be stored; defaults to every document in `nodes`
+        self.delete({node.ref_doc_id for node in nodes} if replace is None else replace)
+        self.store.add(nodes)
+
+    def mark_ingested(self, stamp):
+        # API replicas that do not share KB_DATA_DIR watch the collection for this stamp
+        write_collection_stamp(self.client, self.index_name, stamp)
+
+    def close(self):
+        self.client.close() # Close the connection
+
+    def abort(self):
+        # Writes already reached Weaviate; the journal tells the next run to replace them
+        self.client.close()
+
+
+class LocalIndexSink(LocalIndexWriter):
+    def __init__(self, index_name):
+        print(f"Writing local vector index to {config.KB_DATA_DIR} (quantize={config.KB_LOCAL_QUANTIZE})...")
+        super().__init__(config.KB_DATA_DIR, index_name, quantize=config.KB_LOCAL_QUANTIZE)
+
+    def mark_ingested(self, stamp):
+        # Readers share KB_DATA_DIR; the stamp file is all they need
+        pass
+
+    def abort(self):
+        # Nothing reaches disk before close(), so dropping the writer leaves the last good index
+        pass
+
+
+SINKS = {"weaviate": WeaviateSink, "local": LocalIndexSink}
+
+
+# ---------------------------
+# 5. Pipeline
+# ---------------------------
+
+def ingest_data_weaviate_v4(mode="incremental", batch_size=64, workers=1, data_file=DATA_FILE, backend=config.KB_BACKEND):
     """
-    Loads data and ingests it into a running Weaviate instance using the v4 client.
+    Ingests the FAQ data into a running Weaviate instance using the v4 client,
+    or into the local memory-mapped index when backend is "local".
+
+    `full` drops and rebuilds the collection. `incremental` diffs documents by
+    id and content hash against the manifest of the previous run, and only
+    embeds and upserts what changed, deleting ids that disappeared. An
+    incremental run after a failed one also re-embeds and replaces every id
+    the failed run had started writing.
     """
-    print("--- Starting Data Ingestion for Weaviate (v4 Client) ---")
+    print(f"--- Starting Data Ingestion ({backend} backend, {mode} mode) ---")
+    started = time.perf_counter()
+
+    sink = SINKS[backend](WEAVIATE_INDEX_NAME)
+    previous = load_manifest(WEAVIATE_INDEX_NAME, backend)
+    if mode == "full" or not sink.exists() or not previous:
+        if mode == "incremental":
+            print("No previous manifest or collection found, falling back to a full rebuild.")
+        # Drop the manifest first: if the rebuild fails, the next run rebuilds again
+        remove_file(manifest_path(WEAVIATE_INDEX_NAME, backend))
+        sink.reset()
+        remove_file(journal_path(WEAVIATE_INDEX_NAME, backend))
+        previous = {}
+
+    # Ids a failed earlier run may have written: their chunks are replaced and
+    # they are re-embedded even if the manifest says they are unchanged
+    unfinished = load_journal(WEAVIATE_INDEX_NAME, backend)
+    if unfinished:
+        print(f"Resuming after a failed run: replacing {len(unfinished)} partially written document(s).")
+    replaceable = set(previous) | unfinished
+    previous = {doc_id: digest for doc_id, digest in previous.items() if doc_id not in unfinished}
+
+    print(f"Loading embedding model: {EMBEDDING_MODEL_NAME} ({workers} worker(s), batch size {batch_size})")
+    embedder = Embedder(EMBEDDING_MODEL_NAME, workers)
+    splitter = SentenceSplitter()
+
+    # The keyword index is cheap to build, so it is rebuilt from every scanned document
+    keyword_index = BM25Index()
+    manifest = {}
+    scanned = embedded = 0
+    batch, pending = [], []
 
-    # --- Configuration ---
-    DATA_FILE = os.path.join(os.path.dirname(__file__), 'data', 'product_faqs.json')
-    EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
-    WEAVIATE_INDEX_NAME = "SupportFAQs"
+    def flush_batch():
+        nodes = splitter.get_nodes_from_documents(batch)
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+        pending.append((nodes, embedder.submit(texts)))
+        batch.clear()
+
+    def drain(limit):
+        nonlocal embedded
+        while len(pending) > limit:
+            nodes, future = pending.pop(0)
+            for node, vector in zip(nodes, future.result()):
+                node.embedding = vector
+            doc_ids = {node.ref_doc_id for node in nodes}
+            append_journal(WEAVIATE_INDEX_NAME, backend, doc_ids)
+            # Only documents from earlier runs have old chunks to replace (none after a reset)
+            sink.upsert(nodes, replace=doc_ids & replaceable)
+            embedded += len(doc_ids)
 
-    # --- Load Data ---
     try:
-        with open(DATA_FILE, 'r') as f:
-            documents = [Document(text=item["content"], metadata={"id": item["id"], "title": item["title"], "category": item["category"]}) for item in json.load(f)]
-        print(f"Loaded {len(documents)} raw documents.")
+        for item in iter_json_array(data_file):
+            scanned += 1
+            keyword_index.add(item["id"], item["title"], item["content"], item["category"])
+            digest = content_hash(item)
+            manifest[item["id"]] = digest
+            if previous.get(item["id"]) == digest:
+                continue
+            batch.append(to_document(item))
+            if len(batch) >= batch_size:
+                flush_batch()
+                # Bound in-flight batches so memory stays flat on large corpora
+                drain(limit=max(workers, 1) * 2)
+        if batch:
+            flush_batch()
+        drain(limit=0)
+
+        removed = replaceable - set(manifest)
+        sink.delete(removed)
     except Exception as e:
-        print(f"Error loading data: {e}")
-        exit(1)
-
-    # --- Setup and Ingestion ---
-    print("Connecting to Weaviate instance using the v4 client...")
-    # Use the v4 connection method
-    client = weaviate.connect_to_local()
-    
-    # Check if the collection already exists and delete it for a clean run
-    if client.collections.exists(WEAVIATE_INDEX_NAME):
-        client.collections.delete(WEAVIATE_INDEX_NAME)
-        print(f"Deleted existing Weaviate collection: {WEAVIATE_INDEX_NAME}")
-
-    vector_store = WeaviateVectorStore(weaviate_client=client, index_name=WEAVIATE_INDEX_NAME)
-
-    print(f"Loading embedding model: {EMBEDDING_MODEL_NAME}")
-    Settings.embed_model = HuggingFaceEmbedding(model_name=EMBEDDING_MODEL_NAME)
-    Settings.llm = None
-
-    print(f"Creating and storing index '{WEAVIATE_INDEX_NAME}' in Weaviate...")
-    VectorStoreIndex.from_documents(
-        documents,
-        vector_store=vector_store,
-        show_progress=True
-    )
-    print("\n--- ✅ Success! Data ingestion into Weaviate is complete. ---")
-    client.close() # Close the connection
+        print(f"Error during ingestion: {e}")
+        sink.abort()
+        embedder.close()
+        raise
+
+    # Invalidate answers cached from the previous version of the collection
+    stamp = new_ingest_stamp() if embedded or removed else None
+    try:
+        if stamp:
+            sink.mark_ingested(stamp)
+    finally:
+        sink.close()
+    embedder.close()
+    save_manifest(WEAVIATE_INDEX_NAME, backend, manifest)
+    remove_file(journal_path(WEAVIATE_INDEX_NAME, backend))
+    keyword_index.save(bm25_path(config.KB_DATA_DIR, WEAVIATE_INDEX_NAME))
+    if stamp:
+        # Last, so readers of KB_DATA_DIR reload only once every file is written
+        touch_ingest_stamp(WEAVIATE_INDEX_NAME, stamp)
+
+    elapsed = time.perf_counter() - started
+    print(f"Scanned {scanned} documents: {embedded} embedded/upserted, "
+          f"{scanned - embedded} unchanged, {len(removed)} removed.")
+    print(f"Elapsed {elapsed:.2f}s — {scanned / elapsed:.1f} docs/sec scanned, "
+          f"{embedded / elapsed:.1f} docs/sec embedded.")
+    print(f"\n--- ✅ Success! Data ingestion into the {backend} knowledge base is complete. ---")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ingest FAQ documents into the knowledge base.")
+    parser.add_argument("--mode", choices=["incremental", "full"], default="incremental",
+                        help="incremental: only embed changed documents; full: rebuild the collection")
+    parser.add_argument("--batch-size", type=int, default=64, help="Documents per embedding batch")
+    parser.add_argument("--workers", type=int, default=1, help="Embedding worker processes")
+    parser.add_argument("--data-file", default=DATA_FILE, help="JSON array of FAQ documents")
+    parser.add_argument("--backend", choices=sorted(SINKS), default=config.KB_BACKEND,
+                        help="Knowledge base backend to write (defaults to KB_BACKEND)")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    ingest_data_weaviate_v4()
\ No newline at end of file
+    args = parse_args()
+    ingest_data_weaviate_v4(mode=args.mode, batch_size=args.batch_size, workers=args.workers,
+                            data_file=args.data_file, backend=args.backend)
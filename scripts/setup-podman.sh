@@ -90,6 +90,8 @@ echo "🤖 Setting up Ollama model..."
 if podman ps | grep -q ollama-llm; then
     echo "📥 Pulling llama3 model (this may take a while)..."
     podman exec ollama-llm ollama pull llama3 || echo "⚠️  Model pull failed, trying to continue..."
+    echo "📥 Pulling the Tier 1 model (llama3.2:3b-instruct-q4_K_M)..."
+    podman exec ollama-llm ollama pull llama3.2:3b-instruct-q4_K_M || echo "⚠️  Model pull failed, trying to continue..."
 else
     echo "⚠️  Ollama container not found, skipping model pull"
 fi
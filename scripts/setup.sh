@@ -127,6 +127,8 @@ OLLAMA_CONTAINER=$($CONTAINER_RUNTIME ps --filter "name=ollama" --format "{{.Nam
 if [[ -n "$OLLAMA_CONTAINER" ]]; then
     echo "📥 Pulling llama3 model (this may take several minutes)..."
     $CONTAINER_RUNTIME exec $OLLAMA_CONTAINER ollama pull llama3 || echo "⚠️  Model pull failed, trying to continue..."
+    echo "📥 Pulling the Tier 1 model (llama3.2:3b-instruct-q4_K_M)..."
+    $CONTAINER_RUNTIME exec $OLLAMA_CONTAINER ollama pull llama3.2:3b-instruct-q4_K_M || echo "⚠️  Model pull failed, trying to continue..."
 else
     echo "⚠️  Ollama container not found"
 fi
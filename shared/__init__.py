@@ -0,0 +1 @@
+# Code shared by the unified API (api/main.py) and the mcp-services.
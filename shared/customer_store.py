@@ -0,0 +1,448 @@
+# shared/customer_store.py
+"""
+Customer account storage shared by the unified API and the customer-db
+mcp-service.
+
+    python -m shared.customer_store load customers.jsonl [--db data/customers.db]
+    python -m shared.customer_store stats
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from shared.cache import LRUCache
+from shared.paths import data_path
+from shared.sqlite import ThreadConnections
+
+CUSTOMER_FIELDS = ("account_id", "name", "service_status", "plan", "current_issues")
+# Upper bound on bound parameters per `IN (...)` query (SQLite's default limit is 999 before 3.32)
+MAX_IN_PARAMS = 500
+LOAD_BATCH_SIZE = 10_000
+
+# Demo accounts the services have always answered for; seeded into an empty store.
+DEMO_CUSTOMERS: List[Dict] = [
+    {
+        "account_id": "CUST123",
+        "name": "Alice Smith",
+        "service_status": "Active",
+        "plan": "Premium Internet",
+        "current_issues": [],
+    },
+    {
+        "account_id": "CUST456",
+        "name": "Bob Johnson",
+        "service_status": "Inactive",
+        "plan": "Basic Internet",
+        "current_issues": ["internet_down", "billing_issue"],
+    },
+    {
+        "account_id": "CUST789",
+        "name": "Charlie Brown",
+        "service_status": "Active",
+        "plan": "Standard TV",
+        "current_issues": ["login_failure"],
+    },
+    {
+        "account_id": "CUST000",
+        "name": "Demo Customer",
+        "service_status": "Active",
+        "plan": "Fiber Max",
+        "current_issues": [],
+    },
+]
+
+
+class InvalidRecord(ValueError):
+    """Raised when an input record is missing a field or has a malformed one."""
+
+
+def normalize_record(record: Dict) -> Dict:
+    """
+    Validates one customer record. `current_issues` may be a list, a JSON
+    array string or a ";"-separated string (the CSV form).
+    """
+    if not isinstance(record, dict):
+        raise InvalidRecord(f"Expected an object, not {type(record).__name__}")
+    missing = [f for f in CUSTOMER_FIELDS[:-1] if not str(record.get(f) or "").strip()]
+    if missing:
+        raise InvalidRecord(f"Missing {', '.join(missing)}")
+    issues = record.get("current_issues") or []
+    if isinstance(issues, str):
+        issues = issues.strip()
+        if issues.startswith("["):
+            try:
+                issues = json.loads(issues)
+            except ValueError:
+                raise InvalidRecord(f"Malformed current_issues: {issues!r}")
+        else:
+            issues = [issue.strip() for issue in issues.split(";") if issue.strip()]
+    if not isinstance(issues, list):
+        raise InvalidRecord(f"current_issues must be a list, not {type(issues).__name__}")
+    return {
+        "account_id": str(record["account_id"]).strip(),
+        "name": str(record["name"]).strip(),
+        "service_status": str(record["service_status"]).strip(),
+        "plan": str(record["plan"]).strip(),
+        "current_issues": [str(issue) for issue in issues],
+    }
+
+
+class CustomerStore:
+    """
+    Storage engine interface for customer accounts, keyed by account_id.
+
+    `get_many` returns only the accounts that exist; callers decide how to
+    report the rest. `upsert_many` accepts any iterable, so loaders can
+    stream records without holding a file in memory.
+    """
+
+    def get(self, account_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def get_many(self, account_ids: Sequence[str]) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+    def upsert_many(self, customers: Iterable[Dict], batch_size: int = LOAD_BATCH_SIZE) -> int:
+        raise NotImplementedError
+
+    def is_empty(self) -> bool:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        return {"backend": type(self).__name__}
+
+
+# ---------------------------
+# SQLite (default)
+# ---------------------------
+
+class SQLiteCustomerStore(CustomerStore):
+    """
+    Embedded SQLite store in WAL mode, shared by every uvicorn worker on the
+    host. The table is WITHOUT ROWID, so rows live in the primary key B-tree
+    and a lookup is one index descent: O(log n) pages, a handful even at
+    tens of millions of accounts. The file is memory-mapped (`mmap_size`),
+    so hot pages are read straight from the OS page cache.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS customers (
+            account_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            service_status TEXT NOT NULL,
+            plan TEXT NOT NULL,
+            current_issues TEXT NOT NULL
+        ) WITHOUT ROWID;
+    """
+    UPSERT = (
+        f"INSERT OR REPLACE INTO customers ({', '.join(CUSTOMER_FIELDS)}) "
+        f"VALUES ({', '.join('?' * len(CUSTOMER_FIELDS))})"
+    )
+
+    def __init__(self, path: str, mmap_size: int = 256 * 1024 * 1024):
+        self.path = path
+        self.mmap_size = mmap_size
+        # Point lookups read straight from the mapped file instead of copying pages
+        self._conn = ThreadConnections(path, pragmas=[f"mmap_size={int(mmap_size)}"])
+        self._conn().executescript(self.SCHEMA)
+
+    @staticmethod
+    def _row(row: Tuple) -> Dict:
+        account_id, name, service_status, plan, issues = row
+        return {
+            "account_id": account_id,
+            "name": name,
+            "service_status": service_status,
+            "plan": plan,
+            "current_issues": json.loads(issues),
+        }
+
+    def get(self, account_id: str) -> Optional[Dict]:
+        row = self._conn().execute(
+            f"SELECT {', '.join(CUSTOMER_FIELDS)} FROM customers WHERE account_id = ?", (account_id,)
+        ).fetchone()
+        return self._row(row) if row else None
+
+    def get_many(self, account_ids: Sequence[str]) -> Dict[str, Dict]:
+        found: Dict[str, Dict] = {}
+        unique = list(dict.fromkeys(account_ids))
+        conn = self._conn()
+        for start in range(0, len(unique), MAX_IN_PARAMS):
+            chunk = unique[start:start + MAX_IN_PARAMS]
+            rows = conn.execute(
+                f"SELECT {', '.join(CUSTOMER_FIELDS)} FROM customers "
+                f"WHERE account_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            for row in rows:
+                found[row[0]] = self._row(row)
+        return found
+
+    def upsert_many(self, customers: Iterable[Dict], batch_size: int = LOAD_BATCH_SIZE) -> int:
+        """Writes records in transactions of `batch_size` rows; returns the number written."""
+        conn = self._conn()
+        rows = (
+            (c["account_id"], c["name"], c["service_status"], c["plan"], json.dumps(c["current_issues"]))
+            for c in customers
+        )
+        written = 0
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return written
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(self.UPSERT, batch)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            written += len(batch)
+
+    def is_empty(self) -> bool:
+        return self._conn().execute("SELECT 1 FROM customers LIMIT 1").fetchone() is None
+
+    def count(self) -> int:
+        # Scans the whole table; used by the CLI, not on request paths
+        return self._conn().execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+    def stats(self) -> Dict:
+        return {"backend": "sqlite", "path": self.path}
+
+
+# ---------------------------
+# In-memory (tests, throwaway demos)
+# ---------------------------
+
+class InMemoryCustomerStore(CustomerStore):
+    """Process-local dict with the same semantics."""
+
+    def __init__(self):
+        self._customers: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, account_id: str) -> Optional[Dict]:
+        customer = self._customers.get(account_id)
+        return _copy(customer) if customer else None
+
+    def get_many(self, account_ids: Sequence[str]) -> Dict[str, Dict]:
+        customers = self._customers
+        return {a: _copy(customers[a]) for a in account_ids if a in customers}
+
+    def upsert_many(self, customers: Iterable[Dict], batch_size: int = LOAD_BATCH_SIZE) -> int:
+        written = 0
+        for customer in customers:
+            with self._lock:
+                self._customers[customer["account_id"]] = _copy(customer)
+            written += 1
+        return written
+
+    def is_empty(self) -> bool:
+        return not self._customers
+
+    def count(self) -> int:
+        return len(self._customers)
+
+    def stats(self) -> Dict:
+        return {"backend": "memory", "customers": len(self._customers)}
+
+
+def _copy(customer: Dict) -> Dict:
+    return {**customer, "current_issues": list(customer["current_issues"])}
+
+
+# ---------------------------
+# Read-through cache
+# ---------------------------
+
+class CachedCustomerStore(CustomerStore):
+    """
+    In-process LRU cache in front of another store. Hits never touch the
+    backend, so the hot set of accounts is answered in microseconds however
+    large the table grows. Misses are cached too (for `negative_ttl`), so
+    repeated lookups of a mistyped ID do not hit the database. Entries
+    expire after `ttl` seconds, which bounds how stale a worker's copy can
+    be after another process updates the store; writes through this object
+    invalidate its own entries immediately.
+    """
+
+    _ABSENT = object()
+
+    def __init__(self, store: CustomerStore, max_size: int = 100_000, ttl: float = 60,
+                 negative_ttl: float = 5):
+        self.store = store
+        self.negative_ttl = negative_ttl
+        self._cache = LRUCache(max_size=max_size, ttl=ttl)
+
+    def get(self, account_id: str) -> Optional[Dict]:
+        cached = self._cache.get(account_id)
+        if cached is None:
+            cached = self.store.get(account_id)
+            if cached is None:
+                self._cache.put(account_id, self._ABSENT, ttl=self.negative_ttl)
+                return None
+            self._cache.put(account_id, cached)
+        if cached is self._ABSENT:
+            return None
+        return _copy(cached)
+
+    def get_many(self, account_ids: Sequence[str]) -> Dict[str, Dict]:
+        found: Dict[str, Dict] = {}
+        missing = []
+        for account_id in dict.fromkeys(account_ids):
+            cached = self._cache.get(account_id)
+            if cached is None:
+                missing.append(account_id)
+            elif cached is not self._ABSENT:
+                found[account_id] = _copy(cached)
+        if missing:
+            loaded = self.store.get_many(missing)
+            for account_id in missing:
+                customer = loaded.get(account_id)
+                if customer is None:
+                    self._cache.put(account_id, self._ABSENT, ttl=self.negative_ttl)
+                else:
+                    self._cache.put(account_id, customer)
+                    found[account_id] = _copy(customer)
+        return found
+
+    def upsert_many(self, customers: Iterable[Dict], batch_size: int = LOAD_BATCH_SIZE) -> int:
+        def invalidating(records):
+            for customer in records:
+                self._cache.pop(customer["account_id"])
+                yield customer
+        return self.store.upsert_many(invalidating(customers), batch_size=batch_size)
+
+    def is_empty(self) -> bool:
+        return self.store.is_empty()
+
+    def count(self) -> int:
+        return self.store.count()
+
+    def stats(self) -> Dict:
+        return {**self.store.stats(), "cache": self._cache.stats()}
+
+    def hit_rate(self) -> float:
+        return self._cache.stats()["hit_rate"]
+
+
+# ---------------------------
+# Bulk loading
+# ---------------------------
+
+def iter_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Streams raw records from a CSV (header row naming the fields) or JSONL
+    file, one line at a time. `fmt` defaults to the file extension; "-"
+    reads standard input.
+    """
+    fmt = (fmt or os.path.splitext(path)[1].lstrip(".") or "jsonl").lower()
+    if fmt not in ("csv", "jsonl", "ndjson"):
+        raise ValueError(f"Unsupported format '{fmt}' (expected csv or jsonl)")
+    f = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8") if path == "-" else open(path, encoding="utf-8", newline="")
+    with f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield {"_error": f"Malformed JSON: {e}"}
+
+
+def load_records(store: CustomerStore, records: Iterable[Dict], batch_size: int = LOAD_BATCH_SIZE,
+                 errors: Optional[List[str]] = None, max_errors: int = 100) -> Tuple[int, int]:
+    """
+    Validates and writes a stream of records in batches. Invalid records are
+    skipped; the first `max_errors` reasons are appended to `errors`.
+    Returns (written, skipped).
+    """
+    skipped = 0
+
+    def valid():
+        nonlocal skipped
+        for line, record in enumerate(records, start=1):
+            try:
+                if isinstance(record, dict) and "_error" in record:
+                    raise InvalidRecord(record["_error"])
+                yield normalize_record(record)
+            except InvalidRecord as e:
+                skipped += 1
+                if errors is not None and len(errors) < max_errors:
+                    errors.append(f"record {line}: {e}")
+
+    written = store.upsert_many(valid(), batch_size=batch_size)
+    return written, skipped
+
+
+def create_customer_store(backend: Optional[str] = None, path: Optional[str] = None,
+                          cache_size: Optional[int] = None, seed: bool = True) -> CustomerStore:
+    """
+    Builds the store selected by CUSTOMER_STORE ("sqlite" or "memory") and
+    CUSTOMER_DB_PATH, behind a read-through cache of CUSTOMER_CACHE_SIZE
+    entries (0 = no cache) living CUSTOMER_CACHE_TTL seconds. An empty store
+    is seeded with the demo accounts.
+    """
+    backend = (backend or os.getenv("CUSTOMER_STORE", "sqlite")).lower()
+    if backend == "memory":
+        store: CustomerStore = InMemoryCustomerStore()
+    elif backend == "sqlite":
+        store = SQLiteCustomerStore(path or os.getenv("CUSTOMER_DB_PATH", data_path("customers.db")))
+    else:
+        raise ValueError(f"Unknown CUSTOMER_STORE '{backend}'")
+    if seed and store.is_empty():
+        store.upsert_many(DEMO_CUSTOMERS)
+    cache_size = int(os.getenv("CUSTOMER_CACHE_SIZE", "100000")) if cache_size is None else cache_size
+    if cache_size > 0 and backend != "memory":
+        store = CachedCustomerStore(store, max_size=cache_size, ttl=float(os.getenv("CUSTOMER_CACHE_TTL", "60")))
+    return store
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m shared.customer_store", description="Customer store tools.")
+    parser.add_argument("--db", help="SQLite file (default: CUSTOMER_DB_PATH or data/customers.db)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    load = commands.add_parser("load", help="Bulk-load accounts from CSV or JSONL (upserts by account_id)")
+    load.add_argument("file", help="Input file, or - for standard input")
+    load.add_argument("--format", choices=["csv", "jsonl"], help="Input format (default: from the extension)")
+    load.add_argument("--batch-size", type=int, default=LOAD_BATCH_SIZE, help="Rows per transaction")
+    commands.add_parser("stats", help="Print the number of stored accounts")
+    args = parser.parse_args(argv)
+
+    store = SQLiteCustomerStore(args.db or os.getenv("CUSTOMER_DB_PATH", data_path("customers.db")))
+    if args.command == "stats":
+        print(json.dumps({**store.stats(), "customers": store.count()}))
+        return
+
+    errors: List[str] = []
+    started = time.perf_counter()
+    written, skipped = load_records(store, iter_records(args.file, args.format), args.batch_size, errors)
+    seconds = time.perf_counter() - started
+    for error in errors:
+        print(f"skipped {error}", file=sys.stderr)
+    print(f"Loaded {written} accounts in {seconds:.1f}s ({written / seconds if seconds else 0:,.0f}/s), "
+          f"skipped {skipped}")
+    if skipped and not written:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
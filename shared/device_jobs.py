@@ -0,0 +1,227 @@
+# shared/device_jobs.py
+
+import asyncio
+import os
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from shared import metrics
+from shared.ratelimit import KeyedRateLimiter
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+DEVICE_REBOOTS = metrics.counter(
+    "device_reboot_requests_total", "Reboot requests by outcome.", ("outcome",)
+)
+DEVICE_REBOOT_DURATION = metrics.histogram(
+    "device_reboot_duration_seconds", "Time from a reboot job starting to finishing.", ("status",)
+)
+
+
+class RateLimited(Exception):
+    """Raised by DeviceJobManager.submit when a device was rebooted too recently."""
+
+    def __init__(self, device_id: str, retry_after: float):
+        super().__init__(f"Device {device_id} was rebooted recently; retry in {retry_after:.0f}s.")
+        self.device_id = device_id
+        self.retry_after = retry_after
+
+
+@dataclass
+class RebootJob:
+    job_id: str
+    device_id: str
+    idempotency_key: Optional[str] = None
+    status: str = QUEUED
+    message: Optional[str] = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    # Every idempotency key that resolves to this job, dropped with it
+    _keys: List[str] = field(default_factory=list, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits until the job finishes or `timeout` elapses; returns whether it finished."""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.done
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "device_id": self.device_id,
+            "idempotency_key": self.idempotency_key,
+            "status": self.status,
+            "message": self.message,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+async def simulated_reboot(device_id: str, seconds: float = 2.0) -> str:
+    """Stands in for the device management platform call."""
+    await asyncio.sleep(seconds)
+    return f"Device {device_id} rebooted and is back online."
+
+
+class DeviceJobManager:
+    """
+    Runs device reboots as background jobs on the service's event loop.
+
+    A submitted reboot returns a job at once; the device operation runs in
+    an asyncio task, at most `max_concurrency` at a time across the process,
+    so a burst of reboots during an area outage cannot exhaust connections
+    to the device platform. Duplicates collapse onto one job: a repeated
+    idempotency key returns the job it created, and a reboot of a device
+    whose reboot is still queued or running returns that reboot. Otherwise
+    each device may be rebooted at most `burst` times per `min_interval`
+    seconds (RateLimited). Finished jobs are kept for `retention` seconds.
+
+    Not thread-safe: call it from the event loop. Jobs live in the process,
+    like app/jobs.py, so polls must reach the worker that took the reboot.
+    """
+
+    def __init__(
+        self,
+        reboot: Callable[[str], Awaitable[str]],
+        max_concurrency: int = 16,
+        min_interval: float = 60,
+        burst: int = 1,
+        timeout: float = 60,
+        retention: float = 3600,
+    ):
+        self.reboot = reboot
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retention = retention
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._limiter = KeyedRateLimiter(burst / min_interval, burst) if min_interval > 0 else None
+        self._jobs: Dict[str, RebootJob] = {}
+        self._by_key: Dict[str, str] = {}
+        self._active: Dict[str, str] = {}
+        self._finished: Deque[str] = deque()
+        self._tasks = set()
+
+    def get(self, job_id: str) -> Optional[RebootJob]:
+        return self._jobs.get(job_id)
+
+    def active_count(self) -> int:
+        return len(self._active)
+
+    def submit(self, device_id: str, idempotency_key: Optional[str] = None) -> Tuple[RebootJob, bool]:
+        """Returns (job, created); created is False when the request collapsed onto an existing job."""
+        self._prune()
+        existing = self._jobs.get(self._by_key.get(idempotency_key)) if idempotency_key else None
+        if existing is None:
+            existing = self._jobs.get(self._active.get(device_id))
+        if existing is not None:
+            if idempotency_key and idempotency_key not in self._by_key:
+                self._by_key[idempotency_key] = existing.job_id
+                existing._keys.append(idempotency_key)
+            DEVICE_REBOOTS.inc(outcome="collapsed")
+            return existing, False
+        if self._limiter is not None and not self._limiter.try_acquire(device_id):
+            DEVICE_REBOOTS.inc(outcome="rate_limited")
+            raise RateLimited(device_id, self._limiter.retry_after(device_id))
+
+        job = RebootJob(
+            job_id=uuid.uuid4().hex[:12], device_id=device_id, idempotency_key=idempotency_key,
+            message=f"Reboot command queued for device {device_id}.",
+        )
+        self._jobs[job.job_id] = job
+        self._active[device_id] = job.job_id
+        if idempotency_key:
+            self._by_key[idempotency_key] = job.job_id
+            job._keys.append(idempotency_key)
+        # Keep a reference: the loop only holds weak references to tasks
+        task = asyncio.get_running_loop().create_task(self._execute(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        DEVICE_REBOOTS.inc(outcome="accepted")
+        return job, True
+
+    def submit_many(self, device_ids: Sequence[str], idempotency_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Submits one reboot per device, in order; one {device_id, job, created,
+        error} item each. A batch idempotency key is scoped per device, so
+        retrying the whole batch returns the same jobs.
+        """
+        items = []
+        for device_id in device_ids:
+            key = f"{idempotency_key}:{device_id}" if idempotency_key else None
+            try:
+                job, created = self.submit(device_id, key)
+                items.append({"device_id": device_id, "job": job, "created": created, "error": None})
+            except RateLimited as e:
+                items.append({"device_id": device_id, "job": None, "created": False, "error": str(e)})
+        return items
+
+    async def _execute(self, job: RebootJob):
+        async with self._semaphore:
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                job.message = await asyncio.wait_for(self.reboot(job.device_id), self.timeout)
+                job.status = SUCCEEDED
+            except asyncio.TimeoutError:
+                job.error = f"Device {job.device_id} did not respond within {self.timeout:g}s."
+                job.status = FAILED
+            except Exception as e:
+                job.error = str(e) or type(e).__name__
+                job.status = FAILED
+            finally:
+                job.finished_at = time.time()
+                DEVICE_REBOOT_DURATION.observe(job.finished_at - job.started_at, status=job.status)
+                if self._active.get(job.device_id) == job.job_id:
+                    del self._active[job.device_id]
+                self._finished.append(job.job_id)
+                job._done.set()
+
+    def _prune(self):
+        # Jobs finish roughly in order, so expired ones sit at the left of the deque
+        cutoff = time.time() - self.retention
+        while self._finished:
+            job = self._jobs.get(self._finished[0])
+            if job is not None and job.finished_at > cutoff:
+                break
+            self._finished.popleft()
+            if job is not None:
+                del self._jobs[job.job_id]
+                for key in job._keys:
+                    if self._by_key.get(key) == job.job_id:
+                        del self._by_key[key]
+
+
+def create_device_job_manager() -> DeviceJobManager:
+    """
+    Builds the manager from DEVICE_REBOOT_CONCURRENCY, DEVICE_REBOOT_INTERVAL
+    (minimum seconds between reboots of one device, 0 = unlimited),
+    DEVICE_REBOOT_SECONDS (simulated reboot duration) and DEVICE_JOB_RETENTION.
+    """
+    seconds = float(os.getenv("DEVICE_REBOOT_SECONDS", "2"))
+
+    async def reboot(device_id: str) -> str:
+        return await simulated_reboot(device_id, seconds)
+
+    return DeviceJobManager(
+        reboot,
+        max_concurrency=int(os.getenv("DEVICE_REBOOT_CONCURRENCY", "16")),
+        min_interval=float(os.getenv("DEVICE_REBOOT_INTERVAL", "60")),
+        retention=float(os.getenv("DEVICE_JOB_RETENTION", "3600")),
+    )
@@ -0,0 +1,14 @@
+# shared/paths.py
+
+import os
+
+# Local state (SQLite databases, trace files) lives under the repository's data/
+# directory unless DATA_DIR says otherwise, so services started from another
+# working directory still find the same files.
+DATA_DIR = os.getenv(
+    "DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+)
+
+
+def data_path(name: str) -> str:
+    return os.path.join(DATA_DIR, name)
@@ -0,0 +1,105 @@
+# shared/ratelimit.py
+
+import asyncio
+import threading
+import time
+from typing import Callable, Hashable, Optional
+
+from shared.cache import LRUCache
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: holds up to `capacity` tokens and refills at
+    `rate` tokens per second. `try_acquire` never waits; `acquire` and
+    `aacquire` wait for a token, up to `timeout` seconds.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def retry_after(self, tokens: float = 1) -> float:
+        """Seconds until `tokens` are available (0 when they are now)."""
+        with self._lock:
+            self._refill(self._clock())
+            return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def _reserve(self, tokens: float, timeout: Optional[float]) -> Optional[float]:
+        # Takes the tokens now, possibly going negative, and returns how long the
+        # caller must wait for them; later callers queue up behind it
+        with self._lock:
+            self._refill(self._clock())
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return None
+            self._tokens -= tokens
+            return wait
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Blocks until `tokens` are available; False if that would take longer than `timeout`."""
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Async `acquire`: sleeps on the event loop instead of blocking the thread."""
+        wait = self._reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+
+class KeyedRateLimiter:
+    """
+    One TokenBucket per key (device, customer...), created on first use.
+    Buckets of the `max_keys` least recently seen keys are dropped; a dropped
+    bucket comes back full, which only ever errs towards allowing a request.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1, max_keys: int = 100_000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._buckets = LRUCache(max_size=max_keys)
+        self._lock = threading.Lock()
+
+    def bucket(self, key: Hashable) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(self.rate, self.capacity, clock=self._clock)
+                    self._buckets.put(key, bucket)
+        return bucket
+
+    def try_acquire(self, key: Hashable, tokens: float = 1) -> bool:
+        return self.bucket(key).try_acquire(tokens)
+
+    def retry_after(self, key: Hashable, tokens: float = 1) -> float:
+        return self.bucket(key).retry_after(tokens)
@@ -0,0 +1,48 @@
+# shared/sqlite.py
+
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional, Sequence
+
+
+class ThreadConnections:
+    """
+    Opens one sqlite3 connection per calling thread to the database at `path`;
+    call the instance to get the current thread's connection. sqlite3
+    connections cannot be shared across threads, and the stores are called
+    from FastAPI's threadpool.
+
+    Connections are in autocommit mode (callers issue BEGIN themselves) with
+    WAL journaling, so readers do not block the writer. `pragmas` run once
+    per connection after that. Note that ":memory:" gives each thread its
+    own, empty database.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        pragmas: Sequence[str] = (),
+        row_factory: Optional[Callable] = None,
+        timeout: float = 5,
+    ):
+        self.path = path
+        self.pragmas = tuple(pragmas)
+        self.row_factory = row_factory
+        self.timeout = timeout
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+
+    def __call__(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for pragma in self.pragmas:
+                conn.execute(f"PRAGMA {pragma}")
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,179 @@
+# shared/ticket_store.py
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from shared.paths import data_path
+from shared.sqlite import ThreadConnections
+
+TICKET_FIELDS = (
+    "ticket_id", "customer_id", "issue_summary", "priority",
+    "status", "created_at", "estimated_resolution",
+)
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(ticket: Dict) -> str:
+    raw = json.dumps([ticket["created_at"], ticket["ticket_id"]]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), str(ticket_id)
+    except Exception:
+        raise InvalidCursor(f"Invalid cursor: {cursor!r}")
+
+
+class TicketStore:
+    """
+    Storage engine interface for support tickets.
+
+    `list` returns tickets newest first and pages with an opaque keyset
+    cursor (created_at, ticket_id), so deep pages cost the same as the first.
+    """
+
+    def create(self, ticket: Dict) -> Dict:
+        raise NotImplementedError
+
+    def get(self, ticket_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def list(
+        self,
+        customer_id: Optional[str] = None,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+
+# ---------------------------
+# SQLite (default)
+# ---------------------------
+
+class SQLiteTicketStore(TicketStore):
+    """
+    Embedded SQLite store in WAL mode, so several uvicorn workers can share one
+    database file (concurrent readers, one writer at a time). Each filterable
+    column has an index suffixed with (created_at, ticket_id), which serves
+    both the filter and the keyset pagination order.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS tickets (
+            ticket_id TEXT PRIMARY KEY,
+            customer_id TEXT NOT NULL,
+            issue_summary TEXT NOT NULL,
+            priority TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            estimated_resolution TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_tickets_customer ON tickets (customer_id, created_at, ticket_id);
+        CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets (status, created_at, ticket_id);
+        CREATE INDEX IF NOT EXISTS idx_tickets_priority ON tickets (priority, created_at, ticket_id);
+        CREATE INDEX IF NOT EXISTS idx_tickets_created ON tickets (created_at, ticket_id);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = ThreadConnections(path, row_factory=sqlite3.Row)
+        self._conn().executescript(self.SCHEMA)
+
+    def create(self, ticket: Dict) -> Dict:
+        self._conn().execute(
+            f"INSERT INTO tickets ({', '.join(TICKET_FIELDS)}) VALUES ({', '.join('?' * len(TICKET_FIELDS))})",
+            [ticket[field] for field in TICKET_FIELDS],
+        )
+        return ticket
+
+    def get(self, ticket_id: str) -> Optional[Dict]:
+        row = self._conn().execute("SELECT * FROM tickets WHERE ticket_id = ?", (ticket_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, customer_id=None, status=None, priority=None, limit=50, cursor=None):
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        clauses, params = [], []
+        for column, value in (("customer_id", customer_id), ("status", status), ("priority", priority)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if cursor:
+            clauses.append("(created_at, ticket_id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn().execute(
+            f"SELECT * FROM tickets {where} ORDER BY created_at DESC, ticket_id DESC LIMIT ?",
+            params + [limit + 1],
+        ).fetchall()
+        tickets = [dict(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(tickets[-1]) if len(rows) > limit else None
+        return tickets, next_cursor
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+
+# ---------------------------
+# In-memory (tests, throwaway demos)
+# ---------------------------
+
+class InMemoryTicketStore(TicketStore):
+    """Process-local store with the same semantics; filters scan every ticket."""
+
+    def __init__(self):
+        self._tickets: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def create(self, ticket: Dict) -> Dict:
+        with self._lock:
+            self._tickets[ticket["ticket_id"]] = dict(ticket)
+        return ticket
+
+    def get(self, ticket_id: str) -> Optional[Dict]:
+        ticket = self._tickets.get(ticket_id)
+        return dict(ticket) if ticket else None
+
+    def list(self, customer_id=None, status=None, priority=None, limit=50, cursor=None):
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        after = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            matches = [
+                t for t in self._tickets.values()
+                if (customer_id is None or t["customer_id"] == customer_id)
+                and (status is None or t["status"] == status)
+                and (priority is None or t["priority"] == priority)
+                and (after is None or (t["created_at"], t["ticket_id"]) < after)
+            ]
+        matches.sort(key=lambda t: (t["created_at"], t["ticket_id"]), reverse=True)
+        page = [dict(t) for t in matches[:limit]]
+        next_cursor = encode_cursor(page[-1]) if len(matches) > limit else None
+        return page, next_cursor
+
+    def count(self) -> int:
+        return len(self._tickets)
+
+
+def create_ticket_store(backend: Optional[str] = None, path: Optional[str] = None) -> TicketStore:
+    """Builds the store selected by TICKET_STORE ("sqlite" or "memory") and TICKET_DB_PATH."""
+    backend = (backend or os.getenv("TICKET_STORE", "sqlite")).lower()
+    if backend == "memory":
+        return InMemoryTicketStore()
+    if backend == "sqlite":
+        return SQLiteTicketStore(path or os.getenv("TICKET_DB_PATH", data_path("tickets.db")))
+    raise ValueError(f"Unknown TICKET_STORE '{backend}'")
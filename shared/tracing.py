@@ -0,0 +1,425 @@
+# shared/tracing.py
+
+import contextvars
+import functools
+import json
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from shared.paths import data_path
+
+# ---------------------------
+# Configuration
+# ---------------------------
+# TRACING=off (default) | jsonl | otlp
+# TRACE_FILE: JSONL output path; OTEL_EXPORTER_OTLP_ENDPOINT: collector base URL.
+# With tracing off, span() returns a shared no-op object after one global check.
+
+CORRELATION_HEADER = "X-Correlation-ID"
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    """A timed unit of work; ended spans are handed to the exporter."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "correlation_id",
+                 "start_ns", "end_ns", "attributes", "status", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], correlation_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.correlation_id = correlation_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def record_exception(self, exc: BaseException):
+        self.set_error(f"{type(exc).__name__}: {exc}")
+
+    def set_error(self, message: str):
+        self.status = "error"
+        self.error = message
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "service": _service_name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "correlation_id": self.correlation_id,
+            "start": self.start_ns / 1e9,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    """Returned when tracing is off; every method does nothing."""
+
+    name = trace_id = span_id = parent_id = correlation_id = error = None
+    status = "ok"
+    duration_ms = 0.0
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+    def set_error(self, message):
+        pass
+
+    def traceparent(self):
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+_correlation: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("correlation_id", default=None)
+_remote_parent: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar("trace_remote_parent", default=None)
+
+
+# ---------------------------
+# Exporters
+# ---------------------------
+
+class BatchExporter:
+    """Collects ended spans on a queue and writes them in batches from a daemon thread."""
+
+    def __init__(self, max_batch: int = 512, interval: float = 1.0, max_queue: int = 10000):
+        self.max_batch = max_batch
+        self.interval = interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._loop, name=f"{type(self).__name__}", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            # Never block request threads on telemetry
+            self.dropped += 1
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            try:
+                self.write(batch)
+            except Exception:
+                self.dropped += len(batch)
+
+    def flush(self, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def write(self, spans: List[Span]):
+        raise NotImplementedError
+
+
+class JSONLExporter(BatchExporter):
+    """Appends one JSON object per span to a local file."""
+
+    def __init__(self, path: str, **kwargs):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        super().__init__(**kwargs)
+
+    def write(self, spans: List[Span]):
+        with open(self.path, "a") as f:
+            for span in spans:
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class OTLPExporter(BatchExporter):
+    """Posts spans to an OpenTelemetry collector using OTLP/HTTP with JSON encoding."""
+
+    def __init__(self, endpoint: str, **kwargs):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        super().__init__(**kwargs)
+
+    def write(self, spans: List[Span]):
+        import urllib.request  # ~40ms (ssl, certifi) only worth paying when exporting
+
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attr("service.name", _service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "support-demo"},
+                    "spans": [_otlp_span(span) for span in spans],
+                }],
+            }]
+        }
+        request = urllib.request.Request(
+            self.url, data=json.dumps(body).encode("utf-8"), headers={"Content-Type": "application/json"}
+        )
+        urllib.request.urlopen(request, timeout=5).close()
+
+
+def _otlp_attr(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span: Span) -> dict:
+    attributes = dict(span.attributes)
+    if span.correlation_id:
+        attributes["correlation_id"] = span.correlation_id
+    return {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "parentSpanId": span.parent_id or "",
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attr(k, v) for k, v in attributes.items() if v is not None],
+        "status": {"code": 2, "message": span.error} if span.status == "error" else {"code": 1},
+    }
+
+
+_exporter: Optional[BatchExporter] = None
+_service_name = os.getenv("TRACE_SERVICE_NAME", "support-demo")
+_configure_lock = threading.Lock()
+
+
+def configure(mode: Optional[str] = None):
+    """(Re)configures the exporter from `mode` or TRACING / TRACE_FILE / OTEL_EXPORTER_OTLP_ENDPOINT."""
+    global _exporter
+    with _configure_lock:
+        mode = (mode or os.getenv("TRACING", "off")).lower()
+        if mode == "off":
+            _exporter = None
+        elif mode == "jsonl":
+            _exporter = JSONLExporter(os.getenv("TRACE_FILE", data_path("traces.jsonl")))
+        elif mode == "otlp":
+            _exporter = OTLPExporter(os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318"))
+        else:
+            raise ValueError(f"Unknown TRACING '{mode}'")
+
+
+def set_service_name(name: str):
+    """Names the process in exported spans unless TRACE_SERVICE_NAME overrides it."""
+    global _service_name
+    if os.getenv("TRACE_SERVICE_NAME") is None:
+        _service_name = name
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def flush(timeout: float = 5.0):
+    if _exporter is not None:
+        _exporter.flush(timeout)
+
+
+# ---------------------------
+# Spans and correlation ids
+# ---------------------------
+
+def current_span():
+    return _current.get() or NOOP_SPAN
+
+
+def correlation_id() -> Optional[str]:
+    return _correlation.get()
+
+
+@contextmanager
+def correlation(correlation_id: Optional[str]):
+    """Tags every span started inside the block with `correlation_id` (e.g. a job or request id)."""
+    token = _correlation.set(correlation_id)
+    try:
+        yield
+    finally:
+        _correlation.reset(token)
+
+
+class _SpanContext:
+    __slots__ = ("_span", "_token")
+
+    def __init__(self, span: Span):
+        self._span = span
+
+    def __enter__(self) -> Span:
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        span = self._span
+        if exc is not None:
+            span.record_exception(exc)
+        span.end_ns = time.time_ns()
+        _current.reset(self._token)
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(span)
+        return False
+
+
+def _parent() -> tuple:
+    """(trace id, parent span id) for a new span: the current span, else a continued remote caller, else a new trace."""
+    parent = _current.get()
+    if parent is not None:
+        return parent.trace_id, parent.span_id
+    return _remote_parent.get() or (secrets.token_hex(16), None)
+
+
+def span(name: str, **attributes: Any):
+    """
+    Context manager timing a span as a child of the current one. Use as
+    `with span("tool.run", tool=name) as s: ... s.set_attribute(...)`.
+    """
+    if _exporter is None:
+        return NOOP_SPAN
+    return _SpanContext(Span(name, *_parent(), _correlation.get(), attributes))
+
+
+def start_span(name: str, **attributes: Any):
+    """
+    Starts a leaf span without making it current, for work whose end is not
+    lexically scoped (e.g. a streamed response); finish it with end_span().
+    """
+    if _exporter is None:
+        return NOOP_SPAN
+    return Span(name, *_parent(), _correlation.get(), attributes)
+
+
+def end_span(span, exc: Optional[BaseException] = None):
+    if not isinstance(span, Span) or span.end_ns is not None:
+        return
+    if exc is not None:
+        span.record_exception(exc)
+    span.end_ns = time.time_ns()
+    exporter = _exporter
+    if exporter is not None:
+        exporter.export(span)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator form of span(); the span is named after the function by default."""
+
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _exporter is None:
+                return fn(*args, **kwargs)
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# ---------------------------
+# Propagation
+# ---------------------------
+
+def inject_headers(headers: Optional[dict] = None) -> dict:
+    """Adds traceparent and correlation headers for an outgoing request."""
+    headers = dict(headers or {})
+    current = _current.get()
+    if current is not None:
+        headers[TRACEPARENT_HEADER] = current.traceparent()
+    cid = _correlation.get()
+    if cid:
+        headers[CORRELATION_HEADER] = cid
+    return headers
+
+
+@contextmanager
+def continue_trace(headers):
+    """Makes spans in the block children of the caller's span and adopts its correlation id."""
+    match = _TRACEPARENT.match(headers.get(TRACEPARENT_HEADER, "") or "")
+    cid = headers.get(CORRELATION_HEADER) or (match.group(1) if match else None) or secrets.token_hex(8)
+    remote_token = _remote_parent.set((match.group(1), match.group(2)) if match else None)
+    cid_token = _correlation.set(cid)
+    try:
+        yield cid
+    finally:
+        _correlation.reset(cid_token)
+        _remote_parent.reset(remote_token)
+
+
+def instrument_app(app, service_name: Optional[str] = None):
+    """
+    Adds request tracing to a FastAPI app: one `http.server` span per request
+    continuing the caller's trace, and an X-Correlation-ID response header.
+    """
+    if service_name:
+        set_service_name(service_name)
+
+    @app.middleware("http")
+    async def trace_requests(request, call_next):
+        with continue_trace(request.headers) as cid:
+            with span("http.server", method=request.method, path=request.url.path) as s:
+                response = await call_next(request)
+                route = request.scope.get("route")
+                s.set_attributes(route=getattr(route, "path", None), status_code=response.status_code)
+                if response.status_code >= 500:
+                    s.set_error(f"HTTP {response.status_code}")
+        response.headers[CORRELATION_HEADER] = cid
+        return response
+
+    return app
+
+
+configure()
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from app import answer_cache, config
+from app.answer_cache import IngestStamp, SemanticAnswerCache, touch_ingest_stamp
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "KB_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(answer_cache, "_stamps", {})
+
+
+def test_stamp_is_reread_only_after_interval():
+    stamp = IngestStamp("kb", interval=3600)
+    before = stamp.current()
+    touch_ingest_stamp("kb", "v2")
+    assert stamp.current() == before
+    stamp.interval = 0
+    assert stamp.current() == "v2|"
+
+
+def test_remote_marker_is_part_of_the_stamp():
+    stamp = IngestStamp("kb", interval=0)
+    stamp.attach_remote(lambda: "weaviate-v1")
+    stamp.current()
+    deadline = time.monotonic() + 2
+    while stamp.current() != "|weaviate-v1" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stamp.current() == "|weaviate-v1"
+
+
+def test_failed_remote_read_keeps_last_marker():
+    values = iter(["m1"])
+    stamp = IngestStamp("kb", interval=0)
+    stamp.attach_remote(lambda: next(values))
+    stamp.current()
+    time.sleep(0.05)
+    stamp.current()  # StopIteration from the source is swallowed
+    time.sleep(0.05)
+    assert stamp.current() == "|m1"
+
+
+def test_answer_cache_drops_answers_on_new_stamp():
+    cache = SemanticAnswerCache("kb", capacity=4)
+    cache._stamps.interval = 0
+    cache.put([1.0, 0.0], "restart the router")
+    assert cache.get([1.0, 0.01]) == "restart the router"
+    touch_ingest_stamp("kb", "v2")
+    assert cache.get([1.0, 0.0]) is None
+    assert cache.invalidations == 1
+
+
+def test_answer_cache_scopes_and_threshold():
+    cache = SemanticAnswerCache("kb", max_distance=0.05, capacity=4)
+    cache.put([1.0, 0.0], "network answer", scope="network")
+    assert cache.get([1.0, 0.0], scope="account") is None
+    assert cache.get([0.0, 1.0], scope="network") is None
+    assert cache.get([1.0, 0.0], scope="network") == "network answer"
+
+
+def test_remote_marker_is_read_inline_on_first_use():
+    stamp = IngestStamp("kb", interval=3600)
+    stamp.attach_remote(lambda: "weaviate-v1")
+    assert stamp.current() == "|weaviate-v1"
+
+
+def test_attaching_remote_does_not_clear_the_cache():
+    cache = SemanticAnswerCache("kb", capacity=4)
+    cache._stamps.attach_remote(lambda: "weaviate-v1")
+    answer, stamp = cache.lookup([1.0, 0.0])
+    cache.put([1.0, 0.0], "restart the router", stamp=stamp)
+    assert cache.get([1.0, 0.0]) == "restart the router"
+    assert cache.invalidations == 0
+
+
+def test_answer_from_before_a_reingest_is_not_cached():
+    cache = SemanticAnswerCache("kb", capacity=4)
+    cache._stamps.interval = 0
+    answer, stamp = cache.lookup([1.0, 0.0])
+    assert answer is None
+    touch_ingest_stamp("kb", "v2")  # re-ingest while the answer is being synthesized
+    cache.put([1.0, 0.0], "stale answer", stamp=stamp)
+    assert cache.get([1.0, 0.0]) is None
+    assert cache.stats()["stale_puts"] == 1
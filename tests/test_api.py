@@ -0,0 +1,188 @@
+import importlib.util
+import json
+import os
+import uuid
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("uvicorn")
+from fastapi.testclient import TestClient
+
+API = os.path.join(os.path.dirname(__file__), "..", "api", "main.py")
+
+
+@pytest.fixture(scope="module")
+def client():
+    env = {"TICKET_STORE": "memory", "CUSTOMER_STORE": "memory", "DEVICE_REBOOT_SECONDS": "0"}
+    saved = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        spec = importlib.util.spec_from_file_location("unified_api", API)
+        api = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(api)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    with TestClient(api.app) as client:
+        yield client
+
+
+def test_ticket_ids_are_full_uuids(client):
+    r = client.post("/create_ticket", json={"customer_id": "CUST001", "issue_summary": "Router down"})
+    assert r.status_code == 200
+    assert uuid.UUID(r.json()["ticket_id"]).version == 4
+    assert client.get(f"/ticket_status/{r.json()['ticket_id']}").json()["issue_summary"] == "Router down"
+
+
+def test_ticket_listing_pages_with_cursor(client):
+    tickets = [{"customer_id": "CUST777", "issue_summary": f"Issue {n}", "priority": "High"} for n in range(7)]
+    created = client.post("/create_ticket/batch", json={"tickets": tickets}).json()
+    assert all(item["error"] is None for item in created)
+
+    seen, cursor = [], None
+    while True:
+        params = {"customer_id": "CUST777", "limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/tickets", params=params).json()
+        seen.extend(t["ticket_id"] for t in page["tickets"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(item["result"]["ticket_id"] for item in created)
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_invalid_cursor_is_a_400(client):
+    assert client.get("/tickets", params={"cursor": "bogus"}).status_code == 400
+
+
+def test_account_status_batch_reports_unknown_ids(client):
+    items = client.post("/account_status/batch", json={"account_ids": ["CUST123", "CUST404"]}).json()
+    assert items[0]["result"]["account_id"] == "CUST123"
+    assert items[1]["error"] == "Account not found"
+
+
+def test_troubleshooting_resolves_descriptions_and_rejects_generic_words(client):
+    r = client.get("/troubleshooting_steps/slow internet")
+    assert r.json()["issue_type"] == "internet_slow"
+    assert client.get("/troubleshooting_steps/wifi").status_code == 404
+
+
+def test_reboot_rate_limit_sets_retry_after(client):
+    first = client.post("/reboot_device/dev-api", headers={"Idempotency-Key": "api-1"}).json()
+    client.get(f"/reboot_jobs/{first['job_id']}", params={"wait": 1})
+    assert client.post("/reboot_device/dev-api", headers={"Idempotency-Key": "api-1"}).json()["duplicate"]
+    limited = client.post("/reboot_device/dev-api")
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) > 0
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    from app import jobs
+
+    def runner(inquiry):
+        if "fail" in inquiry:
+            raise RuntimeError("crew crashed")
+        return f"answer to {inquiry}"
+
+    manager = jobs.JobManager(runner, max_workers=1)
+    monkeypatch.setattr(jobs, "_manager", manager)
+    return manager
+
+
+def test_job_is_submitted_then_polled_to_completion(client, jobs):
+    r = client.post("/jobs", json={"inquiry": "router down"})
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+    done = client.get(f"/jobs/{job_id}", params={"wait": 5}).json()
+    assert (done["status"], done["result"]) == ("succeeded", "answer to router down")
+
+
+def test_failed_job_reports_its_error(client, jobs):
+    job_id = client.post("/jobs", json={"inquiry": "please fail"}).json()["job_id"]
+    done = client.get(f"/jobs/{job_id}", params={"wait": 5}).json()
+    assert (done["status"], done["error"]) == ("failed", "crew crashed")
+
+
+def test_expired_or_unknown_jobs_are_404(client, jobs):
+    jobs.retention = 0
+    job_id = client.post("/jobs", json={"inquiry": "old"}).json()["job_id"]
+    jobs.get(job_id).wait(5)
+    jobs.get(job_id).finished_at -= 1
+    client.post("/jobs", json={"inquiry": "new"})
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+    assert client.get("/jobs/missing").status_code == 404
+
+
+def test_empty_inquiry_and_full_queue_are_rejected(client, jobs):
+    assert client.post("/jobs", json={"inquiry": "  "}).status_code == 400
+    jobs.max_queue = 0
+    assert client.post("/jobs", json={"inquiry": "router down"}).status_code == 429
+
+
+def sse_events(body):
+    """Parses a text/event-stream body into (id, event, data) tuples, skipping comments."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if fields:
+            events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def streaming_runner(inquiry):
+    from app import streaming
+
+    for word in inquiry.split():
+        streaming.emit(streaming.TOKEN, text=word)
+    if "fail" in inquiry:
+        raise RuntimeError("crew crashed")
+    return "ok"
+
+
+@pytest.fixture
+def streaming_jobs(monkeypatch):
+    from app import jobs
+
+    manager = jobs.JobManager(streaming_runner, max_workers=1)
+    monkeypatch.setattr(jobs, "_manager", manager)
+    return manager
+
+
+def test_event_stream_is_ordered_and_ends_on_completion(client, streaming_jobs):
+    job_id = client.post("/jobs", json={"inquiry": "router is down"}).json()["job_id"]
+    with client.stream("GET", f"/jobs/{job_id}/events") as r:
+        assert r.headers["content-type"].startswith("text/event-stream")
+        events = sse_events(r.read().decode())
+    assert [seq for seq, _, _ in events] == list(range(len(events)))
+    assert [kind for _, kind, _ in events] == ["status", "token", "token", "token", "done"]
+    assert [data["text"] for _, kind, data in events if kind == "token"] == ["router", "is", "down"]
+    assert events[-1][2]["status"] == "succeeded"
+
+
+def test_event_stream_ends_on_error(client, streaming_jobs):
+    job_id = client.post("/jobs", json={"inquiry": "please fail"}).json()["job_id"]
+    events = sse_events(client.get(f"/jobs/{job_id}/events").text)
+    assert events[-1][1:] == ("done", {"status": "failed", "result": None, "error": "crew crashed"})
+
+
+def test_event_stream_resumes_after_last_event_id(client, streaming_jobs):
+    job_id = client.post("/jobs", json={"inquiry": "router is down"}).json()["job_id"]
+    streaming_jobs.get(job_id).wait(5)
+    events = sse_events(client.get(f"/jobs/{job_id}/events", headers={"Last-Event-ID": "2"}).text)
+    assert [seq for seq, _, _ in events] == [3, 4]
+    assert client.get("/jobs/missing/events").status_code == 404
+
+
+def test_metrics_endpoint_reports_requests_by_route(client):
+    client.get(f"/ticket_status/{uuid.uuid4()}")
+    r = client.get("/metrics")
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_request_duration_seconds histogram" in r.text
+    assert 'route="/ticket_status/{ticket_id}"' in r.text
@@ -0,0 +1,57 @@
+import math
+
+import pytest
+
+from app.bm25 import BM25Index, bm25_path, tokenize
+
+FAQS = [
+    ("faq1", "Router keeps restarting", "If your router restarts, update the router firmware.", "network"),
+    ("faq2", "Slow internet", "Restart the modem and check for interference.", "network"),
+    ("faq3", "Update billing address", "Change your billing address in account settings.", "billing"),
+    ("faq4", "Refund for outage", "Outage credits are added to the next invoice.", "billing"),
+]
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    for faq in FAQS:
+        index.add(*faq)
+    return index
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("How do I update the Router's firmware?") == ["update", "router", "s", "firmware"]
+
+
+def test_score_matches_the_okapi_formula(index):
+    # "firmware" occurs once, only in faq1
+    n, df, tf = 4, 1, 1
+    avgdl = index.total_length / n
+    idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+    norm = index.k1 * (1 - index.b + index.b * index.lengths[0] / avgdl)
+    assert index.search("firmware") == [(0, pytest.approx(idf * tf * (index.k1 + 1) / (tf + norm)))]
+
+
+def test_results_are_ordered_by_score(index):
+    hits = index.search("router update", top_k=10)
+    assert [idx for idx, _ in hits] == [0, 2]
+    assert hits[0][1] > hits[1][1]
+    assert len(index.search("router update", top_k=1)) == 1
+    assert index.search("unrelated words") == []
+
+
+def test_category_only_scores_its_own_postings(index):
+    assert [idx for idx, _ in index.search("update", category="billing")] == [2]
+    assert [idx for idx, _ in index.search("update", category="network")] == [0]
+    assert index.search("update", category="unknown") == []
+    assert index.categories() == ["billing", "network"]
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = bm25_path(str(tmp_path), "kb")
+    index.save(path)
+    loaded = BM25Index.load(path)
+    assert loaded.search("outage refund") == index.search("outage refund")
+    assert loaded.search("update", category="billing") == index.search("update", category="billing")
+    assert BM25Index.load(str(tmp_path / "missing.json")) is None
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+pytest.importorskip("crewai")
+from app.agents import CrewPool
+
+
+class FakeFactory:
+    def __init__(self, fail=False):
+        self.built = 0
+        self.fail = fail
+
+    def build(self):
+        if self.fail:
+            raise RuntimeError("bad agents.yaml")
+        self.built += 1
+        return object()
+
+
+def test_released_crew_is_reused():
+    factory = FakeFactory()
+    pool = CrewPool(factory, size=2, timeout=1)
+    with pool.checkout() as first:
+        pass
+    with pool.checkout() as second:
+        pass
+    assert second is first and factory.built == 1
+
+
+def test_concurrent_checkouts_never_share_a_crew():
+    factory = FakeFactory()
+    pool = CrewPool(factory, size=4, timeout=5)
+    held, barrier = [], threading.Barrier(4)
+
+    def worker():
+        with pool.checkout() as crew:
+            held.append(crew)
+            barrier.wait(5)  # every worker holds its crew at the same time
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert len(held) == 4 and len({id(crew) for crew in held}) == 4
+    assert pool.stats() == {"size": 4, "created": 4, "idle": 4}
+
+
+def test_crew_returns_to_the_pool_after_an_exception():
+    pool = CrewPool(FakeFactory(), size=1, timeout=0.1)
+    with pytest.raises(ValueError):
+        with pool.checkout() as crew:
+            raise ValueError("kickoff failed")
+    with pool.checkout() as again:
+        assert again is crew
+
+
+def test_exhausted_pool_times_out():
+    pool = CrewPool(FakeFactory(), size=1, timeout=0.05)
+    with pool.checkout():
+        with pytest.raises(TimeoutError):
+            pool.acquire()
+
+
+def test_failed_build_frees_its_slot():
+    factory = FakeFactory(fail=True)
+    pool = CrewPool(factory, size=1, timeout=0.05)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    factory.fail = False
+    with pool.checkout():
+        assert pool.stats()["created"] == 1
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from shared import customer_store
+from shared.customer_store import (
+    CachedCustomerStore,
+    InMemoryCustomerStore,
+    InvalidRecord,
+    SQLiteCustomerStore,
+    create_customer_store,
+    iter_records,
+    load_records,
+    normalize_record,
+)
+
+
+def customer(n, plan="Basic"):
+    return {
+        "account_id": f"CUST{n:05d}",
+        "name": f"Customer {n}",
+        "service_status": "Active",
+        "plan": plan,
+        "current_issues": ["internet_slow"] if n % 2 else [],
+    }
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteCustomerStore(str(tmp_path / "customers.db"))
+    return InMemoryCustomerStore()
+
+
+def test_upsert_and_get(store):
+    assert store.upsert_many([customer(1), customer(2)]) == 2
+    assert store.get("CUST00001")["current_issues"] == ["internet_slow"]
+    assert store.get("CUST99999") is None
+    store.upsert_many([customer(1, plan="Premium")])
+    assert store.get("CUST00001")["plan"] == "Premium"
+    assert store.count() == 2
+
+
+def test_get_many_spans_chunks_and_skips_unknown_ids(store, monkeypatch):
+    monkeypatch.setattr(customer_store, "MAX_IN_PARAMS", 7)
+    store.upsert_many((customer(n) for n in range(50)), batch_size=16)
+    wanted = [f"CUST{n:05d}" for n in range(0, 60, 3)] + ["CUST00003"]
+    found = store.get_many(wanted)
+    assert sorted(found) == sorted({f"CUST{n:05d}" for n in range(0, 50, 3)})
+
+
+def test_cache_serves_repeats_and_negative_lookups():
+    backend = InMemoryCustomerStore()
+    backend.upsert_many([customer(1)])
+    calls = []
+    original = backend.get_many
+    backend.get_many = lambda ids: calls.append(list(ids)) or original(ids)
+    cached = CachedCustomerStore(backend)
+
+    assert set(cached.get_many(["CUST00001", "CUST00404"])) == {"CUST00001"}
+    assert set(cached.get_many(["CUST00001", "CUST00404"])) == {"CUST00001"}
+    assert calls == [["CUST00001", "CUST00404"]]
+
+
+def test_cache_returns_copies_and_invalidates_on_write():
+    cached = CachedCustomerStore(InMemoryCustomerStore())
+    cached.upsert_many([customer(1)])
+    cached.get("CUST00001")["current_issues"].append("mutated")
+    assert cached.get("CUST00001")["current_issues"] == ["internet_slow"]
+    cached.upsert_many([customer(1, plan="Premium")])
+    assert cached.get("CUST00001")["plan"] == "Premium"
+
+
+def test_normalize_record_accepts_csv_issues():
+    record = normalize_record({**customer(1), "current_issues": "internet_down; billing_issue"})
+    assert record["current_issues"] == ["internet_down", "billing_issue"]
+    with pytest.raises(InvalidRecord):
+        normalize_record({**customer(1), "name": ""})
+
+
+def test_load_skips_lines_that_are_not_objects(tmp_path):
+    path = tmp_path / "customers.jsonl"
+    lines = [json.dumps(customer(1)), "[1, 2]", "{not json", '"CUST00002"', "null", json.dumps(customer(3))]
+    path.write_text("\n".join(lines) + "\n")
+    store, errors = InMemoryCustomerStore(), []
+    assert load_records(store, iter_records(str(path)), errors=errors) == (2, 4)
+    assert store.get("CUST00003")["name"] == "Customer 3"
+    assert [e.split(":")[0] for e in errors] == ["record 2", "record 3", "record 4", "record 5"]
+    assert errors[0] == "record 2: Expected an object, not list"
+
+
+def test_create_seeds_demo_accounts_behind_cache(tmp_path):
+    store = create_customer_store("sqlite", str(tmp_path / "customers.db"), cache_size=10)
+    assert isinstance(store, CachedCustomerStore)
+    assert not store.is_empty()
@@ -0,0 +1,117 @@
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+from shared.device_jobs import FAILED, SUCCEEDED, DeviceJobManager, RateLimited
+
+SERVICE = os.path.join(os.path.dirname(__file__), "..", "mcp-services", "remote-device-service", "app.py")
+
+
+async def instant_reboot(device_id):
+    return f"{device_id} rebooted"
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_idempotency_key_replays_the_same_job():
+    async def scenario():
+        manager = DeviceJobManager(instant_reboot, min_interval=60)
+        job, created = manager.submit("dev-1", "key-1")
+        await job.wait(1)
+        replay, replay_created = manager.submit("dev-1", "key-1")
+        return job, created, replay, replay_created
+
+    job, created, replay, replay_created = run(scenario())
+    assert created and not replay_created
+    assert replay is job and replay.status == SUCCEEDED
+
+
+def test_pending_reboot_collapses_duplicates():
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def slow_reboot(device_id):
+            await gate.wait()
+            return "done"
+
+        manager = DeviceJobManager(slow_reboot, min_interval=0)
+        first, _ = manager.submit("dev-1")
+        second, created = manager.submit("dev-1", "late-key")
+        gate.set()
+        await first.wait(1)
+        third, _ = manager.submit("dev-2", "late-key")
+        return first, second, created, third
+
+    first, second, created, third = run(scenario())
+    assert second is first and not created
+    # The key now belongs to the collapsed job, so it replays that one
+    assert third is first
+
+
+def test_rate_limit_reports_retry_after():
+    async def scenario():
+        manager = DeviceJobManager(instant_reboot, min_interval=60)
+        job, _ = manager.submit("dev-1")
+        await job.wait(1)
+        manager.submit("dev-1")
+
+    with pytest.raises(RateLimited) as error:
+        run(scenario())
+    assert 59 < error.value.retry_after <= 60
+
+
+def test_batch_key_is_scoped_per_device():
+    async def scenario():
+        manager = DeviceJobManager(instant_reboot, min_interval=60)
+        first = manager.submit_many(["dev-1", "dev-2"], "batch-1")
+        await asyncio.gather(*(item["job"].wait(1) for item in first))
+        return first, manager.submit_many(["dev-1", "dev-2", "dev-3"], "batch-1")
+
+    first, retry = run(scenario())
+    assert [item["created"] for item in retry] == [False, False, True]
+    assert [item["job"] for item in retry[:2]] == [item["job"] for item in first]
+
+
+def test_failed_and_timed_out_reboots():
+    async def broken(device_id):
+        raise RuntimeError("device unreachable")
+
+    async def hangs(device_id):
+        await asyncio.sleep(10)
+
+    async def scenario():
+        failed, _ = DeviceJobManager(broken, min_interval=0).submit("dev-1")
+        timed_out, _ = DeviceJobManager(hangs, min_interval=0, timeout=0.01).submit("dev-2")
+        await asyncio.gather(failed.wait(1), timed_out.wait(1))
+        return failed, timed_out
+
+    failed, timed_out = run(scenario())
+    assert (failed.status, failed.error) == (FAILED, "device unreachable")
+    assert timed_out.status == FAILED and "did not respond" in timed_out.error
+
+
+def test_service_answers_429_with_retry_after(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("uvicorn")
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setenv("DEVICE_REBOOT_SECONDS", "0")
+    monkeypatch.setenv("DEVICE_REBOOT_INTERVAL", "120")
+    spec = importlib.util.spec_from_file_location("remote_device_service", SERVICE)
+    service = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(service)
+
+    with TestClient(service.app) as client:
+        first = client.post("/reboot_device/dev-9", headers={"Idempotency-Key": "k1"})
+        assert first.status_code == 202
+        job_id = first.json()["job_id"]
+        client.get(f"/reboot_jobs/{job_id}", params={"wait": 1})
+        replay = client.post("/reboot_device/dev-9", headers={"Idempotency-Key": "k1"})
+        assert replay.json()["job_id"] == job_id and replay.json()["duplicate"]
+        limited = client.post("/reboot_device/dev-9")
+        assert limited.status_code == 429
+        assert 119 <= int(limited.headers["Retry-After"]) <= 120
@@ -0,0 +1,91 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+pytest.importorskip("llama_index.core")
+pytest.importorskip("llama_index.embeddings.huggingface")
+from app.embedding_cache import DiskEmbeddingStore, EmbeddingCache, cache_key
+
+MODEL = "test-model"
+
+
+def vector(n, dim=8):
+    return np.full(dim, n, dtype=np.float32)
+
+
+def test_lru_evicts_least_recently_used():
+    cache = EmbeddingCache(MODEL, capacity=2)
+    cache.put("a", vector(1))
+    cache.put("b", vector(2))
+    cache.get("a")
+    cache.put("c", vector(3))
+    assert cache.get("b") is None
+    assert cache.get("a")[0] == 1 and cache.get("c")[0] == 3
+    assert cache.stats()["memory_entries"] == 2
+
+
+def test_normalized_queries_share_an_entry():
+    cache = EmbeddingCache(MODEL)
+    cache.put("Router  Down?", vector(1))
+    assert cache.get("router down") is not None
+
+
+def test_evicted_entries_spill_to_disk_and_reload(tmp_path):
+    cache = EmbeddingCache(MODEL, capacity=1, disk_dir=str(tmp_path))
+    cache.put("a", vector(1))
+    cache.put("b", vector(2))
+    assert cache.get("a")[0] == 1
+    assert cache.stats()["disk_hits"] == 1
+    cache.flush()
+
+    reopened = EmbeddingCache(MODEL, capacity=1, disk_dir=str(tmp_path))
+    assert reopened.get("b")[0] == 2
+    assert reopened.stats()["disk_entries"] == 2
+
+
+def test_rows_stay_aligned_with_keys_after_reopen(tmp_path):
+    store = DiskEmbeddingStore(str(tmp_path), MODEL)
+    keys = [cache_key(MODEL, f"query {n}") for n in range(50)]
+    for n, key in enumerate(keys):
+        store.put(key, vector(n))
+    store.put(keys[3], vector(99))  # repeated puts keep the first row
+    reopened = DiskEmbeddingStore(str(tmp_path), MODEL)
+    assert len(reopened) == 50
+    assert all(reopened.get(key)[0] == n for n, key in enumerate(keys))
+
+
+def test_other_model_discards_the_store(tmp_path):
+    DiskEmbeddingStore(str(tmp_path), MODEL).put(cache_key(MODEL, "a"), vector(1))
+    other = DiskEmbeddingStore(str(tmp_path), "other-model")
+    assert len(other) == 0 and other.get(cache_key(MODEL, "a")) is None
+
+
+def _write_rows(directory, worker, count):
+    store = DiskEmbeddingStore(directory, MODEL)
+    for n in range(count):
+        store.put(cache_key(MODEL, f"{worker}-{n}"), vector(worker * 1000 + n))
+
+
+def test_concurrent_writers_never_share_a_row(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_write_rows, args=(str(tmp_path), w, 200)) for w in range(4)]
+    for proc in workers:
+        proc.start()
+    for proc in workers:
+        proc.join(30)
+        assert proc.exitcode == 0
+
+    store = DiskEmbeddingStore(str(tmp_path), MODEL)
+    assert len(store) == 800
+    for w in range(4):
+        for n in range(200):
+            assert store.get(cache_key(MODEL, f"{w}-{n}"))[0] == w * 1000 + n
+
+
+def test_reader_sees_rows_appended_by_another_writer(tmp_path):
+    reader = DiskEmbeddingStore(str(tmp_path), MODEL)
+    writer = DiskEmbeddingStore(str(tmp_path), MODEL)
+    key = cache_key(MODEL, "late")
+    writer.put(key, vector(7))
+    assert reader.get(key)[0] == 7
@@ -0,0 +1,63 @@
+import pytest
+
+from shared.guide_index import GuideIndex, negated, tokenize
+
+GUIDES = {
+    "internet_slow": {"issue": "Internet Slow", "steps": []},
+    "no_internet_connection": {"issue": "No Internet Connection", "steps": []},
+    "login_issue": {"issue": "Login Issues", "steps": []},
+}
+
+
+@pytest.fixture
+def index():
+    return GuideIndex(GUIDES)
+
+
+def test_tokenize_keeps_negations():
+    assert tokenize("wifi not working") == ("internet", "not")
+    assert tokenize("can't log in") == ("not", "login")
+    assert tokenize("no") == ("not",)
+    assert negated(tokenize("internet not slow")) == {"slow"}
+    assert negated(tokenize("wifi not working")) == set()
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("internet_slow", "internet_slow"),
+    ("slow internet", "internet_slow"),
+    ("sluggish wifi", "internet_slow"),
+    ("interent slow", "internet_slow"),
+    ("internet_down", "no_internet_connection"),
+    ("Internet is down!", "no_internet_connection"),
+    ("wifi not working", "no_internet_connection"),
+    ("no internet", "no_internet_connection"),
+    ("offline", "no_internet_connection"),
+    ("my wifi is not connecting", "no_internet_connection"),
+    ("cant log in", "login_issue"),
+    ("forgot my password", "login_issue"),
+])
+def test_resolve_descriptions(index, text, expected):
+    assert index.resolve(text).issue_type == expected
+
+
+@pytest.mark.parametrize("text", [
+    "internet", "wifi", "no", "not slow", "internet not slow", "wifi is not slow", "billing_issue", "",
+])
+def test_resolve_rejects_generic_or_negated_queries(index, text):
+    assert index.resolve(text) is None
+
+
+def test_ambiguous_match_still_ranks_in_search(index):
+    matches = index.search("internet", limit=3)
+    assert {m.issue_type for m in matches} == {"internet_slow", "no_internet_connection"}
+    assert all(m.score < 0.5 for m in matches)
+
+
+def test_exact_key_scores_one(index):
+    match = index.resolve("Login_Issue")
+    assert (match.issue_type, match.score) == ("login_issue", 1.0)
+
+
+def test_not_found_names_closest_guides(index):
+    assert "'internet_slow'" in index.not_found("internet")
+    assert index.not_found("billing") == "Troubleshooting guide for 'billing' not found."
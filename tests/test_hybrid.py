@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("llama_index.core")
+from llama_index.core.schema import NodeRelationship, NodeWithScore, RelatedNodeInfo, TextNode
+
+from app import answer_cache, config
+from app.bm25 import BM25Index, bm25_path
+from app.hybrid import HybridRetriever, reciprocal_rank_fusion
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["d", "b", "e"]], k=60)
+    assert fused[0] == "b"
+    assert set(fused) == {"a", "b", "c", "d", "e"}
+    assert fused.index("a") < fused.index("c")
+
+
+def test_rrf_ties_keep_first_seen_order():
+    assert reciprocal_rank_fusion([["a", "b"], ["b", "a"]]) == ["a", "b"]
+    assert reciprocal_rank_fusion([["x"], [], ["y"]]) == ["x", "y"]
+
+
+def test_rrf_score_is_one_over_k_plus_rank():
+    # k=0: a = 1, b = 1/2, c = 1/3 + 1
+    assert reciprocal_rank_fusion([["a", "b", "c"], ["c"]], k=0) == ["c", "a", "b"]
+
+
+def vector_hit(doc_id, score):
+    node = TextNode(
+        id_=f"{doc_id}-0",
+        text=f"vector text of {doc_id}",
+        relationships={NodeRelationship.SOURCE: RelatedNodeInfo(node_id=doc_id)},
+    )
+    return NodeWithScore(node=node, score=score)
+
+
+class FakeIndex:
+    """Records how the retriever was configured and returns canned vector hits."""
+
+    def __init__(self, hits):
+        self.hits = hits
+        self.kwargs = None
+
+    def as_retriever(self, **kwargs):
+        self.kwargs = kwargs
+        return SimpleNamespace(retrieve=lambda question: self.hits)
+
+
+@pytest.fixture
+def retriever(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "KB_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(answer_cache, "_stamps", {})
+    bm25 = BM25Index()
+    bm25.add("faq1", "Router restarting", "Update the router firmware.", "network")
+    bm25.add("faq2", "Slow internet", "Restart the modem.", "network")
+    bm25.add("faq3", "Billing address", "Update your billing address.", "billing")
+    bm25.save(bm25_path(str(tmp_path), "kb"))
+    return HybridRetriever("kb", top_k=2, candidates=5, rrf_k=60, use_bm25=True)
+
+
+def test_fusion_adds_keyword_only_hits(retriever):
+    index = FakeIndex([vector_hit("faq2", 0.9)])
+    nodes = retriever.retrieve(index, "router firmware")
+    assert [node.node.ref_doc_id for node in nodes] == ["faq2", "faq1"]
+    assert nodes[1].node.node_id == "faq1-bm25"
+    assert index.kwargs["similarity_top_k"] == 5
+
+
+def test_category_filters_both_sides_before_scoring(retriever):
+    index = FakeIndex([])
+    nodes = retriever.retrieve(index, "update", category="billing")
+    assert [node.node.ref_doc_id for node in nodes] == ["faq3"]
+    (condition,) = index.kwargs["filters"].filters
+    assert (condition.key, condition.value) == ("category", "billing")
+
+
+def test_vector_only_when_bm25_is_off():
+    hits = [vector_hit("faq1", 0.9)]
+    index = FakeIndex(hits)
+    retriever = HybridRetriever("kb", top_k=3, use_bm25=False)
+    assert retriever.retrieve(index, "router") == hits
+    assert index.kwargs == {"similarity_top_k": 3, "filters": None}
@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+
+from app.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobManager, QueueFull
+
+
+def test_submitted_job_runs_and_can_be_polled():
+    manager = JobManager(lambda inquiry: inquiry.upper(), max_workers=1)
+    job = manager.submit("router down")
+    assert manager.get(job.job_id) is job
+    assert job.wait(5)
+    assert (job.status, job.result, job.error) == (SUCCEEDED, "ROUTER DOWN", None)
+    assert job.submitted_at <= job.started_at <= job.finished_at
+    assert job.to_dict()["status"] == SUCCEEDED
+
+
+def test_runner_exception_fails_the_job():
+    def broken(inquiry):
+        raise RuntimeError("LLM unavailable")
+
+    manager = JobManager(broken, max_workers=1)
+    job = manager.submit("router down")
+    assert job.wait(5)
+    assert (job.status, job.result, job.error) == (FAILED, None, "LLM unavailable")
+    # The worker survives a failed job
+    assert manager.submit("again").wait(5)
+
+
+def test_queue_limit_raises_queue_full():
+    release = threading.Event()
+    manager = JobManager(lambda inquiry: release.wait(5), max_workers=1, max_queue=1)
+    running = manager.submit("first")
+    while running.status != RUNNING:
+        running.wait(0.01)
+    queued = manager.submit("second")
+    assert queued.status == QUEUED
+    with pytest.raises(QueueFull):
+        manager.submit("third")
+    release.set()
+    assert running.wait(5) and queued.wait(5)
+    assert manager.stats()["queued"] == 0
+    manager.submit("fourth").wait(5)
+
+
+def test_finished_jobs_expire_after_retention():
+    manager = JobManager(str, max_workers=1, retention=0)
+    job = manager.submit("old")
+    assert job.wait(5)
+    job.finished_at -= 1
+    manager.submit("new").wait(5)  # each submit prunes expired jobs
+    assert manager.get(job.job_id) is None
+
+
+def test_unknown_job_is_none():
+    assert JobManager(str, max_workers=1).get("missing") is None
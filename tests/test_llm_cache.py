@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.llm_cache import (
+    CompletionCache,
+    MemoryCompletionStore,
+    SQLiteCompletionStore,
+    cacheable,
+    completion_key,
+)
+
+MESSAGES = [{"role": "system", "content": "You are support."}, {"role": "user", "content": "Router down"}]
+
+
+def response(text, tool_calls=None):
+    message = SimpleNamespace(content=text, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class FakeCompletion:
+    """Stands in for litellm.completion; mock_response short-circuits like LiteLLM's does."""
+
+    def __init__(self, text="Restart the router.", tool_calls=None):
+        self.text = text
+        self.tool_calls = tool_calls
+        self.calls = 0
+
+    def __call__(self, **kwargs):
+        if "mock_response" in kwargs:
+            return response(kwargs["mock_response"])
+        self.calls += 1
+        return response(self.text, self.tool_calls)
+
+
+def test_key_ignores_whitespace_and_transport_params():
+    noisy = [{"role": "system", "content": "You are support.  \r\n"}, {"role": "user", "content": "Router down\n"}]
+    base = completion_key("tier1-llm", MESSAGES, {"temperature": 0})
+    assert completion_key("tier1-llm", noisy, {"temperature": 0, "api_base": "http://x", "timeout": 5}) == base
+
+
+def test_key_changes_with_model_and_sampling_params():
+    base = completion_key("tier1-llm", MESSAGES, {"temperature": 0})
+    assert completion_key("tier2-llm", MESSAGES, {"temperature": 0}) != base
+    assert completion_key("tier1-llm", MESSAGES, {"temperature": 0, "max_tokens": 64}) != base
+    assert completion_key("tier1-llm", MESSAGES[:1], {"temperature": 0}) != base
+
+
+@pytest.mark.parametrize("params, expected", [
+    ({"temperature": 0}, True),
+    ({"temperature": 0.0, "n": 1}, True),
+    ({"temperature": 0.7}, False),
+    ({}, False),
+    ({"temperature": 0, "n": 3}, False),
+    ({"temperature": 0, "mock_response": "x"}, False),
+])
+def test_only_deterministic_calls_are_cacheable(params, expected):
+    assert cacheable(params) is expected
+
+
+def test_repeat_is_served_from_cache():
+    cache = CompletionCache(MemoryCompletionStore())
+    model = FakeCompletion()
+    first = cache.complete(model, model="tier1-llm", messages=MESSAGES, temperature=0)
+    second = cache.complete(model, model="tier1-llm", messages=MESSAGES, temperature=0)
+    assert model.calls == 1
+    assert second.choices[0].message.content == first.choices[0].message.content
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_sampled_calls_bypass_the_cache():
+    cache = CompletionCache(MemoryCompletionStore())
+    model = FakeCompletion()
+    for _ in range(2):
+        cache.complete(model, model="tier1-llm", messages=MESSAGES, temperature=0.7)
+    assert model.calls == 2 and cache.bypassed == 2 and len(cache.store) == 0
+
+
+def test_tool_call_responses_are_not_stored():
+    cache = CompletionCache(MemoryCompletionStore())
+    model = FakeCompletion(text="calling a tool", tool_calls=[{"name": "Get Customer Details"}])
+    for _ in range(2):
+        cache.complete(model, model="tier1-llm", messages=MESSAGES, temperature=0)
+    assert model.calls == 2
+
+
+def test_sqlite_store_persists_and_evicts(tmp_path):
+    path = str(tmp_path / "llm.db")
+    store = SQLiteCompletionStore(path, max_size=2, ttl=0)
+    for n in range(3):
+        store.put(f"k{n}", "tier1-llm", f"answer {n}")
+    store.get("k0")
+    store.evict()
+    reopened = SQLiteCompletionStore(path, max_size=2, ttl=0)
+    assert len(reopened) == 2
+    assert reopened.get("k0") == "answer 0"
+    assert reopened.get("k2") == "answer 2"
@@ -0,0 +1,59 @@
+import pytest
+
+from shared.metrics import CONTENT_TYPE, Registry
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_counter_exposition(registry):
+    requests = registry.counter("tool_calls", "Tool calls.", ("tool",))
+    requests.inc(tool="kb")
+    requests.inc(2, tool="kb")
+    requests.inc(tool='say "hi"\n')
+    assert registry.render() == (
+        "# HELP tool_calls Tool calls.\n"
+        "# TYPE tool_calls counter\n"
+        'tool_calls_total{tool="kb"} 3\n'
+        'tool_calls_total{tool="say \\"hi\\"\\n"} 1\n'
+    )
+
+
+def test_gauges_set_and_compute_at_scrape_time(registry):
+    registry.gauge("jobs_running", "Running jobs.").set(2.5)
+    sizes = {("tickets",): 7}
+    registry.gauge("store_size", "Rows per store.", ("store",), function=lambda: sizes)
+    registry.gauge("broken", "Fails at scrape time.", function=lambda: 1 / 0)
+    lines = registry.render().splitlines()
+    assert "jobs_running 2.5" in lines
+    assert 'store_size{store="tickets"} 7' in lines
+    assert "# TYPE broken gauge" in lines and not any(line.startswith("broken ") for line in lines)
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, route="/x")
+    lines = registry.render().splitlines()
+    assert lines[2:] == [
+        'latency_seconds_bucket{route="/x",le="0.1"} 1',
+        'latency_seconds_bucket{route="/x",le="1"} 3',
+        'latency_seconds_bucket{route="/x",le="+Inf"} 4',
+        'latency_seconds_sum{route="/x"} 4.05',
+        'latency_seconds_count{route="/x"} 4',
+    ]
+
+
+def test_labels_must_match_and_names_are_registered_once(registry):
+    counter = registry.counter("runs", "Runs.", ("tier",))
+    with pytest.raises(ValueError):
+        counter.inc(model="x")
+    assert registry.counter("runs", "Runs.", ("tier",)) is counter
+    with pytest.raises(ValueError):
+        registry.gauge("runs", "Runs.")
+
+
+def test_content_type_is_prometheus_text():
+    assert CONTENT_TYPE.startswith("text/plain; version=0.0.4")
@@ -0,0 +1,137 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from app import streaming
+from app.parallel import ParallelToolExecutor, ToolCall, format_results, inquiry_values, prefetch_calls
+
+
+class LookupInput(BaseModel):
+    key: str
+    delay: float = 0.0
+
+
+class FakeTool:
+    """Tracks how many calls overlap; keys starting with "fail" raise."""
+
+    args_schema = LookupInput
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+
+    def _run(self, key, delay):
+        self._enter()
+        try:
+            time.sleep(delay)
+            streaming.emit(streaming.TOOL_END, key=key)
+            if key.startswith("fail"):
+                raise RuntimeError(f"{key} broke")
+            return f"value of {key}"
+        finally:
+            self._exit()
+
+    async def _arun(self, key, delay):
+        self._enter()
+        try:
+            await asyncio.sleep(delay)
+            if key.startswith("fail"):
+                raise RuntimeError(f"{key} broke")
+            return f"value of {key}"
+        finally:
+            self._exit()
+
+
+@pytest.fixture
+def tool():
+    return FakeTool()
+
+
+def calls(*specs):
+    return [ToolCall("lookup", {"key": key, "delay": delay}) for key, delay in specs]
+
+
+def run_both(executor, tools, batch):
+    return executor.run(tools, batch), asyncio.run(executor.arun(tools, batch))
+
+
+def test_results_keep_call_order(tool):
+    executor = ParallelToolExecutor(max_workers=4, timeout=5)
+    batch = calls(("slow", 0.1), ("medium", 0.05), ("fast", 0))
+    for results in run_both(executor, {"lookup": tool}, batch):
+        assert [r.output for r in results] == ["value of slow", "value of medium", "value of fast"]
+    assert format_results(results).startswith("[1] lookup(key='slow', delay=0.1)\nvalue of slow")
+
+
+def test_a_failing_call_does_not_affect_the_others(tool):
+    executor = ParallelToolExecutor(max_workers=4, timeout=5)
+    batch = calls(("a", 0), ("fail-b", 0), ("c", 0))
+    for results in run_both(executor, {"lookup": tool}, batch):
+        assert [r.error for r in results] == [None, "RuntimeError: fail-b broke", None]
+        assert results[1].output == "lookup failed: fail-b broke"
+        assert results[2].output == "value of c"
+
+
+def test_concurrency_is_bounded_by_max_workers(tool):
+    executor = ParallelToolExecutor(max_workers=2, timeout=5)
+    batch = calls(*[(f"k{n}", 0.05) for n in range(6)])
+    executor.run({"lookup": tool}, batch)
+    assert tool.peak == 2
+    tool.peak = 0
+    asyncio.run(executor.arun({"lookup": tool}, batch))
+    assert tool.peak == 2
+
+
+def test_slow_calls_time_out_without_blocking_the_batch(tool):
+    executor = ParallelToolExecutor(max_workers=2, timeout=0.05)
+    batch = calls(("stuck", 1), ("quick", 0))
+    started = time.perf_counter()
+    for results in run_both(executor, {"lookup": tool}, batch):
+        assert results[0].error == "timeout" and results[1].output == "value of quick"
+    assert time.perf_counter() - started < 1.5
+
+
+def test_unknown_tools_and_bad_arguments_are_reported(tool):
+    executor = ParallelToolExecutor(max_workers=2, timeout=5)
+    batch = [ToolCall("missing", {}), ToolCall("lookup", {"delay": 0})]
+    for results in run_both(executor, {"lookup": tool}, batch):
+        assert results[0].error.startswith("Unknown tool 'missing'")
+        assert results[1].error.startswith("Invalid arguments for lookup")
+
+
+def test_calls_run_in_the_callers_context(tool):
+    seen = []
+    executor = ParallelToolExecutor(max_workers=2, timeout=5)
+    with streaming.streaming_to(lambda kind, data: seen.append(data["key"])):
+        executor.run({"lookup": tool}, calls(("a", 0), ("b", 0)))
+    assert sorted(seen) == ["a", "b"]
+
+
+def test_prefetch_fills_templates_and_skips_missing_values():
+    declared = [
+        {"tool": "Knowledge Base", "args": {"question": "{inquiry}"}},
+        {"tool": "Get Customer Details", "args": {"account_id": "{account_id}"}},
+        {"tool": "Web Search", "args": {"query": "{inquiry}", "max_results": 3}},
+    ]
+    with_account = prefetch_calls(declared, inquiry_values("CUST123 router down"))
+    assert [c.args for c in with_account] == [
+        {"question": "CUST123 router down"},
+        {"account_id": "CUST123"},
+        {"query": "CUST123 router down", "max_results": 3},
+    ]
+    without = prefetch_calls(declared, inquiry_values("router down"))
+    assert [c.tool for c in without] == ["Knowledge Base", "Web Search"]
+    assert prefetch_calls(None, inquiry_values("x")) == []
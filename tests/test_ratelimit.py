@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from shared.ratelimit import KeyedRateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+    assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert bucket.retry_after() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    clock.now += 100
+    assert bucket.retry_after(3) == 0.0
+    assert bucket.retry_after(4) == pytest.approx(0.5)
+
+
+def test_acquire_gives_up_past_timeout():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=0.1, capacity=1, clock=clock)
+    assert bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=1)
+    assert not asyncio.run(bucket.aacquire(timeout=1))
+
+
+def test_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_keyed_limiter_tracks_keys_separately():
+    clock = FakeClock()
+    limiter = KeyedRateLimiter(rate=1 / 60, capacity=1, clock=clock)
+    assert limiter.try_acquire("dev-1")
+    assert not limiter.try_acquire("dev-1")
+    assert limiter.try_acquire("dev-2")
+    assert limiter.retry_after("dev-1") == pytest.approx(60)
+    clock.now += 45
+    assert limiter.retry_after("dev-1") == pytest.approx(15)
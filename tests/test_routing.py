@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.routing import TIER_1, TIER_2, TIERS, fallback_chains, needs_escalation, with_fallbacks
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Restart the router.\nEscalate: no", False),
+    ("Needs a technician.\nEscalate: yes", True),
+    ("**Escalate:** No", False),
+    ("ESCALATE : YES", True),
+    ("I first thought Escalate: yes, but the reboot fixed it. Escalate: no", False),
+    ("Restart the router.", True),  # no marker: escalate rather than drop the issue
+    ("Escalate: maybe", True),
+    ("", True),
+])
+def test_needs_escalation(text, expected):
+    assert needs_escalation(text) is expected
+
+
+def test_needs_escalation_reads_task_output_raw():
+    assert needs_escalation(SimpleNamespace(raw="Escalate: no")) is False
+    assert needs_escalation(SimpleNamespace(raw=None)) is True
+
+
+def test_tiers_use_separate_models():
+    assert TIERS[TIER_1].model != TIERS[TIER_2].model
+    assert fallback_chains() == {t.model: t.fallbacks for t in TIERS.values() if t.fallbacks}
+
+
+class FlakyCompletion:
+    """Fails for the models in `down`, answers with the model name otherwise."""
+
+    def __init__(self, *down):
+        self.down = set(down)
+        self.models = []
+
+    def __call__(self, model=None, **kwargs):
+        self.models.append(model)
+        if model in self.down:
+            raise RuntimeError(f"{model} unavailable")
+        return f"answer from {model}"
+
+
+def test_fallbacks_are_tried_in_order():
+    completion = FlakyCompletion("tier1-llm", "backup-1")
+    wrapped = with_fallbacks(completion, {"tier1-llm": ["backup-1", "backup-2"]})
+    assert wrapped(model="tier1-llm", messages=[]) == "answer from backup-2"
+    assert completion.models == ["tier1-llm", "backup-1", "backup-2"]
+
+
+def test_positional_model_is_replaced_on_fallback():
+    completion = FlakyCompletion("tier1-llm")
+    wrapped = with_fallbacks(completion, {"tier1-llm": ["backup-1"]})
+    assert wrapped("tier1-llm", messages=[]) == "answer from backup-1"
+
+
+def test_last_error_is_raised_when_every_model_fails():
+    completion = FlakyCompletion("tier1-llm", "backup-1")
+    wrapped = with_fallbacks(completion, {"tier1-llm": ["backup-1"]})
+    with pytest.raises(RuntimeError, match="backup-1 unavailable"):
+        wrapped(model="tier1-llm")
+
+
+def test_models_without_a_chain_and_mock_responses_are_not_retried():
+    completion = FlakyCompletion("tier2-llm", "tier1-llm")
+    wrapped = with_fallbacks(completion, {"tier1-llm": ["backup-1"]})
+    with pytest.raises(RuntimeError):
+        wrapped(model="tier2-llm")
+    with pytest.raises(RuntimeError):
+        wrapped(model="tier1-llm", mock_response="cached")
+    assert completion.models == ["tier2-llm", "tier1-llm"]
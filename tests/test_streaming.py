@@ -0,0 +1,90 @@
+import threading
+from types import SimpleNamespace
+
+from app import streaming
+from app.jobs import DONE, STATUS, JobManager
+
+
+def test_emit_without_a_sink_is_a_no_op():
+    assert not streaming.streaming()
+    streaming.emit(streaming.STEP, thought="ignored")
+
+
+def test_events_reach_the_sink_in_order():
+    seen = []
+    with streaming.streaming_to(lambda kind, data: seen.append((kind, data))):
+        assert streaming.streaming()
+        streaming.step_callback(SimpleNamespace(thought="check account", tool="Get Customer Details", output="ok"))
+        streaming.emit(streaming.TOKEN, text="Hello")
+        streaming.task_callback(SimpleNamespace(agent="Tier 1", raw="x" * 5000))
+    assert [kind for kind, _ in seen] == [streaming.STEP, streaming.TOKEN, streaming.TASK]
+    assert seen[0][1]["tool"] == "Get Customer Details"
+    assert len(seen[2][1]["summary"]) == 2001  # clipped, plus the ellipsis
+    assert not streaming.streaming()
+
+
+def run_job(runner):
+    manager = JobManager(runner, max_workers=1)
+    job = manager.submit("router down")
+    assert job.wait(5)
+    return job
+
+
+def test_job_log_keeps_emit_order_and_ends_with_done():
+    def runner(inquiry):
+        for n in range(3):
+            streaming.emit(streaming.TOKEN, text=str(n))
+        return "done"
+
+    job = run_job(runner)
+    assert [e["seq"] for e in job.events] == list(range(len(job.events)))
+    assert [e["type"] for e in job.events] == [STATUS, streaming.TOKEN, streaming.TOKEN, streaming.TOKEN, DONE]
+    assert job.streamed_text() == "012"
+    assert job.events[-1]["data"] == {"status": "succeeded", "result": "done", "error": None}
+
+
+def test_failed_job_still_ends_with_done():
+    def runner(inquiry):
+        streaming.emit(streaming.STEP, thought="calling a tool")
+        raise RuntimeError("tool crashed")
+
+    job = run_job(runner)
+    assert [e["type"] for e in job.events] == [STATUS, streaming.STEP, DONE]
+    assert job.events[-1]["data"]["error"] == "tool crashed"
+
+
+def test_events_since_waits_for_new_events():
+    release = threading.Event()
+
+    def runner(inquiry):
+        release.wait(5)
+        streaming.emit(streaming.TOKEN, text="late")
+        return "ok"
+
+    manager = JobManager(runner, max_workers=1)
+    job = manager.submit("router down")
+    first = job.events_since(0, timeout=5)
+    assert [e["type"] for e in first] == [STATUS]
+    release.set()
+    later = job.events_since(1, timeout=5)
+    assert later[0]["data"] == {"text": "late"}
+    job.wait(5)
+    assert job.events_since(len(job.events), timeout=5) == []  # finished and fully read: no wait
+
+
+def test_token_events_are_capped_but_done_is_kept():
+    release = threading.Event()
+
+    def runner(inquiry):
+        release.wait(5)
+        for _ in range(50):
+            streaming.emit(streaming.TOKEN, text="x")
+        return "ok"
+
+    manager = JobManager(runner, max_workers=1)
+    job = manager.submit("router down")
+    job.max_events = 10
+    release.set()
+    job.wait(5)
+    assert len([e for e in job.events if e["type"] == streaming.TOKEN]) <= 10
+    assert job.events[-1]["type"] == DONE
@@ -0,0 +1,86 @@
+import pytest
+
+from shared.ticket_store import InMemoryTicketStore, InvalidCursor, SQLiteTicketStore, create_ticket_store
+
+
+def ticket(n, customer_id="CUST001", status="Open", priority="Medium", created_at=None):
+    return {
+        "ticket_id": f"t{n:03d}",
+        "customer_id": customer_id,
+        "issue_summary": f"Issue {n}",
+        "priority": priority,
+        "status": status,
+        "created_at": created_at or f"2026-01-01T00:00:{n % 60:02d}.{n:06d}",
+        "estimated_resolution": "2026-01-02T00:00:00",
+    }
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteTicketStore(str(tmp_path / "tickets.db"))
+    return InMemoryTicketStore()
+
+
+def pages(store, **filters):
+    cursor, seen = None, []
+    while True:
+        page, cursor = store.list(cursor=cursor, **filters)
+        seen.append([t["ticket_id"] for t in page])
+        if cursor is None:
+            return seen
+
+
+def test_create_get_count(store):
+    store.create(ticket(1))
+    assert store.get("t001")["issue_summary"] == "Issue 1"
+    assert store.get("missing") is None
+    assert store.count() == 1
+
+
+def test_cursor_pages_cover_every_ticket_newest_first(store):
+    for n in range(1, 26):
+        store.create(ticket(n))
+    result = pages(store, limit=10)
+    assert [len(page) for page in result] == [10, 10, 5]
+    flat = [tid for page in result for tid in page]
+    assert flat == [f"t{n:03d}" for n in range(25, 0, -1)]
+
+
+def test_equal_timestamps_page_by_ticket_id(store):
+    for n in range(1, 8):
+        store.create(ticket(n, created_at="2026-01-01T00:00:00"))
+    flat = [tid for page in pages(store, limit=3) for tid in page]
+    assert flat == [f"t{n:03d}" for n in range(7, 0, -1)]
+
+
+def test_filters_apply_across_pages(store):
+    for n in range(1, 21):
+        store.create(ticket(n, customer_id="CUST001" if n % 2 else "CUST002",
+                            status="Closed" if n % 5 == 0 else "Open"))
+    flat = [tid for page in pages(store, customer_id="CUST002", status="Open", limit=3) for tid in page]
+    assert flat == [f"t{n:03d}" for n in range(20, 0, -1) if n % 2 == 0 and n % 5]
+
+
+def test_last_page_has_no_cursor(store):
+    store.create(ticket(1))
+    page, cursor = store.list(limit=1)
+    assert len(page) == 1 and cursor is None
+
+
+def test_invalid_cursor(store):
+    with pytest.raises(InvalidCursor):
+        store.list(cursor="not-a-cursor")
+
+
+def test_duplicate_ids_are_rejected_by_sqlite(tmp_path):
+    store = SQLiteTicketStore(str(tmp_path / "tickets.db"))
+    store.create(ticket(1))
+    with pytest.raises(Exception):
+        store.create(ticket(1))
+
+
+def test_sqlite_store_is_durable(tmp_path):
+    path = str(tmp_path / "tickets.db")
+    create_ticket_store("sqlite", path).create(ticket(1))
+    assert create_ticket_store("sqlite", path).get("t001")["ticket_id"] == "t001"
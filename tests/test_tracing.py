@@ -0,0 +1,84 @@
+import pytest
+
+from shared import tracing
+
+
+class Collector:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    collector = Collector()
+    monkeypatch.setattr(tracing, "_exporter", collector)
+    return collector.spans
+
+
+def test_spans_are_noops_when_tracing_is_off(monkeypatch):
+    monkeypatch.setattr(tracing, "_exporter", None)
+    assert tracing.span("x") is tracing.NOOP_SPAN
+    assert tracing.start_span("x") is tracing.NOOP_SPAN
+    assert tracing.inject_headers({"a": "b"}) == {"a": "b"}
+
+
+def test_nested_spans_link_to_their_parent(exported):
+    with tracing.span("crew.run") as root:
+        with tracing.span("tool.run", tool="kb") as child:
+            pass
+    assert [s.name for s in exported] == ["tool.run", "crew.run"]
+    assert root.parent_id is None
+    assert (child.trace_id, child.parent_id) == (root.trace_id, root.span_id)
+    assert child.attributes == {"tool": "kb"}
+
+
+def test_exceptions_mark_the_span_as_failed(exported):
+    with pytest.raises(ValueError):
+        with tracing.span("tool.run"):
+            raise ValueError("boom")
+    assert (exported[0].status, exported[0].error) == ("error", "ValueError: boom")
+
+
+def test_traceparent_round_trip_links_the_remote_span(exported):
+    with tracing.correlation("job-1"):
+        with tracing.span("http.client") as caller:
+            headers = tracing.inject_headers()
+    assert headers[tracing.TRACEPARENT_HEADER] == f"00-{caller.trace_id}-{caller.span_id}-01"
+    assert headers[tracing.CORRELATION_HEADER] == "job-1"
+
+    # The receiving service continues the trace from the headers alone
+    with tracing.continue_trace(headers) as cid:
+        with tracing.span("http.server") as server:
+            pass
+    assert cid == "job-1"
+    assert (server.trace_id, server.parent_id, server.correlation_id) == (caller.trace_id, caller.span_id, "job-1")
+
+
+def test_start_span_also_continues_a_remote_trace(exported):
+    headers = {tracing.TRACEPARENT_HEADER: f"00-{'a' * 32}-{'b' * 16}-01"}
+    with tracing.continue_trace(headers):
+        leaf = tracing.start_span("stream")
+    tracing.end_span(leaf)
+    assert (leaf.trace_id, leaf.parent_id) == ("a" * 32, "b" * 16)
+    assert exported == [leaf]
+
+
+def test_start_span_is_a_child_of_the_current_span(exported):
+    with tracing.span("http.server") as parent:
+        leaf = tracing.start_span("stream")
+        assert tracing.current_span() is parent  # not made current
+    tracing.end_span(leaf, RuntimeError("client went away"))
+    tracing.end_span(leaf)  # ending twice exports once
+    assert (leaf.trace_id, leaf.parent_id) == (parent.trace_id, parent.span_id)
+    assert leaf.status == "error" and exported.count(leaf) == 1
+
+
+def test_malformed_traceparent_starts_a_new_trace(exported):
+    with tracing.continue_trace({tracing.TRACEPARENT_HEADER: "garbage"}) as cid:
+        with tracing.span("http.server") as server:
+            pass
+    assert server.parent_id is None and len(server.trace_id) == 32
+    assert cid and server.correlation_id == cid
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.transport import ServiceTransport, close_with_loop, get_async_transport
+
+
+def test_async_transport_is_per_loop_and_closed_with_it():
+    async def scenario():
+        transport = get_async_transport()
+        assert get_async_transport() is transport
+        return transport, transport.client_for("http://tickets:8000/x")
+
+    first, client = asyncio.run(scenario())
+    second, _ = asyncio.run(scenario())
+    assert second is not first
+    assert client.is_closed
+
+
+def test_close_with_loop_runs_on_the_closing_loop():
+    closed = []
+
+    async def aclose():
+        closed.append(asyncio.get_running_loop())
+
+    async def scenario():
+        handle = close_with_loop(aclose)
+        return asyncio.get_running_loop(), handle
+
+    loop, _ = asyncio.run(scenario())
+    assert closed == [loop]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        self.server.peers.add(self.client_address)
+        self.server.requests += 1
+        body = b"ok"
+        self.send_response(self.server.status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.peers, server.requests, server.status = set(), 0, 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server, path="/"):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_one_session_per_host():
+    transport = ServiceTransport()
+    first = transport.session_for("http://tickets:8000/create_ticket")
+    assert transport.session_for("http://tickets:8000/ticket_status/1") is first
+    assert transport.session_for("http://devices:8000/reboot") is not first
+    transport.close()
+
+
+def test_sync_calls_reuse_one_connection(server):
+    transport = ServiceTransport()
+    for _ in range(5):
+        assert transport.get(url(server)).status_code == 200
+    assert server.requests == 5 and len(server.peers) == 1
+    transport.close()
+
+
+def test_async_calls_reuse_one_connection(server):
+    async def scenario():
+        transport = get_async_transport()
+        for _ in range(5):
+            assert (await transport.get(url(server))).status_code == 200
+
+    asyncio.run(scenario())
+    assert server.requests == 5 and len(server.peers) == 1
+
+
+def test_gets_are_retried_but_posts_are_not(server):
+    server.status = 503
+    transport = ServiceTransport(retries=2, backoff=0, backoff_jitter=0)
+    assert transport.get(url(server)).status_code == 503
+    assert server.requests == 3
+    assert transport.post(url(server)).status_code == 503
+    assert server.requests == 4
+    transport.close()
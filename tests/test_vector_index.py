@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("llama_index.core")
+from app.vector_index import LocalIndexWriter, LocalVectorIndex
+
+DIM = 32
+
+
+class Node:
+    """The parts of a LlamaIndex node that LocalIndexWriter reads."""
+
+    def __init__(self, doc_id, chunk, vector, category):
+        self.ref_doc_id = doc_id
+        self.node_id = f"{doc_id}-{chunk}"
+        self.metadata = {"id": doc_id, "category": category}
+        self._vector = vector
+
+    def get_embedding(self):
+        return self._vector
+
+    def get_content(self):
+        return f"text of {self.node_id}"
+
+
+def corpus(count=400, seed=7):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count, DIM)).astype(np.float32)
+    nodes = [Node(f"doc{n}", 0, vectors[n], "network" if n % 2 else "billing") for n in range(count)]
+    return vectors, nodes
+
+
+def write(tmp_path, nodes, quantize="none"):
+    writer = LocalIndexWriter(str(tmp_path), "kb", quantize=quantize)
+    writer.add(nodes)
+    writer.close()
+    return LocalVectorIndex(str(tmp_path), "kb")
+
+
+def brute_force(vectors, query, k):
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = unit @ query
+    return list(np.argsort(-scores)[:k]), scores
+
+
+def queries(vectors, count=20, seed=11):
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.choice(len(vectors), count, replace=False)]
+    noisy = picked + rng.normal(scale=0.3, size=picked.shape).astype(np.float32)
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+
+def test_float32_top_k_matches_brute_force(tmp_path):
+    vectors, nodes = corpus()
+    index = write(tmp_path, nodes)
+    assert index.dtype == "float32" and len(index) == len(nodes)
+    for query in queries(vectors):
+        expected, scores = brute_force(vectors, query, 5)
+        hits = index.search(query, top_k=5)
+        assert [hit.row for hit in hits] == expected
+        assert [hit.score for hit in hits] == pytest.approx(list(scores[expected]), abs=1e-5)
+
+
+def test_int8_top_k_tracks_brute_force(tmp_path):
+    vectors, nodes = corpus()
+    index = write(tmp_path, nodes, quantize="int8")
+    assert index.dtype == "int8" and index.vectors.dtype == np.int8
+    for query in queries(vectors):
+        expected, scores = brute_force(vectors, query, 5)
+        hits = index.search(query, top_k=5)
+        assert hits[0].row == expected[0]
+        assert len({hit.row for hit in hits} & set(expected)) >= 4
+        assert all(abs(hit.score - scores[hit.row]) < 0.02 for hit in hits)
+
+
+def test_category_rows_restrict_the_search(tmp_path):
+    vectors, nodes = corpus()
+    index = write(tmp_path, nodes)
+    rows = index.rows_where("category", "network")
+    hits = index.search(queries(vectors)[0], top_k=10, rows=rows)
+    assert len(hits) == 10
+    assert all(index.docs[hit.row]["metadata"]["category"] == "network" for hit in hits)
+    assert index.search(queries(vectors)[0], rows=index.rows_where("category", "unknown")) == []
+
+
+def write_order(vectors, index):
+    # The expected unit rows for the documents in the order the index stores them
+    by_node = {f"doc{n}-0": vectors[n] for n in range(len(vectors))}
+    by_node["doc3-1"] = vectors[0]
+    rows = np.stack([by_node[doc["node_id"]] for doc in index.docs])
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def test_writer_round_trips_through_the_memmap(tmp_path):
+    vectors, nodes = corpus(count=10)
+    index = write(tmp_path, nodes)
+    assert isinstance(index.vectors, np.memmap)
+    assert [doc["doc_id"] for doc in index.docs] == [f"doc{n}" for n in range(10)]
+
+    # Reopening the writer loads the saved rows; upsert replaces a document's chunks
+    writer = LocalIndexWriter(str(tmp_path), "kb")
+    writer.upsert([Node("doc3", 1, vectors[0], "billing")])
+    writer.delete(["doc4"])
+    writer.close()
+    reopened = LocalVectorIndex(str(tmp_path), "kb")
+    assert len(reopened) == 9
+    assert [doc["node_id"] for doc in reopened.docs if doc["doc_id"] == "doc3"] == ["doc3-1"]
+    assert np.allclose(reopened.dequantized(), write_order(vectors, reopened), atol=1e-6)
+
+
+def test_missing_index_is_empty(tmp_path):
+    index = LocalVectorIndex(str(tmp_path), "kb")
+    assert not index.exists() and len(index) == 0
+    assert index.search(np.ones(DIM, dtype=np.float32)) == []
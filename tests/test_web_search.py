@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+from app.web_search import SearchUnavailable, StubBackend, TavilyBackend, WebSearch, normalize_query
+
+
+class BlockingBackend(StubBackend):
+    """Holds every call until released, so concurrent callers overlap."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def search(self, query, depth):
+        self.release.wait(5)
+        return super().search(query, depth)
+
+
+def test_normalized_queries_share_a_cache_entry():
+    backend = StubBackend()
+    search = WebSearch(backend)
+    first = search.search("Router  Firmware Update")
+    assert search.search("router firmware update ") == first
+    assert backend.calls == 1
+    assert normalize_query("  A  b ") == "a b"
+
+
+def test_depth_is_part_of_the_key():
+    backend = StubBackend()
+    search = WebSearch(backend)
+    search.search("router", depth="basic")
+    search.search("router", depth="advanced")
+    assert backend.calls == 2
+
+
+def test_concurrent_identical_queries_make_one_backend_call():
+    backend = BlockingBackend()
+    search = WebSearch(backend)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(search.search("dns outage"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while search.coalesced < 7:
+        threading.Event().wait(0.01)
+    backend.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert backend.calls == 1
+    assert len(results) == 8 and all(r == results[0] for r in results)
+
+
+def test_waiters_get_the_leaders_error():
+    class FailingBackend(BlockingBackend):
+        def search(self, query, depth):
+            self.release.wait(5)
+            raise RuntimeError("search API down")
+
+    backend = FailingBackend()
+    search = WebSearch(backend)
+    errors = []
+
+    def call():
+        try:
+            search.search("vpn")
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while search.coalesced < 2:
+        threading.Event().wait(0.01)
+    backend.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert errors == ["search API down"] * 3
+
+
+def test_rate_limit_gives_up_after_max_wait():
+    search = WebSearch(StubBackend(), rate=0.01, burst=1, max_wait=0)
+    search.search("first")
+    with pytest.raises(SearchUnavailable):
+        search.search("second")
+    assert search.search("first")  # cached results need no token
+    assert search.stats()["rate_limited"] == 1
+
+
+def test_missing_api_key_spends_no_token(monkeypatch):
+    monkeypatch.delenv("TAVILY_API_KEY", raising=False)
+    backend = TavilyBackend()
+    search = WebSearch(backend, rate=0.01, burst=1, max_wait=0)
+    for query in ("first", "second"):
+        with pytest.raises(SearchUnavailable, match="API key"):
+            search.search(query)
+    assert search.stats()["rate_limited"] == 0 and search.backend_calls == 0
+
+    # The key is read from the environment on each search, not at startup
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    backend.check()
+    assert backend.api_key == "tvly-test"